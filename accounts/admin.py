@@ -7,7 +7,9 @@ from .models import User
 class UserAdmin(DjangoUserAdmin):
     fieldsets = DjangoUserAdmin.fieldsets + (
         ("DataNest Role", {"fields": ("role", "status")}),  # status = active/inactive flag
+        ("Review Assignment", {"fields": ("review_categories",)}),
     )
+    filter_horizontal = DjangoUserAdmin.filter_horizontal + ("review_categories",)
     list_display = ("username", "email", "role", "is_staff", "status", "is_active")
     list_filter = ("role", "is_staff", "is_superuser", "is_active", "status")
 
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_role'),
+        ('folders', '0002_folder_depth_folder_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='review_categories',
+            field=models.ManyToManyField(blank=True, related_name='reviewers', to='folders.category'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
-class User(AbstractUser):
+from ecms.tracking import TrackedFieldsMixin
+
+
+class User(TrackedFieldsMixin, AbstractUser):
     ROLE_CHOICES = (
         ('ADMIN', 'Admin'),
         ('REVIEWER', 'Reviewer'),
@@ -10,6 +13,13 @@ class User(AbstractUser):
 
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='USER')
     status = models.BooleanField(default=True)
+    # Categories whose documents are preferably assigned to this reviewer,
+    # see workflows.scheduler
+    review_categories = models.ManyToManyField(
+        'folders.Category',
+        blank=True,
+        related_name='reviewers'
+    )
 
     def __str__(self):
         return self.username
@@ -28,20 +38,20 @@ class User(AbstractUser):
             return True
         if self.is_reviewer():
             return True
-        return document.uploaded_by == self
+        return document.uploaded_by_id == self.pk
 
     def can_edit_document(self, document):
         if self.is_admin():
             return True
-        if document.uploaded_by == self:
-            return document.status in ['DRAFT', 'REJECTED']
+        if document.uploaded_by_id == self.pk:
+            return document.status in document.EDITABLE_STATUSES
         return False
 
     def can_delete_document(self, document):
         if self.is_admin():
             return True
-        if document.uploaded_by == self:
-            return document.status in ['DRAFT', 'REJECTED']
+        if document.uploaded_by_id == self.pk:
+            return document.status in document.EDITABLE_STATUSES
         return False
 
     def can_upload_document(self):
@@ -50,7 +60,7 @@ class User(AbstractUser):
     def can_review_document(self, document):
         if not self.is_reviewer() and not self.is_admin():
             return False
-        if document.uploaded_by == self:
+        if document.uploaded_by_id == self.pk:
             return False
         return True
 
@@ -0,0 +1,302 @@
+"""
+Buffered writes for ActivityLog and AuditTrail rows.
+
+log_activity() and log_audit() take the same keyword arguments as
+objects.create(). Once the surrounding transaction commits, the event is
+appended to a per-process spool file and queued in memory. A background
+thread inserts queued events with bulk_create() when ACTIVITY_BUFFER_SIZE
+events are waiting or every ACTIVITY_BUFFER_INTERVAL seconds, then removes
+the spool files it has written. Requests therefore no longer take the
+database write lock just to record that they happened.
+
+Each live process holds an flock() on its spool files. Files nobody holds
+were left by a crashed process and are replayed when a writer starts, or
+by `manage.py replay_activity_spool`. Delivery is at least once: a crash
+between the insert and removing the spool file replays those events.
+
+A batch that fails ACTIVITY_FLUSH_RETRIES flushes in a row is written one
+event at a time, and events that still fail are appended to a dead letter
+file under <spool dir>/dead/ (see `replay_activity_spool --dead-letter`).
+
+Set ACTIVITY_BUFFER_ENABLED = False to write rows synchronously.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .signals import events_written
+
+try:
+    import fcntl
+except ImportError:  # Windows: no locking, orphans are only replayed by the command
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _serialize(fields):
+    data = {}
+    for name, value in fields.items():
+        if isinstance(value, models.Model):
+            data[f'{name}_id'] = value.pk
+        elif isinstance(value, datetime):
+            data[name] = value.isoformat()
+        else:
+            data[name] = value
+    return data
+
+
+def _build(model, fields):
+    for field in model._meta.concrete_fields:
+        value = fields.get(field.attname)
+        if isinstance(field, models.DateTimeField) and isinstance(value, str):
+            fields[field.attname] = parse_datetime(value)
+    return model(**fields)
+
+
+def write_events(events):
+    """Insert serialized events, grouped by model, in one transaction."""
+    by_model = {}
+    for event in events:
+        by_model.setdefault(event['model'], []).append(dict(event['fields']))
+
+    with transaction.atomic():
+        for label, rows in by_model.items():
+            model = apps.get_model(label)
+            # The row referenced by an event may have been deleted before the
+            # flush: nullable references are cleared, other events dropped.
+            for field in model._meta.concrete_fields:
+                if not field.is_relation:
+                    continue
+                ids = {row[field.attname] for row in rows if row.get(field.attname) is not None}
+                if not ids:
+                    continue
+                existing = set(
+                    field.related_model._default_manager.filter(pk__in=ids).values_list('pk', flat=True)
+                )
+                kept = []
+                for row in rows:
+                    if row.get(field.attname) is None or row[field.attname] in existing:
+                        kept.append(row)
+                    elif field.null:
+                        row[field.attname] = None
+                        kept.append(row)
+                rows = kept
+            instances = model._default_manager.bulk_create([_build(model, row) for row in rows])
+            events_written.send(sender=model, instances=instances)
+
+
+def _lock(f, blocking=True):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        return False
+    return True
+
+
+def read_spool(f):
+    events = []
+    f.seek(0)
+    for line in f:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            # Torn final line from a crash mid-write.
+            logger.warning("Skipping malformed line in %s", f.name)
+    return events
+
+
+def replay_orphans(spool_dir=None, name='events', write=write_events):
+    """
+    Pass the events of `name` spool files no live process holds to `write`.
+    Returns the event count.
+    """
+    spool_dir = spool_dir or settings.ACTIVITY_SPOOL_DIR
+    replayed = 0
+    for path in sorted(glob.glob(os.path.join(spool_dir, f'{name}-*.jsonl'))):
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            continue
+        with f:
+            if not _lock(f, blocking=False):
+                continue
+            events = read_spool(f)
+            if events:
+                write(events)
+            os.remove(path)
+            replayed += len(events)
+    return replayed
+
+
+class EventWriter:
+    """
+    Spools and queues events, and passes them in batches to `write` from a
+    background thread. `name` prefixes the spool files.
+    """
+
+    def __init__(self, spool_dir, batch_size, interval, name='events', write=write_events, max_retries=3):
+        self.spool_dir = str(spool_dir)
+        self.name = name
+        self.write = write
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_retries = max_retries
+        self.pid = os.getpid()
+        self.queue = []
+        self.spool = None
+        self.retired = None
+        self.failures = 0
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def start(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._open_spool()
+        if fcntl is not None:
+            try:
+                replay_orphans(self.spool_dir, self.name, self.write)
+            except Exception:
+                logger.exception("Could not replay orphaned %s spool files", self.name)
+        threading.Thread(target=self._run, name=f'{self.name}-writer', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _open_spool(self):
+        self.sequence += 1
+        path = os.path.join(self.spool_dir, f'{self.name}-{self.pid}-{self.sequence}.jsonl')
+        self.spool = open(path, 'a', encoding='utf-8')
+        _lock(self.spool)
+
+    def put(self, event):
+        line = json.dumps(event, separators=(',', ':'))
+        with self.lock:
+            self.spool.write(line + '\n')
+            self.spool.flush()
+            self.queue.append(event)
+            full = len(self.queue) >= self.batch_size
+        if full:
+            self.wakeup.set()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s writer failed to flush", self.name)
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                if not self.queue:
+                    return
+                batch, self.queue = self.queue, []
+                self.retired = self.spool
+                self._open_spool()
+
+            close_old_connections()
+            try:
+                self.write(batch)
+            except Exception:
+                self.failures += 1
+                if self.failures < self.max_retries:
+                    logger.exception("Could not write %d %s, will retry", len(batch), self.name)
+                    self._requeue(batch)
+                    return
+                logger.exception(
+                    "Could not write %d %s after %d attempts, writing them one by one",
+                    len(batch), self.name, self.failures
+                )
+                self._write_each(batch)
+
+            self.failures = 0
+            os.remove(self.retired.name)
+            self.retired.close()
+            self.retired = None
+
+    def _requeue(self, batch):
+        """Put `batch` back in front of the queue and keep spooling to its file."""
+        with self.lock:
+            # Events queued since the rotation move to the retired spool,
+            # so a failing flush never leaves another spool file open.
+            for event in self.queue:
+                self.retired.write(json.dumps(event, separators=(',', ':')) + '\n')
+            self.retired.flush()
+            os.remove(self.spool.name)
+            self.spool.close()
+            self.spool, self.retired = self.retired, None
+            self.queue[:0] = batch
+
+    def _write_each(self, batch):
+        """Write events one at a time; those that still fail go to the dead letter file."""
+        failed = []
+        for event in batch:
+            close_old_connections()
+            try:
+                self.write([event])
+            except Exception:
+                failed.append(event)
+        if not failed:
+            return
+        dead_dir = os.path.join(self.spool_dir, 'dead')
+        os.makedirs(dead_dir, exist_ok=True)
+        path = os.path.join(dead_dir, f'{self.name}-{self.pid}.jsonl')
+        with open(path, 'a', encoding='utf-8') as f:
+            for event in failed:
+                f.write(json.dumps(event, separators=(',', ':')) + '\n')
+        logger.error("Moved %d %s that could not be written to %s", len(failed), self.name, path)
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        # A forked worker must not share its parent's spool file or thread.
+        if _writer is None or _writer.pid != os.getpid():
+            _writer = EventWriter(
+                settings.ACTIVITY_SPOOL_DIR,
+                settings.ACTIVITY_BUFFER_SIZE,
+                settings.ACTIVITY_BUFFER_INTERVAL,
+                max_retries=settings.ACTIVITY_FLUSH_RETRIES
+            )
+            _writer.start()
+        return _writer
+
+
+def _enqueue(event):
+    get_writer().put(event)
+
+
+def record(model_label, **fields):
+    fields.setdefault('timestamp', timezone.now())
+    if not settings.ACTIVITY_BUFFER_ENABLED:
+        apps.get_model(model_label).objects.create(**fields)
+        return
+    # Events of a rolled back transaction are never written.
+    transaction.on_commit(partial(_enqueue, {'model': model_label, 'fields': _serialize(fields)}))
+
+
+def log_activity(**fields):
+    record('activity.ActivityLog', **fields)
+
+
+def log_audit(**fields):
+    record('audit.AuditTrail', **fields)
@@ -0,0 +1,34 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from activity import events
+from notifications import dispatch
+
+
+class Command(BaseCommand):
+    help = (
+        "Write activity and audit events and queued notifications left in spool files "
+        "by crashed processes. "
+        "Without flock() support (Windows) only run this while no workers are running."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dead-letter',
+            action='store_true',
+            help="Retry the events that could not be written and were moved to the dead letter files instead"
+        )
+
+    def handle(self, *args, **options):
+        if options['dead_letter']:
+            dead_dir = os.path.join(settings.ACTIVITY_SPOOL_DIR, 'dead')
+            replayed = events.replay_orphans(dead_dir)
+            notifications = events.replay_orphans(dead_dir, dispatch.SPOOL_NAME, dispatch.write_notifications)
+        else:
+            replayed = events.replay_orphans()
+            notifications = dispatch.replay_orphans()
+        self.stdout.write(self.style.SUCCESS(
+            f"Replayed {replayed} event(s) and {notifications} notification(s)."
+        ))
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by activity.events inside the flush transaction after buffered rows
+# were inserted with bulk_create(), which sends no post_save. The sender is
+# the model and `instances` the list of new rows.
+events_written = Signal()
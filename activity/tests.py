@@ -1,3 +1,65 @@
+import glob
+import os
+import shutil
+import tempfile
+
 from django.test import TestCase
 
-# Create your tests here.
+from .events import EventWriter, read_spool
+
+
+class EventWriterTests(TestCase):
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        self.written = []
+        self.failing = set()
+        self.writer = EventWriter(self.spool_dir, batch_size=100, interval=60, write=self.write, max_retries=3)
+        # Spool without the background thread; flush() is called directly.
+        self.writer._open_spool()
+        self.addCleanup(lambda: self.writer.spool.close())
+
+    def write(self, events):
+        if any(event['n'] in self.failing for event in events):
+            raise RuntimeError("write failed")
+        self.written.extend(events)
+
+    def spooled(self):
+        with open(self.writer.spool.name, encoding='utf-8') as f:
+            return read_spool(f)
+
+    def spools(self):
+        return sorted(glob.glob(os.path.join(self.spool_dir, 'events-*.jsonl')))
+
+    def test_flush_writes_and_removes_the_spool(self):
+        self.writer.put({'n': 1})
+        self.writer.flush()
+        self.assertEqual(self.written, [{'n': 1}])
+        self.assertEqual(len(self.spools()), 1)
+        self.assertEqual(self.spooled(), [])
+
+    def test_failed_flush_reuses_the_spool(self):
+        self.failing = {1}
+        self.writer.put({'n': 1})
+        self.writer.flush()
+        self.writer.put({'n': 2})
+        self.writer.flush()
+
+        self.assertIsNone(self.writer.retired)
+        self.assertEqual(self.spools(), [self.writer.spool.name])
+        self.assertEqual(self.spooled(), [{'n': 1}, {'n': 2}])
+        self.assertEqual(self.writer.queue, [{'n': 1}, {'n': 2}])
+
+    def test_failing_event_is_dead_lettered_after_the_retries(self):
+        self.failing = {2}
+        for n in (1, 2, 3):
+            self.writer.put({'n': n})
+        for _ in range(3):
+            self.writer.flush()
+
+        self.assertEqual(self.written, [{'n': 1}, {'n': 3}])
+        self.assertEqual(self.writer.queue, [])
+        self.assertEqual(self.writer.failures, 0)
+        self.assertEqual(self.spools(), [self.writer.spool.name])
+        with open(os.path.join(self.spool_dir, 'dead', f'events-{os.getpid()}.jsonl')) as f:
+            self.assertEqual(read_spool(f), [{'n': 2}])
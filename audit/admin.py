@@ -1,4 +1,10 @@
 from django.contrib import admin
-from .models import AuditTrail
+from .models import AuditSegment, AuditTrail
 
-admin.site.register(AuditTrail)
\ No newline at end of file
+admin.site.register(AuditTrail)
+
+
+@admin.register(AuditSegment)
+class AuditSegmentAdmin(admin.ModelAdmin):
+    list_display = ('period', 'part', 'row_count', 'first_timestamp', 'last_timestamp', 'path')
+    readonly_fields = [field.name for field in AuditSegment._meta.fields]
@@ -0,0 +1,302 @@
+"""
+Monthly archival of the audit trail.
+
+AuditTrail is treated as partitioned by calendar month (UTC). Only the
+last AUDIT_HOT_MONTHS months stay in the database; archive_month() streams
+an older month into a segment file under AUDIT_ARCHIVE_DIR and deletes
+those rows, so the table and its indexes stop growing.
+
+A segment is a sequence of independently gzipped blocks of BLOCK_ROWS JSON
+lines (the concatenation is itself a valid .gz file). A sidecar .idx.json
+records every block's byte range, id and time span and the users,
+documents and actions it contains, so a filtered read only decompresses
+blocks that can match. AuditSegment rows catalogue the segments.
+
+audit_events() reads hot and archived rows through one iterator.
+"""
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditSegment, AuditTrail
+
+BLOCK_ROWS = 1000
+FIELDS = ('id', 'user_id', 'document_id', 'action', 'ip_address', 'timestamp', 'description')
+
+
+def month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(start):
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def previous_month(start):
+    if start.month == 1:
+        return start.replace(year=start.year - 1, month=12)
+    return start.replace(month=start.month - 1)
+
+
+def hot_cutoff(months=None):
+    """Start of the oldest month that stays in the database."""
+    months = settings.AUDIT_HOT_MONTHS if months is None else months
+    start = month_start(datetime.now(dt_timezone.utc))
+    for _ in range(months - 1):
+        start = previous_month(start)
+    return start
+
+
+def archive_path(relative):
+    return os.path.join(settings.AUDIT_ARCHIVE_DIR, relative)
+
+
+def _write_atomic(path, data):
+    partial = f"{path}.partial"
+    with open(partial, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+def write_segment(path, rows):
+    """
+    Write `rows` (tuples in FIELDS order, ascending by timestamp) to `path`.
+    Returns (index, sha256) where index is the list of block entries.
+    """
+    hasher = hashlib.sha256()
+    blocks = []
+    offset = 0
+    partial = f"{path}.partial"
+    with open(partial, 'wb') as f:
+        rows = iter(rows)
+        while block := list(islice(rows, BLOCK_ROWS)):
+            records = [dict(zip(FIELDS, row)) for row in block]
+            for record in records:
+                record['timestamp'] = record['timestamp'].isoformat()
+            data = gzip.compress(
+                ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode(),
+                compresslevel=6
+            )
+            f.write(data)
+            hasher.update(data)
+            blocks.append({
+                'offset': offset,
+                'length': len(data),
+                'rows': len(records),
+                'first_id': records[0]['id'],
+                'last_id': records[-1]['id'],
+                'start': records[0]['timestamp'],
+                'end': records[-1]['timestamp'],
+                'users': sorted({r['user_id'] for r in records if r['user_id'] is not None}),
+                'documents': sorted({r['document_id'] for r in records if r['document_id'] is not None}),
+                'actions': sorted({r['action'] for r in records}),
+            })
+            offset += len(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+    return blocks, hasher.hexdigest()
+
+
+def archive_month(start):
+    """
+    Move the AuditTrail rows of the month beginning at `start` into a new
+    segment. Returns the AuditSegment, or None if the month has no hot rows.
+
+    The files are written under a name of their own and only renamed to the
+    segment path once the AuditSegment row is inserted, so of two concurrent
+    runs that pick the same part the loser fails on the unique constraint and
+    only removes its own files.
+    """
+    end = next_month(start)
+    month = AuditTrail.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    # Pin the id range so rows inserted meanwhile are neither lost nor archived twice.
+    last_id = month.aggregate(last_id=Max('id'))['last_id']
+    if last_id is None:
+        return None
+    month = month.filter(id__lte=last_id)
+
+    part = (AuditSegment.objects.filter(period=start.date()).aggregate(part=Max('part'))['part'] or 0) + 1
+    name = f"{start:%Y-%m}" + (f".{part}" if part > 1 else '')
+    relative = os.path.join(f"{start:%Y}", name + '.jsonl.gz')
+    path = archive_path(relative)
+    staging = archive_path(os.path.join(f"{start:%Y}", f"{name}.{uuid.uuid4().hex}.staging.jsonl.gz"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    renamed = False
+    try:
+        rows = month.order_by('timestamp', 'id').values_list(*FIELDS).iterator(chunk_size=2000)
+        blocks, digest = write_segment(staging, rows)
+        row_count = sum(block['rows'] for block in blocks)
+        _write_atomic(index_path(staging), json.dumps({
+            'period': f"{start:%Y-%m}",
+            'part': part,
+            'fields': FIELDS,
+            'sha256': digest,
+            'blocks': blocks,
+        }).encode())
+
+        with transaction.atomic():
+            segment = AuditSegment.objects.create(
+                period=start.date(),
+                part=part,
+                path=relative,
+                row_count=row_count,
+                first_id=min(block['first_id'] for block in blocks),
+                last_id=max(block['last_id'] for block in blocks),
+                first_timestamp=parse_datetime(blocks[0]['start']),
+                last_timestamp=parse_datetime(blocks[-1]['end']),
+                sha256=digest
+            )
+            deleted, _ = month.delete()
+            if deleted != row_count:
+                raise RuntimeError(
+                    f"Archived {row_count} audit rows for {start:%Y-%m} but deleted {deleted}"
+                )
+            # The index first: a segment file never exists without its index.
+            renamed = True
+            os.replace(index_path(staging), index_path(path))
+            os.replace(staging, path)
+    except Exception:
+        # Only ever our own files: the segment path is ours once the row is.
+        for leftover in (staging, index_path(staging)) + ((path, index_path(path)) if renamed else ()):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    return segment
+
+
+def archive_before(cutoff):
+    """Archive every month that starts before `cutoff`. Returns the new segments."""
+    oldest = AuditTrail.objects.filter(timestamp__lt=cutoff).aggregate(oldest=Min('timestamp'))['oldest']
+    segments = []
+    if oldest is None:
+        return segments
+    start = month_start(oldest)
+    while start < cutoff:
+        segment = archive_month(start)
+        if segment is not None:
+            segments.append(segment)
+        start = next_month(start)
+    return segments
+
+
+def index_path(path):
+    return path[:-len('.jsonl.gz')] + '.idx.json'
+
+
+@lru_cache(maxsize=64)
+def load_index(relative):
+    with open(index_path(archive_path(relative)), 'rb') as f:
+        return json.load(f)
+
+
+def read_block(relative, block):
+    with open(archive_path(relative), 'rb') as f:
+        f.seek(block['offset'])
+        data = gzip.decompress(f.read(block['length']))
+    records = [json.loads(line) for line in data.splitlines()]
+    for record in records:
+        record['timestamp'] = parse_datetime(record['timestamp'])
+    return records
+
+
+def _block_may_match(block, user_id, document_id, action, since, until):
+    if user_id is not None and user_id not in block['users']:
+        return False
+    if document_id is not None and document_id not in block['documents']:
+        return False
+    if action is not None and action not in block['actions']:
+        return False
+    if since is not None and parse_datetime(block['end']) < since:
+        return False
+    if until is not None and parse_datetime(block['start']) >= until:
+        return False
+    return True
+
+
+def _record_matches(record, user_id, document_id, action, since, until):
+    return (
+        (user_id is None or record['user_id'] == user_id)
+        and (document_id is None or record['document_id'] == document_id)
+        and (action is None or record['action'] == action)
+        and (since is None or record['timestamp'] >= since)
+        and (until is None or record['timestamp'] < until)
+    )
+
+
+def iter_segment(segment, *filters, newest_first=True):
+    """Matching records of one segment as dicts."""
+    blocks = load_index(segment.path)['blocks']
+    for block in reversed(blocks) if newest_first else blocks:
+        if not _block_may_match(block, *filters):
+            continue
+        records = read_block(segment.path, block)
+        for record in reversed(records) if newest_first else records:
+            if _record_matches(record, *filters):
+                yield record
+
+
+def archived_records(user_id=None, document_id=None, action=None, since=None, until=None,
+                     newest_first=True):
+    """Matching archived records as dicts ordered by (timestamp, id)."""
+    filters = (user_id, document_id, action, since, until)
+    segments = AuditSegment.objects.order_by(
+        *(('-period', '-part') if newest_first else ('period', 'part'))
+    )
+    if since is not None:
+        segments = segments.filter(last_timestamp__gte=since)
+    if until is not None:
+        segments = segments.filter(first_timestamp__lt=until)
+
+    for _, parts in groupby(segments, key=lambda segment: segment.period):
+        # Late parts of a month overlap earlier ones in time, so merge them.
+        yield from heapq.merge(
+            *(iter_segment(segment, *filters, newest_first=newest_first) for segment in parts),
+            key=lambda record: (record['timestamp'], record['id']),
+            reverse=newest_first
+        )
+
+
+def hot_queryset(user_id=None, document_id=None, action=None, since=None, until=None):
+    hot = AuditTrail.objects.all()
+    if user_id is not None:
+        hot = hot.filter(user_id=user_id)
+    if document_id is not None:
+        hot = hot.filter(document_id=document_id)
+    if action is not None:
+        hot = hot.filter(action=action)
+    if since is not None:
+        hot = hot.filter(timestamp__gte=since)
+    if until is not None:
+        hot = hot.filter(timestamp__lt=until)
+    return hot
+
+
+def audit_events(user=None, document=None, action=None, since=None, until=None):
+    """
+    Yield AuditTrail instances matching the filters, newest first, from the
+    hot table and then from archived segments. `since` is inclusive and
+    `until` exclusive. Archived instances are not saved rows; their user
+    and document may no longer exist.
+    """
+    filters = (getattr(user, 'pk', user), getattr(document, 'pk', document), action, since, until)
+    yield from hot_queryset(*filters).order_by('-timestamp', '-id').iterator(chunk_size=2000)
+    for record in archived_records(*filters):
+        yield AuditTrail(**record)
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from audit import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move audit trail months older than AUDIT_HOT_MONTHS out of the database "
+        "into compressed segment files under AUDIT_ARCHIVE_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, help="Months to keep in the database")
+        parser.add_argument('--before', help="Archive months before YYYY-MM instead")
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help="Run VACUUM afterwards to return the freed space (SQLite)"
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = datetime.strptime(options['before'], '%Y-%m').replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                raise CommandError("--before must be given as YYYY-MM")
+        else:
+            cutoff = archive.hot_cutoff(options['months'])
+
+        segments = archive.archive_before(cutoff)
+        for segment in segments:
+            self.stdout.write(f"Archived {segment.row_count} row(s) to {segment.path}")
+
+        if options['vacuum'] and segments and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {len(segments)} segment(s) of audit rows before {cutoff:%Y-%m}."
+        ))
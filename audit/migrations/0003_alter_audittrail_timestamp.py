@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 12:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_alter_audittrail_options_alter_audittrail_action_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='audittrail',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0003_alter_audittrail_timestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(help_text='First day of the archived month (UTC)')),
+                ('part', models.PositiveIntegerField(default=1)),
+                ('path', models.CharField(help_text='Relative to AUDIT_ARCHIVE_DIR', max_length=255)),
+                ('row_count', models.PositiveIntegerField()),
+                ('first_id', models.BigIntegerField()),
+                ('last_id', models.BigIntegerField()),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-period', '-part'],
+                'constraints': [models.UniqueConstraint(fields=('period', 'part'), name='unique_audit_segment')],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from documents.models import Document
 
 User = settings.AUTH_USER_MODEL
@@ -30,7 +31,8 @@ class AuditTrail(models.Model):
     )
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when a buffered write inserts it.
+    timestamp = models.DateTimeField(default=timezone.now)
     description = models.TextField(blank=True)
 
     class Meta:
@@ -43,4 +45,30 @@ class AuditTrail(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.user} - {self.action} - {self.timestamp}"
\ No newline at end of file
+        return f"{self.user} - {self.action} - {self.timestamp}"
+
+class AuditSegment(models.Model):
+    """
+    One month of AuditTrail rows moved out of the database into a compressed
+    segment file, see audit.archive. Rows that arrive for an already archived
+    month are written as further parts.
+    """
+    period = models.DateField(help_text="First day of the archived month (UTC)")
+    part = models.PositiveIntegerField(default=1)
+    path = models.CharField(max_length=255, help_text="Relative to AUDIT_ARCHIVE_DIR")
+    row_count = models.PositiveIntegerField()
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-period', '-part']
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'part'], name='unique_audit_segment'),
+        ]
+
+    def __str__(self):
+        return f"{self.period:%Y-%m} part {self.part} ({self.row_count} rows)"
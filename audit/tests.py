@@ -1,3 +1,107 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+
+from . import archive, export
+from .models import AuditSegment, AuditTrail
+
+JANUARY = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class AuditTestCase(TestCase):
+    """Three January 2020 events under a temporary AUDIT_ARCHIVE_DIR."""
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        settings_override = override_settings(AUDIT_ARCHIVE_DIR=self.archive_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(archive.load_index.cache_clear)
+
+        User = get_user_model()
+        self.alice = User.objects.create_user('alice', password='x', role='USER')
+        self.bob = User.objects.create_user('bob', password='x', role='USER')
+        self.events = [
+            AuditTrail.objects.create(
+                user=user, action=action, description=f'{action} {day}', ip_address='10.0.0.1',
+                timestamp=JANUARY.replace(day=day)
+            )
+            for day, user, action in ((3, self.alice, 'UPLOAD'), (9, self.bob, 'VIEW'), (20, self.alice, 'DOWNLOAD'))
+        ]
+
+
+
+class ArchiveTests(AuditTestCase):
+    def archived_files(self):
+        return sorted(os.listdir(os.path.join(self.archive_dir, '2020')))
+
+    def test_round_trip(self):
+        segment = archive.archive_month(JANUARY)
+
+        self.assertEqual(segment.row_count, 3)
+        self.assertFalse(AuditTrail.objects.exists())
+        self.assertEqual(self.archived_files(), ['2020-01.idx.json', '2020-01.jsonl.gz'])
+
+        def fields(event):
+            return (event.pk, event.user_id, event.action, event.ip_address, event.timestamp, event.description)
+
+        self.assertEqual(
+            [fields(event) for event in archive.audit_events()],
+            [fields(event) for event in reversed(self.events)]
+        )
+        self.assertEqual(
+            [event.pk for event in archive.audit_events(user=self.alice)],
+            [self.events[2].pk, self.events[0].pk]
+        )
+
+    def test_a_run_that_loses_the_part_keeps_the_winners_files(self):
+        write_segment = archive.write_segment
+
+        def race(path, rows):
+            # Another run archives the same part while this one writes.
+            winner = os.path.join(self.archive_dir, '2020', '2020-01.jsonl.gz')
+            for name in (winner, archive.index_path(winner)):
+                with open(name, 'wb') as f:
+                    f.write(b'winner')
+            AuditSegment.objects.create(
+                period=JANUARY.date(), part=1, path='2020/2020-01.jsonl.gz', row_count=3, first_id=0,
+                last_id=0, first_timestamp=JANUARY, last_timestamp=JANUARY, sha256=''
+            )
+            return write_segment(path, rows)
+
+        with mock.patch.object(archive, 'write_segment', race):
+            with self.assertRaises(IntegrityError):
+                archive.archive_month(JANUARY)
+
+        self.assertEqual(self.archived_files(), ['2020-01.idx.json', '2020-01.jsonl.gz'])
+        with open(os.path.join(self.archive_dir, '2020', '2020-01.jsonl.gz'), 'rb') as f:
+            self.assertEqual(f.read(), b'winner')
+        self.assertEqual(AuditTrail.objects.count(), 3)
+
+
+class ExportTests(AuditTestCase):
+    def test_resumes_from_a_checkpoint(self):
+        archive.archive_month(JANUARY)
+        carol = get_user_model().objects.create_user('carol', password='x', role='USER')
+        for day, user in ((1, self.bob), (2, carol), (3, None)):
+            AuditTrail.objects.create(user=user, action='VIEW', timestamp=JANUARY.replace(month=2, day=day))
+
+        # One query for the segments, one for their usernames and one for the hot rows.
+        with self.assertNumQueries(3):
+            records = list(export.audit_records())
+        self.assertEqual(
+            [record['username'] for record in records],
+            ['alice', 'bob', 'alice', 'bob', 'carol', '']
+        )
+
+        for received in (1, 3, 4):
+            with self.subTest(received=received):
+                after = export.parse_checkpoint(export.format_checkpoint(records[received - 1]))
+                self.assertEqual(list(export.audit_records(after=after)), records[received:])
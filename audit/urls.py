@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import export_audit
+
+urlpatterns = [
+    path('export/', export_audit, name='export_audit'),
+]
@@ -1,3 +1,66 @@
-from django.shortcuts import render
+from datetime import datetime, time, timezone as dt_timezone
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import content_disposition_header
+
+from . import export
+
+
+def parse_moment(value):
+    """Accept a date (midnight UTC) or a datetime; None when empty, ValueError when invalid."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date {value!r}")
+        parsed = datetime.combine(day, time.min)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+@login_required
+def export_audit(request):
+    """
+    Stream the audit trail as CSV or JSONL.
+    GET ?format=csv|jsonl&gzip=1&user=<id>&document=<id>&action=&since=&until=&after=<checkpoint>
+    To resume an interrupted export pass the timestamp and id of the last
+    row received as after=<timestamp>,<id>.
+    """
+    if not request.user.is_admin():
+        raise PermissionDenied("Only admins can export the audit trail")
+
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest("format must be csv or jsonl")
+    try:
+        filters = {
+            'user_id': int(request.GET['user']) if request.GET.get('user') else None,
+            'document_id': int(request.GET['document']) if request.GET.get('document') else None,
+            'action': request.GET.get('action') or None,
+            'since': parse_moment(request.GET.get('since')),
+            'until': parse_moment(request.GET.get('until')),
+            'after': export.parse_checkpoint(request.GET['after']) if request.GET.get('after') else None,
+        }
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    compress = request.GET.get('gzip') in ('1', 'true')
+    filename = f"audit-trail.{fmt}" + ('.gz' if compress else '')
+    response = StreamingHttpResponse(
+        export.stream_export(
+            export.audit_records(**filters),
+            fmt=fmt,
+            compress=compress,
+            header=filters['after'] is None
+        ),
+        content_type='application/gzip' if compress else export.FORMATS[fmt]
+    )
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,113 @@
+"""
+Cached dashboard, shared by every user.
+
+The dashboard context (status counts and recent audit rows) and the HTML
+fragment rendered from it are kept in the default Django cache. An entry
+is fresh for DASHBOARD_CACHE_TTL seconds. After that, or once invalidate()
+was called, it is stale. A stale entry is still served for up to
+DASHBOARD_CACHE_STALE seconds while a single background thread rebuilds
+it. Only a missing entry is built during the request.
+
+invalidate() bumps a version number rather than deleting entries, so
+frequent writes never make every reader rebuild at once. It is called
+after commit for saved or deleted documents and for new audit rows, see
+dashboard.signals.
+
+With the default per-process LocMemCache every process keeps its own
+copy. Configure a shared CACHES backend to share it between processes.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import render_to_string
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'dashboard:version'
+CONTEXT_KEY = 'dashboard:context'
+FRAGMENT_KEY = 'dashboard:overview'
+
+
+def invalidate():
+    """Mark every dashboard entry stale."""
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Evicted between add() and incr(); a missing version is stale too.
+        pass
+
+
+def _store(key, version, value):
+    cache.set(
+        key,
+        (version, time.time() + settings.DASHBOARD_CACHE_TTL, value),
+        settings.DASHBOARD_CACHE_TTL + settings.DASHBOARD_CACHE_STALE
+    )
+
+
+def _refresh(key, version, build):
+    try:
+        _store(key, version, build())
+    except Exception:
+        logger.exception("Could not refresh %s", key)
+    finally:
+        cache.delete(f'{key}:refreshing')
+        connection.close()
+
+
+def get_or_build(key, build, stale_ok=True):
+    """
+    The cached value of `key`. It is built with build() when missing, or
+    when stale and not `stale_ok`; a stale value is refreshed in the background.
+    """
+    values = cache.get_many([key, VERSION_KEY])
+    version = values.get(VERSION_KEY, 0)
+    entry = values.get(key)
+    stale = entry is None or entry[0] != version or entry[1] < time.time()
+    if entry is None or (stale and not stale_ok):
+        value = build()
+        _store(key, version, value)
+        return value
+
+    value = entry[2]
+    if stale:
+        # Only the first reader to see the entry stale starts a refresh.
+        if cache.add(f'{key}:refreshing', True, settings.DASHBOARD_CACHE_STALE):
+            threading.Thread(target=_refresh, args=(key, version, build), daemon=True).start()
+    return value
+
+
+def build_context():
+    from audit.models import AuditTrail
+    from reports.counters import status_counts
+
+    counts = status_counts()
+    return {
+        'total_documents': counts['total'],
+        'approved_documents': counts.get('APPROVED', 0),
+        'rejected_documents': counts.get('REJECTED', 0),
+        'pending_documents': counts.get('REVIEW', 0),
+        'recent_activities': list(
+            AuditTrail.objects.select_related('user', 'document').order_by('-timestamp')[:10]
+        ),
+    }
+
+
+def get_context():
+    return get_or_build(CONTEXT_KEY, build_context)
+
+
+def build_overview():
+    # A fragment is only rebuilt from a fresh context.
+    context = get_or_build(CONTEXT_KEY, build_context, stale_ok=False)
+    return render_to_string('dashboard/overview.html', context)
+
+
+def get_overview():
+    """The rendered counts and recent activity, identical for every user."""
+    return get_or_build(FRAGMENT_KEY, build_overview)
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from activity.signals import events_written
+from audit.models import AuditTrail
+from documents.models import Document
+from documents.signals import documents_bulk_created, documents_bulk_state_changed
+from .cache import invalidate
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+@receiver(documents_bulk_created, sender=Document)
+@receiver(documents_bulk_state_changed, sender=Document)
+@receiver(post_save, sender=AuditTrail)
+@receiver(events_written, sender=AuditTrail)
+def invalidate_dashboard(sender, **kwargs):
+    transaction.on_commit(invalidate)
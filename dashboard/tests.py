@@ -1,3 +1,64 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from audit.models import AuditTrail
+from documents.models import Document
+from . import cache as dashboard_cache
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, ACTIVITY_BUFFER_ENABLED=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user('owner', password='x', role='USER')
+
+    def create_document(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            Document.objects.create(
+                title=title, file=ContentFile(title.encode(), name='doc.txt'), uploaded_by=self.user
+            )
+
+    def read_stale_then_rebuild(self):
+        """Read the context while it is stale, then run the refresh that read started."""
+        with mock.patch.object(dashboard_cache.threading, 'Thread') as thread:
+            stale = dashboard_cache.get_context()
+        thread.assert_called_once()
+        # The refresh closes its thread's connection, which here is the test's.
+        with mock.patch.object(dashboard_cache, 'connection'):
+            thread.call_args.kwargs['target'](*thread.call_args.kwargs['args'])
+        return stale, dashboard_cache.get_context()
+
+    def test_document_save_makes_the_next_read_stale(self):
+        self.create_document('First')
+        self.assertEqual(dashboard_cache.get_context()['total_documents'], 1)
+
+        self.create_document('Second')
+        stale, rebuilt = self.read_stale_then_rebuild()
+        self.assertEqual(stale['total_documents'], 1)
+        self.assertEqual(rebuilt['total_documents'], 2)
+
+    def test_audit_row_makes_the_next_read_stale(self):
+        self.assertEqual(dashboard_cache.get_context()['recent_activities'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event = AuditTrail.objects.create(user=self.user, action='VIEW')
+        stale, rebuilt = self.read_stale_then_rebuild()
+        self.assertEqual(stale['recent_activities'], [])
+        self.assertEqual(rebuilt['recent_activities'], [event])
+
+    def test_fresh_reads_are_served_from_the_cache(self):
+        dashboard_cache.get_overview()
+        with self.assertNumQueries(0), mock.patch.object(dashboard_cache.threading, 'Thread') as thread:
+            dashboard_cache.get_overview()
+        thread.assert_not_called()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Document, Metadata
+from .models import Document, Metadata, Blob, UploadSession
 
 class MetadataInline(admin.TabularInline):
     model = Metadata
@@ -11,3 +11,15 @@ class DocumentAdmin(admin.ModelAdmin):
     inlines = [MetadataInline]
 
 admin.site.register(Metadata)
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('digest', 'name', 'size', 'ref_count', 'created_at')
+    search_fields = ('digest',)
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'user', 'offset', 'size', 'status', 'created_at', 'expires_at')
+    list_filter = ('status',)
@@ -1,8 +1,60 @@
 from rest_framework import serializers
-from documents.models import Document
+from documents.models import Document, UploadSession
+from ecms.api import SparseFieldsSerializerMixin
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Document
-        fields = '__all__'
+        fields = [
+            'id',
+            'title',
+            'file',
+            'file_size',
+            'status',
+            'created_at',
+            'updated_at',
+            'is_deleted',
+            'submitted_for_review_at',
+            'reviewed_at',
+            'review_comments',
+            'folder',
+            'category',
+            'uploaded_by',
+            'reviewed_by',
+        ]
         read_only_fields = ['uploaded_by', 'status']
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id',
+            'filename',
+            'size',
+            'offset',
+            'title',
+            'folder',
+            'category',
+            'status',
+            'sha256',
+            'document',
+            'created_at',
+            'expires_at',
+        ]
+        read_only_fields = ['offset', 'status', 'sha256', 'document', 'created_at', 'expires_at']
+
+
+class BulkIngestEntrySerializer(serializers.Serializer):
+    """One manifest entry; `file` is the name of an uploaded file."""
+    file = serializers.CharField()
+    title = serializers.CharField(max_length=255, required=False)
+    folder = serializers.IntegerField(required=False, allow_null=True)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    metadata = serializers.DictField(child=serializers.CharField(max_length=255), required=False)
+
+    def validate_metadata(self, value):
+        for key in value:
+            if len(key) > 100:
+                raise serializers.ValidationError("Metadata names are limited to 100 characters")
+        return value
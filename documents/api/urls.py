@@ -1,6 +1,18 @@
 from django.urls import path
-from .views import DocumentListCreateAPI
+from .views import (
+    BulkDocumentIngestAPI,
+    DocumentListCreateAPI,
+    DocumentSearchAPI,
+    UploadSessionCreateAPI,
+    UploadSessionDetailAPI,
+    UploadSessionCompleteAPI,
+)
 
 urlpatterns = [
     path('documents/', DocumentListCreateAPI.as_view()),
-]
\ No newline at end of file
+    path('documents/search/', DocumentSearchAPI.as_view()),
+    path('documents/bulk/', BulkDocumentIngestAPI.as_view()),
+    path('uploads/', UploadSessionCreateAPI.as_view()),
+    path('uploads/<uuid:pk>/', UploadSessionDetailAPI.as_view()),
+    path('uploads/<uuid:pk>/complete/', UploadSessionCompleteAPI.as_view()),
+]
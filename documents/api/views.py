@@ -1,14 +1,266 @@
-from rest_framework import generics
+import json
+import re
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from documents.models import Document
-from .serializers import DocumentSerializer
+from rest_framework.views import APIView
+from documents import ingest, uploads
+from documents.models import Document, UploadSession
+from ecms.api import ConditionalGetMixin, SparseFieldsMixin
+from ecms.pagination import KeysetPagination
+from search.backends import get_search_backend
+from folders.models import Category, Folder
+from .serializers import BulkIngestEntrySerializer, DocumentSerializer, UploadSessionSerializer
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+
 
-class DocumentListCreateAPI(generics.ListCreateAPIView):
+class DocumentListCreateAPI(ConditionalGetMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     serializer_class = DocumentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Document.objects.filter(uploaded_by=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(uploaded_by=self.request.user)
\ No newline at end of file
+        serializer.save(uploaded_by=self.request.user)
+
+
+class DocumentSearchAPI(ConditionalGetMixin, generics.ListAPIView):
+    """
+    GET ?q=terms[&limit=n] returns the documents visible to the user, best match first.
+    """
+    serializer_class = DocumentSerializer
+    permission_classes = [IsAuthenticated]
+    max_limit = 100
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            return Document.objects.none()
+
+        documents = Document.objects.active().visible_to(self.request.user)
+
+        try:
+            limit = min(int(self.request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            limit = 20
+        return get_search_backend().search(documents, query, limit=max(limit, 1))
+
+
+class BulkDocumentIngestAPI(APIView):
+    """
+    POST multipart/form-data with any number of `files` and an optional
+    `manifest`: a JSON list of {file, title, folder, category, metadata}
+    where `file` names one of the uploaded files. Files without a manifest
+    entry are titled after their file name. Creates DRAFT documents.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not request.user.can_upload_document():
+            return Response(
+                {'error': 'You do not have permission to upload documents'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        files = request.FILES.getlist('files')
+        if not files:
+            return Response({'error': 'No files uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > settings.BULK_INGEST_MAX_FILES:
+            return Response(
+                {'error': f'At most {settings.BULK_INGEST_MAX_FILES} files per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            manifest = json.loads(request.data.get('manifest') or '[]')
+        except ValueError:
+            return Response({'error': 'manifest is not valid JSON'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = BulkIngestEntrySerializer(data=manifest, many=True)
+        serializer.is_valid(raise_exception=True)
+        entries = {entry['file']: entry for entry in serializer.validated_data}
+
+        unknown = set(entries) - {f.name for f in files}
+        if unknown:
+            return Response(
+                {'error': f"Manifest names files that were not uploaded: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Check every referenced folder and category with one query each.
+        folder_ids = {entry['folder'] for entry in entries.values() if entry.get('folder')}
+        category_ids = {entry['category'] for entry in entries.values() if entry.get('category')}
+        missing = (
+            folder_ids - set(Folder.objects.filter(pk__in=folder_ids).values_list('pk', flat=True))
+            or category_ids - set(Category.objects.filter(pk__in=category_ids).values_list('pk', flat=True))
+        )
+        if missing:
+            return Response(
+                {'error': f"Unknown folder or category: {', '.join(map(str, sorted(missing)))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        items = []
+        for uploaded in files:
+            entry = entries.get(uploaded.name, {})
+            items.append(ingest.IngestItem(
+                uploaded.name,
+                title=entry.get('title'),
+                file=uploaded,
+                folder_id=entry.get('folder'),
+                category_id=entry.get('category'),
+                metadata=entry.get('metadata')
+            ))
+
+        documents = ingest.ingest(items, request.user, ip_address=request.META.get('REMOTE_ADDR'))
+        return Response(
+            {
+                'created': len(documents),
+                'documents': [{'id': d.pk, 'title': d.title, 'file': d.file.name} for d in documents],
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+def upload_response(session, status_code=status.HTTP_200_OK):
+    response = Response(UploadSessionSerializer(session).data, status=status_code)
+    response['Upload-Offset'] = str(session.offset)
+    response['Upload-Length'] = str(session.size)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+class UploadSessionCreateAPI(APIView):
+    """
+    POST {filename, size, title, folder, category} to start a resumable upload.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            session = uploads.create_session(
+                request.user,
+                filename=data['filename'],
+                size=data['size'],
+                title=data['title'],
+                folder=data.get('folder'),
+                category=data.get('category')
+            )
+        except PermissionDenied as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValidationError as e:
+            return Response({'error': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = upload_response(session, status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(f'{session.pk}/')
+        return response
+
+
+class UploadSessionDetailAPI(APIView):
+    """
+    GET/HEAD reports the current offset so an interrupted upload can resume.
+    PUT with 'Content-Range: bytes start-end/total' or PATCH with
+    'Upload-Offset: start' appends the request body. DELETE aborts.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_session(self, request, pk):
+        return get_object_or_404(
+            UploadSession,
+            pk=pk,
+            user=request.user,
+            expires_at__gt=timezone.now()
+        )
+
+    def get(self, request, pk):
+        return upload_response(self.get_session(request, pk))
+
+    def head(self, request, pk):
+        return self.get(request, pk)
+
+    def put(self, request, pk):
+        match = CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+        if not match:
+            return Response(
+                {'error': 'Content-Range header "bytes start-end/total" is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end = int(match.group(1)), int(match.group(2))
+        return self.write(request, pk, start, end - start + 1)
+
+    def patch(self, request, pk):
+        offset = request.headers.get('Upload-Offset', '')
+        if not offset.isdigit():
+            return Response(
+                {'error': 'Upload-Offset header is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self.write(request, pk, int(offset), None)
+
+    def write(self, request, pk, offset, length):
+        session = self.get_session(request, pk)
+
+        content_length = request.headers.get('Content-Length', '')
+        if not content_length.isdigit():
+            return Response(
+                {'error': 'Content-Length header is required'},
+                status=status.HTTP_411_LENGTH_REQUIRED
+            )
+        if length is None:
+            length = int(content_length)
+        elif length != int(content_length):
+            return Response(
+                {'error': 'Content-Range does not match Content-Length'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            checksum = uploads.parse_checksum(request.headers.get('Upload-Checksum'))
+            # Read the raw body stream, never request.data, so nothing is buffered.
+            uploads.write_chunk(session, offset, request.stream, length, checksum)
+        except uploads.UploadConflict as e:
+            response = Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+            response['Upload-Offset'] = str(e.offset)
+            return response
+        except ValidationError as e:
+            return Response({'error': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        return upload_response(session)
+
+    def delete(self, request, pk):
+        session = self.get_session(request, pk)
+        if session.status == 'ACTIVE':
+            uploads.abort_session(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionCompleteAPI(APIView):
+    """
+    POST once every byte has been received to create the Document.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        try:
+            document = uploads.complete_session(session)
+        except ValidationError as e:
+            return Response({'error': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        from activity.events import log_activity
+        log_activity(
+            user=request.user,
+            document=document,
+            action='UPLOAD'
+        )
+        return Response(DocumentSerializer(document).data, status=status.HTTP_201_CREATED)
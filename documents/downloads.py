@@ -0,0 +1,160 @@
+"""
+Serving stored document files.
+
+serve_file() answers conditional requests (ETag / Last-Modified), single
+byte ranges for viewers that seek, and can hand the transfer over to the
+front proxy with X-Sendfile or X-Accel-Redirect so Python workers are not
+tied up streaming large files. Permission checks stay in the views.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from .storage import HASH_CHUNK_SIZE, digest_from_name
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def download_filename(title, name):
+    """The stored name is a content hash, so offer the document title instead."""
+    extension = posixpath.splitext(name)[1]
+    if extension and not title.lower().endswith(extension.lower()):
+        return f"{title}{extension}"
+    return title or posixpath.basename(name)
+
+
+def file_etag(name, size, mtime):
+    digest = digest_from_name(name)
+    if digest:
+        return f'"{digest}"'
+    return f'"{size:x}-{int(mtime):x}"'
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single 'bytes=' range, None to serve the whole
+    file, or False if the range cannot be satisfied. Multiple ranges are
+    answered with the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def range_iterator(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(HASH_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def offload_response(name, path):
+    backend = getattr(settings, 'SENDFILE_BACKEND', None)
+    if backend == 'xsendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    if backend == 'xaccel':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.SENDFILE_URL_PREFIX.rstrip('/') + '/' + quote(name)
+        return response
+    return None
+
+
+def is_initial_request(request):
+    """False for follow-up range requests, so a download is audited once."""
+    header = request.headers.get('Range', '')
+    return not header or header.replace(' ', '').startswith('bytes=0-')
+
+
+def serve_file(request, fieldfile, filename, as_attachment=False):
+    name = fieldfile.name
+    path = fieldfile.storage.path(name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("The file of this document is missing")
+    size = stat.st_size
+    etag = file_etag(name, size, stat.st_mtime)
+    last_modified = int(stat.st_mtime)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    response = offload_response(name, path)
+    if response is not None:
+        # The proxy handles Range itself; it only needs the headers.
+        response['Content-Type'] = content_type
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    else:
+        byte_range = None
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if range_header and (
+            not if_range
+            or if_range == etag
+            or parse_http_date_safe(if_range) == last_modified
+        ):
+            byte_range = parse_range(range_header, size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                range_iterator(path, start, length),
+                status=206,
+                content_type=content_type
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        else:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                raise Http404("The file of this document is missing")
+            response = FileResponse(
+                f,
+                as_attachment=as_attachment,
+                filename=filename,
+                content_type=content_type
+            )
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
@@ -0,0 +1,148 @@
+"""
+Bulk document ingest.
+
+Files are hashed and copied into blob storage by a thread pool (hashlib and
+file I/O release the GIL) while the previous chunk is written to the
+database. Each chunk is one transaction that inserts the Document,
+DocumentVersion, AuditTrail, ActivityLog and Metadata rows with
+bulk_create(). Document.save() is bypassed, so blob references are taken
+here and documents_bulk_created lets counters and the search index catch up.
+"""
+import posixpath
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Blob, Document, Metadata
+from .storage import blob_storage, hash_file
+
+
+class IngestItem:
+    """
+    One file to ingest: either a local `path` or an uploaded `file`.
+    Folder and category are given by id so no rows are fetched per item.
+    """
+
+    def __init__(self, filename, title=None, path=None, file=None,
+                 folder_id=None, category_id=None, metadata=None):
+        self.filename = posixpath.basename(filename)
+        self.title = (title or self.filename)[:255]
+        self.path = path
+        self.file = file
+        self.folder_id = folder_id
+        self.category_id = category_id
+        self.metadata = metadata or {}
+
+
+def store_item(item):
+    """Put the item's bytes into blob storage and return (blob name, size)."""
+    extension = posixpath.splitext(item.filename)[1]
+    path = item.path
+    if path is None and hasattr(item.file, 'temporary_file_path'):
+        path = item.file.temporary_file_path()
+    if path is not None:
+        digest, size = hash_file(path)
+        return blob_storage.copy_in(path, digest, extension), size
+    return blob_storage.save(item.filename, item.file), item.file.size
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def _write_chunk(user, items, stored, ip_address=None):
+    from activity.models import ActivityLog
+    from audit.models import AuditTrail
+    from versions.models import DocumentVersion
+    from .signals import documents_bulk_created
+
+    with transaction.atomic():
+        # The files were stored before this transaction: lock their blobs and
+        # store any that a concurrent release() removed in the meantime.
+        Blob.hold({name for name, _ in stored})
+        for item, (name, _) in zip(items, stored):
+            if not blob_storage.exists(name):
+                store_item(item)
+
+        documents = Document.objects.bulk_create([
+            Document(
+                title=item.title,
+                file=name,
+                file_size=size,
+                folder_id=item.folder_id,
+                category_id=item.category_id,
+                uploaded_by=user,
+                status='DRAFT'
+            )
+            for item, (name, size) in zip(items, stored)
+        ])
+        DocumentVersion.objects.bulk_create([
+            DocumentVersion(
+                document=document,
+                file=document.file.name,
+                version_number=1,
+                created_by=user
+            )
+            for document in documents
+        ])
+        AuditTrail.objects.bulk_create([
+            AuditTrail(
+                user=user,
+                document=document,
+                action='UPLOAD',
+                ip_address=ip_address,
+                description="Document uploaded with status: DRAFT (bulk ingest)"
+            )
+            for document in documents
+        ])
+        ActivityLog.objects.bulk_create([
+            ActivityLog(user=user, document=document, action='UPLOAD')
+            for document in documents
+        ])
+        Metadata.objects.bulk_create([
+            Metadata(document=document, attribute_name=str(key)[:100], attribute_value=str(value)[:255])
+            for item, document in zip(items, documents)
+            for key, value in item.metadata.items()
+        ])
+
+        # The document and its first version each hold a reference.
+        references = Counter()
+        for name, _ in stored:
+            references[name] += 2
+        Blob.acquire_many(references)
+
+        documents_bulk_created.send(sender=Document, documents=documents)
+    return documents
+
+
+def ingest_chunks(items, user, chunk_size=None, workers=None, ip_address=None):
+    """
+    Ingest `items` (an iterable of IngestItem) as DRAFT documents owned by
+    `user`, yielding the list of created documents after each committed
+    chunk. Storing chunk n+1 overlaps with writing chunk n.
+    """
+    chunk_size = chunk_size or settings.BULK_INGEST_CHUNK_SIZE
+    workers = workers or settings.BULK_INGEST_WORKERS
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = None
+        for chunk in _chunks(items, chunk_size):
+            futures = [executor.submit(store_item, item) for item in chunk]
+            if pending is not None:
+                yield _write_chunk(user, pending[0], [f.result() for f in pending[1]], ip_address)
+            pending = (chunk, futures)
+        if pending is not None:
+            yield _write_chunk(user, pending[0], [f.result() for f in pending[1]], ip_address)
+
+
+def ingest(items, user, chunk_size=None, workers=None, ip_address=None):
+    """Ingest everything and return the created documents."""
+    documents = []
+    for created in ingest_chunks(items, user, chunk_size, workers, ip_address):
+        documents.extend(created)
+    return documents
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from documents import uploads
+from documents.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = "Remove expired or aborted chunked upload sessions and their part files."
+
+    def handle(self, *args, **options):
+        sessions = UploadSession.objects.exclude(status='COMPLETE').filter(
+            expires_at__lte=timezone.now()
+        ) | UploadSession.objects.filter(status='ABORTED')
+
+        removed = 0
+        for session in sessions.iterator():
+            if session.status == 'ACTIVE':
+                uploads.abort_session(session)
+            session.delete()
+            removed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} upload session(s)."))
@@ -0,0 +1,111 @@
+import hashlib
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from documents import ingest
+from documents.models import Metadata
+from folders.models import Category, Folder
+
+SOURCE_PATH_ATTRIBUTE = 'source_path'
+
+
+def source_path_value(relative):
+    """
+    The metadata value recording `relative`. Paths too long for the column
+    keep a prefix followed by '#' and their SHA-256, so --resume still
+    recognises them.
+    """
+    max_length = Metadata._meta.get_field('attribute_value').max_length
+    if len(relative) <= max_length:
+        return relative
+    digest = hashlib.sha256(relative.encode()).hexdigest()
+    return f"{relative[:max_length - len(digest) - 1]}#{digest}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a directory tree as DRAFT documents. Sub-directories become "
+        "Folders; every file keeps its relative path as 'source_path' metadata."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--user', required=True, help="Username that will own the documents")
+        parser.add_argument('--category', help="Category name for every document")
+        parser.add_argument('--folder', type=int, help="Id of the Folder to import into")
+        parser.add_argument('--chunk-size', type=int, help="Documents per transaction")
+        parser.add_argument('--workers', type=int, help="Threads hashing and copying files")
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help="Skip files whose source_path was already imported by this user"
+        )
+
+    def handle(self, *args, **options):
+        root = os.path.abspath(options['directory'])
+        if not os.path.isdir(root):
+            raise CommandError(f"{root} is not a directory")
+
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        category = None
+        if options['category']:
+            category, _ = Category.objects.get_or_create(name=options['category'])
+
+        parent = None
+        if options['folder']:
+            try:
+                parent = Folder.objects.get(pk=options['folder'])
+            except Folder.DoesNotExist:
+                raise CommandError(f"Folder {options['folder']} does not exist")
+
+        skip = set()
+        if options['resume']:
+            skip = set(
+                Metadata.objects.filter(
+                    attribute_name=SOURCE_PATH_ATTRIBUTE,
+                    document__uploaded_by=user
+                ).values_list('attribute_value', flat=True)
+            )
+
+        items = self.walk(root, user, parent, category, skip)
+        imported = 0
+        for documents in ingest.ingest_chunks(
+            items, user, chunk_size=options['chunk_size'], workers=options['workers']
+        ):
+            imported += len(documents)
+            self.stdout.write(f"Imported {imported} document(s)...")
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} document(s) from {root}."))
+
+    def walk(self, root, user, parent, category, skip):
+        """Yield an IngestItem per file, creating Folders lazily as directories are entered."""
+        folders = {root: parent}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            folder = folders[dirpath]
+            for name in dirnames:
+                folders[os.path.join(dirpath, name)], _ = Folder.objects.get_or_create(
+                    name=name,
+                    parent=folder,
+                    defaults={'created_by': user}
+                )
+
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                source_path = source_path_value(os.path.relpath(path, root))
+                if source_path in skip or not os.path.isfile(path):
+                    continue
+                yield ingest.IngestItem(
+                    name,
+                    title=os.path.splitext(name)[0] or name,
+                    path=path,
+                    folder_id=folder.pk if folder else None,
+                    category_id=category.pk if category else None,
+                    metadata={SOURCE_PATH_ATTRIBUTE: source_path}
+                )
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 12:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_uploadsession'),
+        ('folders', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['uploaded_by', 'is_deleted', '-created_at', '-id'], name='documents_d_uploade_67b794_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['is_deleted', '-created_at', '-id'], name='documents_d_is_dele_b42692_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['status', 'is_deleted', '-submitted_for_review_at'], name='documents_d_status_4722cc_idx'),
+        ),
+    ]
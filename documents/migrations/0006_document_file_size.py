@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-17 13:06
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_file_sizes(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    Blob = apps.get_model('documents', 'Blob')
+    blob_sizes = dict(Blob.objects.values_list('name', 'size'))
+
+    batch = []
+    for document in Document.objects.only('id', 'file').iterator(chunk_size=1000):
+        size = blob_sizes.get(document.file.name)
+        if size is None:
+            try:
+                size = os.path.getsize(os.path.join(settings.MEDIA_ROOT, document.file.name))
+            except OSError:
+                size = 0
+        document.file_size = size
+        batch.append(document)
+        if len(batch) >= 1000:
+            Document.objects.bulk_update(batch, ['file_size'])
+            batch = []
+    Document.objects.bulk_update(batch, ['file_size'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_document_documents_d_uploade_67b794_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='file_size',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_file_sizes, migrations.RunPython.noop),
+    ]
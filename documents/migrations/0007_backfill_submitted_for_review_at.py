@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 13:50
+
+from django.db import migrations
+from django.db.models import F
+
+
+def backfill_submitted_for_review_at(apps, schema_editor):
+    # Documents put into REVIEW without being submitted are queued by creation time.
+    Document = apps.get_model('documents', 'Document')
+    Document.objects.filter(status='REVIEW', submitted_for_review_at__isnull=True).update(
+        submitted_for_review_at=F('created_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_document_file_size'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_submitted_for_review_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-17 13:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0007_backfill_submitted_for_review_at'),
+        ('folders', '0002_folder_depth_folder_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='document',
+            name='documents_d_status_4722cc_idx',
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['status', '-submitted_for_review_at', '-id'], name='documents_pending_review_idx'),
+        ),
+    ]
@@ -1,12 +1,46 @@
-from django.db import models
+import uuid
+from functools import partial
+
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
 from django.core.exceptions import ValidationError, PermissionDenied
+from ecms.tracking import TrackedFieldsMixin
 from folders.models import Folder, Category
+from .storage import blob_storage, digest_from_name
 
 User = settings.AUTH_USER_MODEL
 
 
-class Document(models.Model):
+class DocumentQuerySet(models.QuerySet):
+    """
+    The rules of User.can_view_document() and friends as SQL filters, so
+    lists are filtered by the database instead of checked one by one.
+    """
+
+    def active(self):
+        return self.filter(is_deleted=False)
+
+    def visible_to(self, user):
+        if user.is_admin() or user.is_reviewer():
+            return self.all()
+        return self.filter(uploaded_by=user)
+
+    def editable_by(self, user):
+        if user.is_admin():
+            return self.all()
+        return self.filter(uploaded_by=user, status__in=Document.EDITABLE_STATUSES)
+
+    def deletable_by(self, user):
+        return self.editable_by(user)
+
+    def reviewable_by(self, user):
+        if not user.is_reviewer() and not user.is_admin():
+            return self.none()
+        return self.exclude(uploaded_by=user)
+
+
+class Document(TrackedFieldsMixin, models.Model):
     STATUS_CHOICES = (
         ('DRAFT', 'Draft'),
         ('REVIEW', 'Under Review'),
@@ -15,8 +49,16 @@ class Document(models.Model):
         ('ARCHIVED', 'Archived'),
     )
 
+    EDITABLE_STATUSES = ('DRAFT', 'REJECTED')
+
+    # Fields that decide which status counters a document contributes to,
+    # see reports.counters
+    COUNTED_FIELDS = ('status', 'is_deleted', 'uploaded_by_id', 'folder_id', 'category_id', 'file_size')
+    untracked_fields = ('updated_at',)
+
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to='documents/')
+    file = models.FileField(upload_to='documents/', storage=blob_storage)
+    file_size = models.BigIntegerField(default=0, editable=False)
     folder = models.ForeignKey(
         Folder,
         on_delete=models.SET_NULL,
@@ -51,14 +93,29 @@ class Document(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     review_comments = models.TextField(blank=True)
 
+    objects = DocumentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the document lists, see ecms.pagination
+            models.Index(fields=['uploaded_by', 'is_deleted', '-created_at', '-id']),
+            models.Index(fields=['is_deleted', '-created_at', '-id']),
+            # Pending reviews; partial so the ordering is read from the index
+            models.Index(
+                fields=['status', '-submitted_for_review_at', '-id'],
+                condition=models.Q(is_deleted=False),
+                name='documents_pending_review_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
     def can_be_edited(self):
-        return self.status in ['DRAFT', 'REJECTED']
+        return self.status in self.EDITABLE_STATUSES
 
     def can_be_submitted_for_review(self):
-        return self.status in ['DRAFT', 'REJECTED']
+        return self.status in self.EDITABLE_STATUSES
 
     def can_be_reviewed(self):
         return self.status == 'REVIEW'
@@ -68,7 +125,7 @@ class Document(models.Model):
             return True
 
         if self.status == 'DRAFT' and new_status == 'REVIEW':
-            if self.uploaded_by != user:
+            if self.uploaded_by_id != user.pk:
                 raise PermissionDenied("Only the document owner can submit for review")
             return True
         elif self.status == 'REVIEW' and new_status in ['APPROVED', 'REJECTED']:
@@ -76,7 +133,7 @@ class Document(models.Model):
                 raise PermissionDenied("You cannot review this document")
             return True
         elif self.status == 'REJECTED' and new_status in ['DRAFT', 'REVIEW']:
-            if self.uploaded_by != user:
+            if self.uploaded_by_id != user.pk:
                 raise PermissionDenied("Only the document owner can resubmit")
             return True
         elif user.is_admin():
@@ -87,82 +144,151 @@ class Document(models.Model):
     def submit_for_review(self, user):
         if not self.can_be_submitted_for_review():
             raise ValidationError(f"Document in {self.status} status cannot be submitted for review")
-        if self.uploaded_by != user and not user.is_admin():
+        if self.uploaded_by_id != user.pk and not user.is_admin():
             raise PermissionDenied("Only the document owner can submit for review")
         
         from django.utils import timezone
         self.status = 'REVIEW'
         self.submitted_for_review_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.save()
+            if settings.REVIEW_AUTO_ASSIGN:
+                from workflows.approval import get_tally
+                from workflows.scheduler import assign_reviewer
+                if not get_tally(self.pk).pending:
+                    assign_reviewer(self, user)
 
-    def update_status(self):
-        tasks = self.workflow_tasks.all()
+    def update_status(self, tally=None):
+        """Set the status from the review task tally under APPROVAL_RULE, see workflows.approval."""
+        from workflows.approval import derive_status, get_tally
 
-        if tasks.filter(status='REJECTED').exists():
-            self.status = 'REJECTED'
-        elif tasks.exists() and all(task.status == 'APPROVED' for task in tasks):
-            self.status = 'APPROVED'
-        elif tasks.exists():
-            self.status = 'REVIEW'
-        else:
-            self.status = 'DRAFT'
+        self.status = derive_status(tally if tally is not None else get_tally(self.pk))
+        update_fields = ['status', 'submitted_for_review_at'] if self._mark_submitted() else ['status']
+
+        with transaction.atomic():
+            old_state = self.counted_state(self._get_loaded_values())
+            super().save(update_fields=update_fields)
+            self._store_loaded_values(update_fields)
+            self._send_state_changed(old_state, self.counted_state(self._loaded_values))
+
+    def _mark_submitted(self):
+        """
+        Stamp submitted_for_review_at on a document in REVIEW without one,
+        however it got there; pending reviews are ordered by it.
+        """
+        if self.status != 'REVIEW' or self.submitted_for_review_at is not None:
+            return False
+        from django.utils import timezone
+        self.submitted_for_review_at = timezone.now()
+        return True
 
-        super().save(update_fields=['status'])
+    def counted_state(self, values=None):
+        if values is None:
+            return {name: getattr(self, name) for name in self.COUNTED_FIELDS}
+        return {
+            name: values[name] if name in values else getattr(self, name)
+            for name in self.COUNTED_FIELDS
+        }
+
+    def _send_state_changed(self, old_state, new_state):
+        if old_state == new_state:
+            return
+        from .signals import document_state_changed
+        document_state_changed.send(
+            sender=Document,
+            document=self,
+            old_state=old_state,
+            new_state=new_state
+        )
 
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        old_status = None
-        
-        if not is_new:
-            try:
-                old_instance = Document.objects.get(pk=self.pk)
-                old_status = old_instance.status
-            except Document.DoesNotExist:
-                pass
-        
-        super().save(*args, **kwargs)
-
-        from versions.models import DocumentVersion
-        from audit.models import AuditTrail
-
-        if is_new:
-            version_number = 1
-            DocumentVersion.objects.create(
-                document=self,
-                file=self.file,
-                version_number=version_number,
-                created_by=self.uploaded_by
-            )
-            AuditTrail.objects.create(
-                user=self.uploaded_by,
-                document=self,
-                action='UPLOAD',
-                description=f"Document uploaded with status: {self.status}"
-            )
-        else:
-            last_version = self.versions.order_by('-version_number').first()
-            version_number = last_version.version_number + 1 if last_version else 1
-
-            DocumentVersion.objects.create(
-                document=self,
-                file=self.file,
-                version_number=version_number,
-                created_by=self.uploaded_by
-            )
+        with transaction.atomic():
+            is_new = self.pk is None
+            changed = set()
+            old_file = old_status = old_state = None
+
+            if not is_new:
+                changed = self.get_changed_fields()
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None:
+                    changed &= set(update_fields)
+                old_file = self._loaded_values.get('file')
+                old_status = self._loaded_values.get('status')
+                old_state = self.counted_state(self._loaded_values)
+
+            if is_new or 'file' in changed:
+                self.file_size = self.file.size
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'file_size'}
+
+            if self._mark_submitted() and kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'submitted_for_review_at'}
+
+            super().save(*args, **kwargs)
+            self._store_loaded_values(kwargs.get('update_fields'))
+            self._send_state_changed(old_state, self.counted_state(self._loaded_values))
 
-            if old_status and old_status != self.status:
-                AuditTrail.objects.create(
-                    user=self.reviewed_by if self.reviewed_by else self.uploaded_by,
+            from versions.models import DocumentVersion
+            from activity.events import log_audit
+
+            if is_new:
+                Blob.acquire(self.file.name)
+                DocumentVersion.objects.create(
+                    document=self,
+                    file=self.file,
+                    version_number=1,
+                    created_by_id=self.uploaded_by_id
+                )
+                log_audit(
+                    user_id=self.uploaded_by_id,
+                    document=self,
+                    action='UPLOAD',
+                    description=f"Document uploaded with status: {self.status}"
+                )
+                return
+
+            if 'file' in changed:
+                Blob.acquire(self.file.name)
+                if old_file:
+                    Blob.release(old_file)
+
+                last_version = self.versions.order_by('-version_number').values_list(
+                    'version_number', flat=True
+                ).first()
+                version_number = last_version + 1 if last_version else 1
+                DocumentVersion.objects.create(
+                    document=self,
+                    file=self.file,
+                    version_number=version_number,
+                    created_by_id=self.uploaded_by_id
+                )
+                log_audit(
+                    user_id=self.uploaded_by_id,
+                    document=self,
+                    action='UPDATE',
+                    description=f"New file uploaded as version {version_number}"
+                )
+
+            if 'status' in changed:
+                log_audit(
+                    user_id=self.reviewed_by_id or self.uploaded_by_id,
                     document=self,
                     action='UPDATE',
                     description=f"Document status changed from {old_status} to {self.status}"
                 )
-            else:
-                AuditTrail.objects.create(
-                    user=self.uploaded_by,
+            elif 'is_deleted' in changed and self.is_deleted:
+                log_audit(
+                    user_id=self.uploaded_by_id,
+                    document=self,
+                    action='DELETE',
+                    description="Document deleted"
+                )
+            elif changed - {'file'}:
+                log_audit(
+                    user_id=self.uploaded_by_id,
                     document=self,
                     action='UPDATE',
-                    description="Document updated"
+                    description=f"Document updated: {', '.join(sorted(changed - {'file'}))}"
                 )
 
 
@@ -177,3 +303,135 @@ class Metadata(models.Model):
 
     def __str__(self):
         return f"{self.attribute_name}: {self.attribute_value}"
+
+
+class Blob(models.Model):
+    """
+    Reference count for a content-addressed file in blob_storage.
+    Every Document and DocumentVersion row pointing at the blob holds one reference.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count} refs)"
+
+    @classmethod
+    def acquire(cls, name):
+        digest = digest_from_name(name)
+        if digest is None:
+            return
+        with transaction.atomic():
+            blob, _ = cls.objects.get_or_create(
+                name=name,
+                defaults={'digest': digest, 'size': blob_storage.size(name)}
+            )
+            cls.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+
+    @classmethod
+    def acquire_many(cls, references):
+        """Bulk acquire: `references` maps blob name to the number of new references."""
+        references = {
+            name: count for name, count in references.items()
+            if count and digest_from_name(name) is not None
+        }
+        if not references:
+            return
+        with transaction.atomic():
+            existing = set(cls.objects.filter(name__in=references).values_list('name', flat=True))
+            cls.objects.bulk_create(
+                [
+                    cls(name=name, digest=digest_from_name(name), size=blob_storage.size(name))
+                    for name in references if name not in existing
+                ],
+                ignore_conflicts=True
+            )
+            by_count = {}
+            for name, count in references.items():
+                by_count.setdefault(count, []).append(name)
+            for count, names in by_count.items():
+                cls.objects.filter(name__in=names).update(ref_count=F('ref_count') + count)
+
+    @classmethod
+    def hold(cls, names):
+        """
+        Lock the rows of the blobs `names` until the current transaction ends,
+        so a concurrent release() cannot delete their files before the caller
+        has taken its references.
+        """
+        cls.objects.filter(name__in=names).update(ref_count=F('ref_count'))
+
+    @classmethod
+    def release(cls, name):
+        if digest_from_name(name) is None:
+            return
+        with transaction.atomic():
+            cls.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+            unreferenced = cls.objects.filter(name=name, ref_count=0).exists()
+        if unreferenced:
+            transaction.on_commit(partial(cls._delete_unreferenced, name))
+
+    @classmethod
+    def _delete_unreferenced(cls, name):
+        with transaction.atomic():
+            # Re-checked under the row lock: the blob may have been stored and
+            # referenced again since release() (see hold()).
+            deleted, _ = cls.objects.filter(name=name, ref_count=0).delete()
+            if deleted:
+                blob_storage.delete(name)
+
+
+class UploadSession(models.Model):
+    """
+    A resumable chunked upload. Bytes are appended to a part file under
+    CHUNKED_UPLOAD_DIR until `offset` reaches `size`, then the session is
+    finalized into a Document (see documents.uploads).
+    """
+    STATUS_CHOICES = (
+        ('ACTIVE', 'Active'),
+        ('COMPLETE', 'Complete'),
+        ('ABORTED', 'Aborted'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    title = models.CharField(max_length=255)
+    folder = models.ForeignKey(
+        Folder,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE')
+    sha256 = models.CharField(max_length=64, blank=True)
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    def is_complete(self):
+        return self.offset >= self.size
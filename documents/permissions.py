@@ -35,7 +35,7 @@ class DocumentPermissionMixin:
     def check_document_review_permission(self, request, document):
         """Check if user can review the document"""
         if not request.user.can_review_document(document):
-            if document.uploaded_by == request.user:
+            if document.uploaded_by_id == request.user.pk:
                 raise PermissionDenied(
                     "You cannot review your own document (separation of duties)"
                 )
@@ -43,7 +43,7 @@ class DocumentPermissionMixin:
     
     def check_document_submit_permission(self, request, document):
         """Check if user can submit document for review"""
-        if document.uploaded_by != request.user and not request.user.is_admin():
+        if document.uploaded_by_id != request.user.pk and not request.user.is_admin():
             raise PermissionDenied("Only the document owner can submit for review")
         
         if not document.can_be_submitted_for_review():
@@ -52,6 +52,51 @@ class DocumentPermissionMixin:
             )
 
 
+# permission -> (User method for one instance, DocumentQuerySet method)
+PERMISSIONS = {
+    'view': ('can_view_document', 'visible_to'),
+    'edit': ('can_edit_document', 'editable_by'),
+    'delete': ('can_delete_document', 'deletable_by'),
+    'review': ('can_review_document', 'reviewable_by'),
+}
+
+
+def _permission_cache(user, permission):
+    # Lives on the user object, which Django builds once per request.
+    return user.__dict__.setdefault('_document_permission_cache', {}).setdefault(permission, {})
+
+
+def check_many(user, documents, permission='view'):
+    """
+    Return {document id: bool} for `documents`, which may be Document
+    instances (checked in memory) or ids (checked with one query for all
+    of them). Results for ids are memoized for the rest of the request.
+    """
+    user_method, queryset_method = PERMISSIONS[permission]
+    result = {}
+    ids = []
+    for document in documents:
+        if hasattr(document, 'pk'):
+            result[document.pk] = getattr(user, user_method)(document)
+        else:
+            ids.append(int(document))
+
+    cache = _permission_cache(user, permission)
+    missing = [pk for pk in ids if pk not in cache]
+    if missing:
+        from documents.models import Document
+        allowed = set(
+            getattr(Document.objects.active(), queryset_method)(user)
+            .filter(pk__in=missing)
+            .values_list('pk', flat=True)
+        )
+        for pk in missing:
+            cache[pk] = pk in allowed
+    for pk in ids:
+        result[pk] = cache[pk]
+    return result
+
+
 def require_document_permission(permission_type):
     """
     Decorator to check document permissions
@@ -70,31 +115,31 @@ def require_document_permission(permission_type):
             if not document_id:
                 raise ValueError("Document ID not found in view kwargs")
             
+            # The permitted case costs one query; the rest is only for the error.
+            queryset = getattr(Document.objects.active(), PERMISSIONS[permission_type][1])(request.user)
+            document = queryset.filter(id=document_id).first()
+            if document is not None:
+                _permission_cache(request.user, permission_type)[document.pk] = True
+                kwargs['document'] = document
+                return view_func(request, *args, **kwargs)
+
             document = get_object_or_404(Document, id=document_id, is_deleted=False)
             
             if permission_type == 'view':
-                if not request.user.can_view_document(document):
-                    raise PermissionDenied("You do not have permission to view this document")
+                raise PermissionDenied("You do not have permission to view this document")
             elif permission_type == 'edit':
-                if not request.user.can_edit_document(document):
-                    raise PermissionDenied(
-                        f"You cannot edit this document. Current status: {document.status}"
-                    )
+                raise PermissionDenied(
+                    f"You cannot edit this document. Current status: {document.status}"
+                )
             elif permission_type == 'delete':
-                if not request.user.can_delete_document(document):
-                    raise PermissionDenied(
-                        f"You cannot delete this document. Current status: {document.status}"
-                    )
-            elif permission_type == 'review':
-                if not request.user.can_review_document(document):
-                    if document.uploaded_by == request.user:
-                        raise PermissionDenied(
-                            "You cannot review your own document (separation of duties)"
-                        )
-                    raise PermissionDenied("You do not have permission to review this document")
-            
-            kwargs['document'] = document
-            return view_func(request, *args, **kwargs)
+                raise PermissionDenied(
+                    f"You cannot delete this document. Current status: {document.status}"
+                )
+            elif document.uploaded_by_id == request.user.pk:
+                raise PermissionDenied(
+                    "You cannot review your own document (separation of duties)"
+                )
+            raise PermissionDenied("You do not have permission to review this document")
         
         return wrapper
     return decorator
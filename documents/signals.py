@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Blob, Document
+
+# Sent inside the saving transaction whenever a document is created or one
+# of Document.COUNTED_FIELDS changes. old_state is None for new documents.
+document_state_changed = Signal()
+
+# Sent by documents.ingest after bulk_create(), which bypasses save(),
+# with the list of new documents. Receivers should handle them in bulk.
+documents_bulk_created = Signal()
+
+# Sent inside the transaction of a bulk update that bypasses save(), such
+# as workflows.review, with `changes`: a list of (document, old_state,
+# new_state) in the form of document_state_changed.
+documents_bulk_state_changed = Signal()
+
+
+@receiver(post_delete, sender=Document)
+def release_document_blob(sender, instance, **kwargs):
+    Blob.release(instance.file.name)
+
+
+@receiver(post_delete, sender='versions.DocumentVersion')
+def release_version_blob(sender, instance, **kwargs):
+    Blob.release(instance.file.name)
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import posixpath
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs'
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def blob_name(digest, extension=''):
+    """Storage name for a blob: blobs/ab/cd/abcd...<ext>"""
+    return posixpath.join(BLOB_PREFIX, digest[:2], digest[2:4], digest + extension.lower())
+
+
+def digest_from_name(name):
+    """Return the SHA-256 digest encoded in a blob name, or None for legacy files"""
+    if not name or not name.startswith(BLOB_PREFIX + '/'):
+        return None
+    digest = posixpath.splitext(posixpath.basename(name))[0]
+    return digest if len(digest) == 64 else None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by the SHA-256 of their contents.
+
+    Saving bytes that are already stored is a no-op that returns the existing
+    name, so identical uploads share one file on disk. Reference counts are
+    kept by documents.models.Blob; this class never deletes a blob that is
+    still referenced. Inside a transaction, storing holds the blob's row lock
+    (Blob.hold()) until it ends, so save in the transaction that takes the
+    reference.
+    """
+
+    def _hold(self, target):
+        """Lock the blob's row, then report whether its file is still there."""
+        # Outside a transaction the lock would end at once (bulk ingest
+        # workers); those callers hold the blobs themselves later.
+        if transaction.get_connection().in_atomic_block:
+            from .models import Blob
+            Blob.hold([target])
+        return self.exists(target)
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content in _save(), collisions are intended.
+        return name
+
+    def _save(self, name, content):
+        hasher = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+
+        target = blob_name(hasher.hexdigest(), posixpath.splitext(name)[1])
+        if self._hold(target):
+            return target
+
+        # Write to a private name first and rename into place so concurrent
+        # writers of the same content never expose a partial blob.
+        partial = super()._save(f"{target}.{uuid.uuid4().hex}.partial", content)
+        os.replace(self.path(partial), self.path(target))
+        return target
+
+    def adopt(self, path, digest, extension=''):
+        """
+        Move a local file whose digest is already known into the store,
+        without reading it again. The source file is consumed either way.
+        """
+        target = blob_name(digest, extension)
+        full_path = self.path(target)
+        if self._hold(target):
+            os.remove(path)
+            return target
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        os.replace(path, full_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return target
+
+    def copy_in(self, path, digest, extension=''):
+        """
+        Copy a local file whose digest is already known into the store,
+        leaving the source in place.
+        """
+        target = blob_name(digest, extension)
+        if self._hold(target):
+            return target
+        with open(path, 'rb') as source:
+            partial = super()._save(f"{target}.{uuid.uuid4().hex}.partial", File(source))
+        os.replace(self.path(partial), self.path(target))
+        return target
+
+
+def hash_file(path):
+    """Return (sha256 hexdigest, size) of a local file."""
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(block)
+            size += len(block)
+    return hasher.hexdigest(), size
+
+
+blob_storage = ContentAddressedStorage()
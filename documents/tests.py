@@ -1,3 +1,229 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from search.backends import SQLiteFTSBackend
+from . import ingest, uploads
+from .downloads import offload_response
+from .models import Blob, Document, Metadata, UploadSession
+
+
+class MediaTestCase(TestCase):
+    """Stores files under a temporary MEDIA_ROOT and writes activity rows synchronously."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            CHUNKED_UPLOAD_DIR=os.path.join(media_root, '.uploads'),
+            ACTIVITY_BUFFER_ENABLED=False
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class SearchPermissionTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', password='x', role='USER')
+        self.other = User.objects.create_user('other', password='x', role='USER')
+        self.backend = SQLiteFTSBackend()
+
+    def create(self, title, user):
+        document = Document.objects.create(
+            title=title, file=ContentFile(b'text', name='notes.txt'), uploaded_by=user
+        )
+        self.backend.index_document(document)
+        return document
+
+    def test_low_ranked_visible_documents_are_found(self):
+        for i in range(10):
+            self.create(f'Budget budget budget {i}', self.other)
+        mine = self.create('Budget notes and a long title about other things entirely', self.owner)
+
+        documents = Document.objects.active().visible_to(self.owner)
+        self.assertEqual(self.backend.search(documents, 'budget', limit=1), [mine])
+
+    def test_ranking_among_visible_documents(self):
+        self.create('Budget budget budget', self.other)
+        weak = self.create('Budget notes and a long title about other things entirely', self.owner)
+        self.create('Budget budget budget budget', self.other)
+        strong = self.create('Budget budget', self.owner)
+        deleted = self.create('Budget budget budget', self.owner)
+        deleted.is_deleted = True
+        deleted.save()
+
+        documents = Document.objects.active().visible_to(self.owner)
+        self.assertEqual(self.backend.search(documents, 'budget', limit=5), [strong, weak])
+
+    def test_results_are_ranked_and_limited(self):
+        weak = self.create('Budget notes and a long title about other things entirely', self.owner)
+        strong = self.create('Budget budget', self.owner)
+        self.create('Budget', self.other)
+
+        documents = Document.objects.active().visible_to(self.owner)
+        self.assertEqual(self.backend.search(documents, 'budget'), [strong, weak])
+        self.assertEqual(self.backend.search(documents, 'budget', limit=1), [strong])
+
+
+class ChunkedUploadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user('uploader', password='x', role='USER')
+        self.data = b'chunked upload contents'
+        self.session = uploads.create_session(self.user, 'notes.txt', len(self.data), 'Notes')
+
+    def send_all(self):
+        uploads.write_chunk(self.session, 0, io.BytesIO(self.data), len(self.data))
+
+    def test_complete_creates_one_document(self):
+        self.send_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            document = uploads.complete_session(self.session)
+
+        self.assertEqual(document.file.read(), self.data)
+        # Referenced by the document and its first version.
+        self.assertEqual(Blob.objects.get(name=document.file.name).ref_count, 2)
+        self.assertFalse(os.path.exists(uploads.part_path(self.session)))
+        with self.assertRaises(ValidationError):
+            uploads.complete_session(self.session)
+        self.assertEqual(Document.objects.count(), 1)
+
+    def test_rolled_back_completion_keeps_the_part_file(self):
+        self.send_all()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            uploads.complete_session(self.session)
+            raise RuntimeError
+        self.assertTrue(os.path.exists(uploads.part_path(self.session)))
+        self.assertEqual(UploadSession.objects.get(pk=self.session.pk).status, 'ACTIVE')
+
+    def test_missing_part_file_is_a_validation_error(self):
+        self.send_all()
+        os.remove(uploads.part_path(self.session))
+        uploads._hashers.clear()
+        with self.assertRaises(ValidationError):
+            uploads.complete_session(self.session)
+        self.assertFalse(Document.objects.exists())
+
+    def test_stale_session_offset_is_rechecked_under_the_lock(self):
+        stale = UploadSession.objects.get(pk=self.session.pk)
+        uploads.write_chunk(self.session, 0, io.BytesIO(self.data[:5]), 5)
+
+        with self.assertRaises(uploads.UploadConflict) as raised:
+            uploads.write_chunk(stale, 0, io.BytesIO(self.data[:5]), 5)
+        self.assertEqual(raised.exception.offset, 5)
+
+        uploads.write_chunk(stale, 5, io.BytesIO(self.data[5:]), len(self.data) - 5)
+        with open(uploads.part_path(self.session), 'rb') as part:
+            self.assertEqual(part.read(), self.data)
+
+
+class BlobReferenceTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user('owner', password='x', role='USER')
+
+    def create(self, content):
+        return Document.objects.create(
+            title='Shared', file=ContentFile(content, name='shared.txt'), uploaded_by=self.user
+        )
+
+    def test_last_release_deletes_the_file_after_commit(self):
+        document = self.create(b'only copy')
+        name = document.file.name
+        with self.captureOnCommitCallbacks(execute=True):
+            document.delete()
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        self.assertFalse(document.file.storage.exists(name))
+
+    def test_blob_referenced_again_before_cleanup_is_kept(self):
+        document = self.create(b'shared copy')
+        name = document.file.name
+        with self.captureOnCommitCallbacks(execute=True):
+            document.delete()
+            # Stored again before the release's cleanup runs.
+            again = self.create(b'shared copy')
+        self.assertEqual(again.file.name, name)
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 2)
+        self.assertTrue(again.file.storage.exists(name))
+
+
+class IngestTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user('owner', password='x', role='USER')
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source, ignore_errors=True)
+
+    def write(self, relative, content):
+        path = os.path.join(self.source, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_every_file_holds_two_blob_references(self):
+        items = [
+            ingest.IngestItem(name, path=self.write(name, content))
+            for name, content in (('a.txt', b'same'), ('b.txt', b'other'), ('c.txt', b'same'))
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            documents = ingest.ingest(items, self.user, chunk_size=10, workers=2)
+
+        self.assertEqual(documents[0].file.name, documents[2].file.name)
+        self.assertEqual(
+            {blob.name: blob.ref_count for blob in Blob.objects.all()},
+            {documents[0].file.name: 4, documents[1].file.name: 2}
+        )
+
+    def test_resume_skips_files_with_long_source_paths(self):
+        long_path = os.path.join('a' * 120, 'b' * 120, 'c' * 40 + '.txt')
+        self.write(long_path, b'deep')
+        self.write('short.txt', b'short')
+
+        for resume in (False, True):
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command(
+                    'import_documents', self.source, user='owner', resume=resume, stdout=io.StringIO()
+                )
+        self.assertEqual(Document.objects.count(), 2)
+        source_paths = Metadata.objects.filter(attribute_name='source_path').values_list(
+            'attribute_value', flat=True
+        )
+        self.assertIn('short.txt', source_paths)
+        self.assertTrue(any(value.startswith('a' * 120) for value in source_paths))
+
+
+class DownloadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user('owner', password='x', role='USER')
+        self.document = Document.objects.create(
+            title='Notes', file=ContentFile(b'download me', name='notes.txt'), uploaded_by=self.user
+        )
+        self.client.force_login(self.user)
+
+    def test_download(self):
+        response = self.client.get(f'/documents/download/{self.document.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'download me')
+
+    @override_settings(SENDFILE_BACKEND='xaccel')
+    def test_accel_redirect_is_quoted(self):
+        response = offload_response('documents/2024 report #1?.txt', '/unused')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/documents/2024%20report%20%231%3F.txt')
+
+    def test_missing_file_is_not_found(self):
+        os.remove(self.document.file.path)
+        response = self.client.get(f'/documents/download/{self.document.pk}/')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,227 @@
+"""
+Resumable chunked uploads.
+
+A client creates an UploadSession, sends the file as consecutive byte
+ranges and finally completes the session, which turns the assembled file
+into a Document. Request bodies are copied to disk in small blocks while
+the SHA-256 is updated, so worker memory does not grow with file size and
+the finished file is copied into blob storage without being hashed again.
+"""
+import base64
+import hashlib
+import os
+import posixpath
+import threading
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Document, UploadSession
+from .storage import HASH_CHUNK_SIZE, blob_storage
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent writers are only caught by the offset check
+    fcntl = None
+
+# Running SHA-256 per session, keyed by session id: (offset, hasher).
+# A worker that has not seen the session yet rebuilds it from the part file.
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadConflict(Exception):
+    """The client sent a range that does not start at the session offset."""
+
+    def __init__(self, offset):
+        super().__init__(f"Upload offset mismatch, expected {offset}")
+        self.offset = offset
+
+
+def upload_dir():
+    path = settings.CHUNKED_UPLOAD_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def part_path(session):
+    return os.path.join(upload_dir(), f"{session.pk}.part")
+
+
+def create_session(user, filename, size, title, folder=None, category=None):
+    if not user.can_upload_document():
+        raise PermissionDenied("You do not have permission to upload documents")
+    if size <= 0:
+        raise ValidationError("Upload size must be greater than zero")
+    if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise ValidationError(
+            f"Upload size exceeds the limit of {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes"
+        )
+
+    session = UploadSession.objects.create(
+        user=user,
+        filename=os.path.basename(filename),
+        size=size,
+        title=title,
+        folder=folder,
+        category=category,
+        expires_at=timezone.now() + timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+    )
+    open(part_path(session), 'wb').close()
+    return session
+
+
+def _get_hasher(session):
+    with _hashers_lock:
+        cached = _hashers.get(session.pk)
+    if cached and cached[0] == session.offset:
+        return cached[1]
+
+    # Rebuild from disk; bytes past the committed offset are from an
+    # interrupted request and are discarded.
+    hasher = hashlib.sha256()
+    path = part_path(session)
+    with open(path, 'r+b') as part:
+        part.truncate(session.offset)
+        remaining = session.offset
+        while remaining:
+            block = part.read(min(HASH_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def parse_checksum(header):
+    """Parse a tus style 'Upload-Checksum: sha256 <base64>' header."""
+    if not header:
+        return None
+    algorithm, _, value = header.partition(' ')
+    if algorithm.lower() != 'sha256' or not value:
+        raise ValidationError("Only sha256 upload checksums are supported")
+    try:
+        return base64.b64decode(value.strip())
+    except ValueError:
+        raise ValidationError("Malformed upload checksum")
+
+
+def write_chunk(session, offset, stream, length, checksum=None):
+    """
+    Append `length` bytes read from `stream` at `offset`.
+    Returns the new session offset.
+    """
+    if length < 0 or offset + length > session.size:
+        raise ValidationError("Chunk extends past the declared upload size")
+
+    try:
+        part = open(part_path(session), 'r+b')
+    except FileNotFoundError:
+        session.refresh_from_db(fields=['status'])
+        if session.status != 'ACTIVE':
+            raise ValidationError(f"Upload session is {session.status.lower()}")
+        raise ValidationError("Upload data is missing, start a new upload")
+
+    with part:
+        # One writer per session: the offset is only trusted under the lock.
+        if fcntl is not None:
+            fcntl.flock(part.fileno(), fcntl.LOCK_EX)
+        session.refresh_from_db(fields=['status', 'offset'])
+        if session.status != 'ACTIVE':
+            raise ValidationError(f"Upload session is {session.status.lower()}")
+        if offset != session.offset:
+            raise UploadConflict(session.offset)
+
+        hasher = _get_hasher(session).copy()
+        chunk_hasher = hashlib.sha256()
+        received = 0
+
+        part.seek(offset)
+        while received < length:
+            block = stream.read(min(HASH_CHUNK_SIZE, length - received))
+            if not block:
+                break
+            part.write(block)
+            hasher.update(block)
+            chunk_hasher.update(block)
+            received += len(block)
+
+        if checksum is not None and chunk_hasher.digest() != checksum:
+            part.truncate(offset)
+            raise ValidationError("Chunk checksum mismatch")
+        part.flush()
+        os.fsync(part.fileno())
+
+        new_offset = offset + received
+        updated = UploadSession.objects.filter(pk=session.pk, offset=offset).update(
+            offset=new_offset,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            session.refresh_from_db(fields=['offset'])
+            raise UploadConflict(session.offset)
+
+        session.offset = new_offset
+        with _hashers_lock:
+            _hashers[session.pk] = (new_offset, hasher)
+    return new_offset
+
+
+def _remove_part(session_id, path):
+    with _hashers_lock:
+        _hashers.pop(session_id, None)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def complete_session(session):
+    """Turn a fully received session into a DRAFT Document."""
+    with transaction.atomic():
+        # Lock the session so concurrent completions create one document.
+        session = UploadSession.objects.select_for_update().select_related(
+            'user', 'folder', 'category'
+        ).get(pk=session.pk)
+        if session.status != 'ACTIVE':
+            raise ValidationError(f"Upload session is {session.status.lower()}")
+        if not session.is_complete():
+            raise ValidationError(
+                f"Upload incomplete: received {session.offset} of {session.size} bytes"
+            )
+
+        path = part_path(session)
+        try:
+            digest = _get_hasher(session).hexdigest()
+            # Copy rather than move: the part file is only removed once the
+            # document is committed, so a rollback leaves the session intact.
+            name = blob_storage.copy_in(path, digest, posixpath.splitext(session.filename)[1])
+        except FileNotFoundError:
+            raise ValidationError("Upload data is missing, start a new upload")
+
+        document = Document(
+            title=session.title,
+            file=name,
+            folder=session.folder,
+            category=session.category,
+            uploaded_by=session.user,
+            status='DRAFT'
+        )
+        document.save()
+
+        session.status = 'COMPLETE'
+        session.sha256 = digest
+        session.document = document
+        session.save(update_fields=['status', 'sha256', 'document', 'updated_at'])
+        transaction.on_commit(partial(_remove_part, session.pk, path))
+    return document
+
+
+def abort_session(session):
+    _remove_part(session.pk, part_path(session))
+    session.status = 'ABORTED'
+    session.save(update_fields=['status', 'updated_at'])
@@ -6,6 +6,7 @@ urlpatterns = [
     path('my/', views.my_documents, name='my_documents'),
     path('all/', views.all_documents, name='all_documents'),
     path('view/<int:document_id>/', views.view_document, name='view_document'),
+    path('download/<int:document_id>/', views.download_document, name='download_document'),
     path('edit/<int:document_id>/', views.edit_document, name='edit_document'),
     path('delete/<int:document_id>/', views.delete_document, name='delete_document'),
     path('submit/<int:document_id>/', views.submit_for_review, name='submit_for_review'),
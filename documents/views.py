@@ -1,11 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied, ValidationError
+from .downloads import download_filename, is_initial_request, serve_file
 from .forms import DocumentUploadForm
 from .models import Document
-from activity.models import ActivityLog
+from activity.events import log_activity, log_audit
+from ecms.pagination import KeysetPaginator
+from search.backends import get_search_backend
 
 @login_required
 def upload_document(request):
@@ -20,7 +22,7 @@ def upload_document(request):
             document.status = 'DRAFT'
             document.save()
 
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user,
                 document=document,
                 action='UPLOAD'
@@ -37,22 +39,18 @@ def my_documents(request):
     search_query = request.GET.get("q", "").strip()
     status_filter = request.GET.get("status", "").strip()
 
-    documents_qs = Document.objects.filter(
-        uploaded_by=request.user,
-        is_deleted=False
-    )
-    
-    documents_qs = documents_qs.order_by('-created_at')
+    documents_qs = Document.objects.active().filter(
+        uploaded_by=request.user
+    ).select_related('category')
 
     if search_query:
-        documents_qs = documents_qs.filter(title__icontains=search_query)
+        documents_qs = get_search_backend().filter(documents_qs, search_query)
 
     if status_filter:
         documents_qs = documents_qs.filter(status=status_filter)
 
-    paginator = Paginator(documents_qs, 10)
-    page_number = request.GET.get("page")
-    documents_page = paginator.get_page(page_number)
+    paginator = KeysetPaginator(documents_qs, ('-created_at', '-id'), per_page=10)
+    documents_page = paginator.get_page(request.GET.get("cursor"))
 
     return render(
         request,
@@ -66,12 +64,16 @@ def my_documents(request):
 
 @login_required
 def view_document(request, document_id):
-    document = get_object_or_404(Document, id=document_id, is_deleted=False)
+    document = get_object_or_404(
+        Document.objects.select_related('uploaded_by', 'reviewed_by', 'category', 'folder'),
+        id=document_id,
+        is_deleted=False
+    )
     
     if not request.user.can_view_document(document):
         raise PermissionDenied("You do not have permission to view this document")
     
-    ActivityLog.objects.create(
+    log_activity(
         user=request.user,
         document=document,
         action='VIEW'
@@ -91,6 +93,29 @@ def view_document(request, document_id):
         'assigned_task': assigned_task
     })
 
+@login_required
+def download_document(request, document_id):
+    document = get_object_or_404(Document, id=document_id, is_deleted=False)
+
+    if not request.user.can_view_document(document):
+        raise PermissionDenied("You do not have permission to view this document")
+
+    response = serve_file(
+        request,
+        document.file,
+        download_filename(document.title, document.file.name),
+        as_attachment='download' in request.GET
+    )
+
+    if response.status_code in (200, 206) and is_initial_request(request):
+        log_audit(
+            user=request.user,
+            document=document,
+            action='DOWNLOAD',
+            description="Downloaded current file"
+        )
+    return response
+
 @login_required
 def edit_document(request, document_id):
     document = get_object_or_404(Document, id=document_id, is_deleted=False)
@@ -111,7 +136,7 @@ def edit_document(request, document_id):
                 document.status = 'DRAFT'
             document.save()
             
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user,
                 document=document,
                 action='UPDATE'
@@ -131,7 +156,7 @@ def submit_for_review(request, document_id):
     document = get_object_or_404(Document, id=document_id, is_deleted=False)
     
     try:
-        if document.uploaded_by != request.user and not request.user.is_admin():
+        if document.uploaded_by_id != request.user.pk and not request.user.is_admin():
             raise PermissionDenied("Only the document owner can submit for review")
         
         if not document.can_be_submitted_for_review():
@@ -141,7 +166,7 @@ def submit_for_review(request, document_id):
         
         document.submit_for_review(request.user)
         
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user,
             document=document,
             action='UPDATE'
@@ -168,11 +193,10 @@ def delete_document(request, document_id):
     document.is_deleted = True
     document.save()
 
-    ActivityLog.objects.create(
+    log_activity(
         user=request.user,
         action='DELETE',
-        document=document,
-        description=f"Deleted document: {document.title}"
+        document=document
     )
     messages.success(request, "Document deleted successfully.")
     return redirect('my_documents')
@@ -185,17 +209,16 @@ def all_documents(request):
     search_query = request.GET.get("q", "").strip()
     status_filter = request.GET.get("status", "").strip()
     
-    documents_qs = Document.objects.filter(is_deleted=False).select_related('uploaded_by').order_by('-created_at')
+    documents_qs = Document.objects.active().visible_to(request.user).select_related('uploaded_by', 'category')
     
     if search_query:
-        documents_qs = documents_qs.filter(title__icontains=search_query)
+        documents_qs = get_search_backend().filter(documents_qs, search_query)
     
     if status_filter:
         documents_qs = documents_qs.filter(status=status_filter)
     
-    paginator = Paginator(documents_qs, 10)
-    page_number = request.GET.get("page")
-    documents_page = paginator.get_page(page_number)
+    paginator = KeysetPaginator(documents_qs, ('-created_at', '-id'), per_page=10)
+    documents_page = paginator.get_page(request.GET.get("cursor"))
     
     # Get assigned tasks for documents in REVIEW status
     from workflows.models import Task
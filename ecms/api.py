@@ -0,0 +1,123 @@
+"""
+Sparse fieldsets and conditional GET for the REST API.
+
+?fields=id,title limits a response to the listed fields. The serializer
+(SparseFieldsSerializerMixin) drops the other fields, and for querysets
+the view (SparseFieldsMixin) loads only the columns behind the requested
+fields with .only(). Fields computed from the whole object, such as
+SerializerMethodFields, load the full row.
+
+ConditionalGetMixin gives every 200 GET response an ETag computed from its
+data and answers a matching If-None-Match with 304 Not Modified, so
+clients that poll skip downloading and parsing unchanged pages. The
+response is still built; what is saved is the transfer.
+"""
+import hashlib
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def requested_fields(request):
+    """The field names listed in ?fields= of a GET request, or None."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(FIELDS_PARAM, '')
+    fields = {name.strip() for name in value.split(',') if name.strip()}
+    return fields or None
+
+
+class SparseFieldsSerializerMixin:
+    """Serializer mixin dropping the fields not listed in ?fields=."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is None:
+            return
+        unknown = fields - set(self.fields)
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: f"Unknown field(s): {', '.join(sorted(unknown))}"})
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """
+    Generic view mixin loading only the columns the ?fields= of the request
+    needs. The primary key and the pagination ordering are always loaded.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = requested_fields(self.request)
+        if fields is None or not isinstance(queryset, QuerySet):
+            return queryset
+        columns = self.get_sparse_columns(queryset, fields)
+        if columns is None:
+            return queryset
+
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict):
+            # Relations that are not loaded any more cannot be joined either.
+            related = [name for name in select_related if any(c.startswith(f'{name}__') for c in columns)]
+            queryset = queryset.select_related(None)
+            if related:
+                queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+    def get_sparse_columns(self, queryset, fields):
+        """Columns for .only(), or None when a requested field needs the whole row."""
+        if queryset.query.select_related is True:
+            return None
+        serializer_fields = self.get_serializer_class()(context=self.get_serializer_context()).fields
+        model = queryset.model
+        select_related = queryset.query.select_related or {}
+
+        columns = {model._meta.pk.name}
+        if self.pagination_class is not None:
+            ordering = getattr(self, 'pagination_ordering', getattr(self.pagination_class, 'ordering', ()))
+            columns.update(field.lstrip('-') for field in ordering)
+
+        for name in fields:
+            source = serializer_fields[name].source
+            if source == '*':
+                return None
+            first, _, rest = source.partition('.')
+            try:
+                model_field = model._meta.get_field(first)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            if not rest:
+                columns.add(first)
+            elif first in select_related and '.' not in rest:
+                columns.add(f'{first}__{rest}')
+            else:
+                return None
+        return columns
+
+
+class ConditionalGetMixin:
+    """API view mixin adding ETag / If-None-Match handling to GET responses."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in SAFE_METHODS or response.status_code != 200:
+            return response
+        if getattr(response, 'data', None) is None:
+            return response
+
+        payload = json.dumps(response.data, sort_keys=True, default=str, separators=(',', ':'))
+        # The same data rendered as JSON or as the browsable API differs.
+        digest = hashlib.sha256(f"{response.accepted_media_type}\n{payload}".encode()).hexdigest()
+        response['ETag'] = f'"{digest}"'
+        patch_cache_control(response, private=True, no_cache=True)
+        return get_conditional_response(request, etag=response['ETag'], response=response)
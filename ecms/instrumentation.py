@@ -0,0 +1,145 @@
+"""
+SQL query instrumentation.
+
+QueryRecorder counts the queries run on every database connection of the
+current thread, with their total time and how many were exact repeats of
+an earlier query (the usual sign of an N+1 loop). QueryCountMiddleware
+records each request and reports the numbers in X-DB-* response headers
+and the `ecms.queries` log. Views that go over their budget (see
+query_budget()) are logged as warnings, and assert_max_queries() and
+`manage.py check_query_budgets` turn the budgets into checks that fail.
+
+Streaming responses (file downloads, the notification stream) are not
+reported: most of their queries run after the middleware returns.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('ecms.queries')
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, repr(params), time.perf_counter() - start))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all(initialized_only=True):
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for _, _, duration in self.queries)
+
+    @property
+    def duplicates(self):
+        """Number of queries that repeated an earlier query with the same parameters."""
+        return self.count - len({(sql, params) for sql, params, _ in self.queries})
+
+    def most_repeated(self):
+        """(sql, times) of the statement run most often regardless of parameters, or None."""
+        if not self.queries:
+            return None
+        return Counter(sql for sql, _, _ in self.queries).most_common(1)[0]
+
+
+def query_budget(method, name):
+    """The maximum number of queries allowed for a `method` request to the URL pattern `name`."""
+    return settings.QUERY_BUDGETS.get((method, name), settings.QUERY_BUDGET_DEFAULT)
+
+
+@contextmanager
+def assert_max_queries(limit, label=''):
+    """Fail with AssertionError when the block runs more than `limit` queries."""
+    with QueryRecorder() as recorder:
+        yield recorder
+    if recorder.count > limit:
+        sql, times = recorder.most_repeated()
+        raise AssertionError(
+            f"{label or 'Block'} ran {recorder.count} queries, budget is {limit} "
+            f"({recorder.duplicates} duplicates; most repeated {times}x: {sql[:200]})"
+        )
+
+
+class QueryCountMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        self._start(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            recorder.__exit__(None, None, None)
+        self.report(request, response, recorder)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            return await self.get_response(request)
+
+        # Sync views and ORM calls run in the thread-sensitive executor, so
+        # wrap the connections there rather than in the event loop's context.
+        recorder = QueryRecorder()
+        await sync_to_async(self._start)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recorder.__exit__)(None, None, None)
+        self.report(request, response, recorder)
+        return response
+
+    def _start(self, recorder):
+        # Connections opened by the request itself are not wrapped yet, so
+        # make sure the default one exists before recording.
+        connections['default'].ensure_connection()
+        recorder.__enter__()
+
+    def report(self, request, response, recorder):
+        if response.streaming:
+            return
+        response['X-DB-Query-Count'] = str(recorder.count)
+        response['X-DB-Query-Time'] = f"{recorder.duration * 1000:.1f}ms"
+        response['X-DB-Duplicate-Queries'] = str(recorder.duplicates)
+
+        match = request.resolver_match
+        name = (match.url_name or match.route) if match else request.path
+        budget = query_budget(request.method, name)
+        log = logger.warning if recorder.count > budget else logger.debug
+        log(
+            "%s %s: %d queries (budget %d), %d duplicates, %.1fms",
+            request.method, name, recorder.count, budget, recorder.duplicates, recorder.duration * 1000
+        )
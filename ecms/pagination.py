@@ -0,0 +1,196 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by an opaque cursor holding the ordering values of
+the last row seen, so fetching any page is an indexed range scan of
+per_page + 1 rows: no COUNT(*) and no OFFSET. The ordering must end in a
+unique column (normally '-id') so every row has a distinct position.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({
+        'v': [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+        'd': direction,
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields=None):
+    """
+    Return (values, direction), or None for a missing or malformed cursor.
+    With `fields` (the model fields of the ordering) each value is
+    converted with the field's to_python(), and a cursor whose values do
+    not fit the fields is malformed too.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        values, direction = payload['v'], payload['d']
+        if direction not in ('n', 'p') or not isinstance(values, list):
+            return None
+        if fields is not None:
+            if len(values) != len(fields):
+                return None
+            values = [field.to_python(value) for field, value in zip(fields, values)]
+            if None in values:
+                return None
+    except (ValueError, KeyError, TypeError, ValidationError):
+        return None
+    return values, direction
+
+
+class KeysetPage:
+    def __init__(self, object_list, ordering, has_next, has_previous):
+        self.object_list = object_list
+        self.ordering = ordering
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _position(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    @property
+    def next_cursor(self):
+        if not self.has_next or not self.object_list:
+            return None
+        return encode_cursor(self._position(self.object_list[-1]), 'n')
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous or not self.object_list:
+            return None
+        return encode_cursor(self._position(self.object_list[0]), 'p')
+
+
+class KeysetPaginator:
+    """
+    Usage:
+        paginator = KeysetPaginator(queryset, ('-created_at', '-id'), per_page=10)
+        page = paginator.get_page(request.GET.get('cursor'))
+    """
+
+    def __init__(self, queryset, ordering, per_page=10):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        opts = queryset.model._meta
+        self.fields = [opts.get_field(field.lstrip('-')) for field in self.ordering]
+
+    def _after(self, values, reverse):
+        """Q matching rows strictly after `values` in the (possibly reversed) ordering."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            step = Q(**{f'{name}__{"lt" if descending else "gt"}': values[i]})
+            for previous, value in zip(self.ordering[:i], values):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def get_page(self, cursor=None):
+        decoded = decode_cursor(cursor, self.fields)
+        if decoded is None:
+            rows = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self.ordering, len(rows) > self.per_page, False)
+
+        values, direction = decoded
+        if direction == 'n':
+            rows = list(
+                self.queryset.filter(self._after(values, reverse=False))
+                .order_by(*self.ordering)[:self.per_page + 1]
+            )
+            return KeysetPage(rows[:self.per_page], self.ordering, len(rows) > self.per_page, True)
+
+        reversed_ordering = [
+            field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering
+        ]
+        rows = list(
+            self.queryset.filter(self._after(values, reverse=True))
+            .order_by(*reversed_ordering)[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return KeysetPage(rows, self.ordering, True, has_previous)
+
+
+class KeysetPagination(BasePagination):
+    """
+    REST framework pagination backed by KeysetPaginator. Views may set
+    `pagination_ordering`; the default is newest first.
+    """
+    page_size = 20
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = getattr(view, 'pagination_ordering', self.ordering)
+        paginator = KeysetPaginator(queryset, ordering, self.get_page_size(request))
+        self.page = paginator.get_page(request.query_params.get(self.cursor_query_param))
+        return list(self.page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        if self.page.has_previous and not self.page.object_list:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
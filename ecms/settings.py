@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'reports',
     'dashboard',
     'activity',
+    'search',
     # Third-Party Apps
     'rest_framework',
 ]
@@ -63,6 +64,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'ecms.instrumentation.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,6 +86,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'notifications.context_processors.unread_notifications',
             ],
         },
     },
@@ -143,4 +146,121 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
-LOGOUT_REDIRECT_URL = 'login'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'login'
+
+# Chunked (resumable) uploads, see documents.uploads
+CHUNKED_UPLOAD_DIR = MEDIA_ROOT / '.uploads'
+CHUNKED_UPLOAD_MAX_SIZE = 4 * 1024 ** 3
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
+# Protected downloads, see documents.downloads. Set to 'xsendfile' (Apache,
+# lighttpd) or 'xaccel' (nginx, internal location at SENDFILE_URL_PREFIX
+# aliased to MEDIA_ROOT) to let the front proxy stream the file.
+SENDFILE_BACKEND = None
+SENDFILE_URL_PREFIX = '/protected/'
+
+# Document search, see search.backends. Use 'search.backends.DatabaseBackend'
+# on databases without SQLite FTS5.
+SEARCH_BACKEND = 'search.backends.SQLiteFTSBackend'
+SEARCH_MAX_CONTENT_CHARS = 1000000
+
+# Bulk ingest, see documents.ingest
+BULK_INGEST_CHUNK_SIZE = 500
+BULK_INGEST_WORKERS = 4
+BULK_INGEST_MAX_FILES = 1000
+DATA_UPLOAD_MAX_NUMBER_FILES = BULK_INGEST_MAX_FILES
+
+# Buffered ActivityLog / AuditTrail writes, see activity.events
+ACTIVITY_BUFFER_ENABLED = True
+ACTIVITY_BUFFER_SIZE = 200
+ACTIVITY_BUFFER_INTERVAL = 2.0
+ACTIVITY_FLUSH_RETRIES = 3
+ACTIVITY_SPOOL_DIR = BASE_DIR / 'spool'
+
+# Audit archival, see audit.archive. Months older than AUDIT_HOT_MONTHS are
+# moved from the AuditTrail table to compressed segment files.
+AUDIT_ARCHIVE_DIR = BASE_DIR / 'audit_archive'
+AUDIT_HOT_MONTHS = 6
+
+# Pushed notifications, see notifications.broker. The stream endpoint needs
+# the ASGI application. InMemoryBroker reaches one process only.
+NOTIFICATION_BROKER = 'notifications.broker.InMemoryBroker'
+NOTIFICATION_STREAM_QUEUE_SIZE = 100
+NOTIFICATION_STREAM_KEEPALIVE = 15
+NOTIFICATION_STREAM_TIMEOUT = 300
+NOTIFICATION_STREAM_RETRY_MS = 3000
+
+# Notification digests, see notifications.dispatch. Notifications queued
+# for the same recipient within one window are collapsed into one row.
+NOTIFICATION_DIGEST_ENABLED = True
+NOTIFICATION_DIGEST_WINDOW = 30.0
+NOTIFICATION_DIGEST_MAX_BATCH = 1000
+
+# Document approval from review task tallies, see workflows.approval.
+# APPROVAL_RULE is 'ANY_REJECT', 'ALL_APPROVE' or 'QUORUM'.
+APPROVAL_RULE = 'ANY_REJECT'
+APPROVAL_QUORUM = 2
+
+# Automatic reviewer assignment, see workflows.scheduler. Submitted
+# documents get a task for the least loaded user with one of
+# REVIEW_AUTO_ASSIGN_ROLES, preferring reviewers of the document's category.
+REVIEW_AUTO_ASSIGN = True
+REVIEW_AUTO_ASSIGN_ROLES = ('REVIEWER',)
+REVIEW_CATEGORY_AFFINITY = True
+DEFAULT_REVIEW_WORKFLOW = 'Document review'
+
+# Bulk review API, see workflows.review
+BULK_REVIEW_MAX_TASKS = 500
+
+# Per-request SQL query counts, see ecms.instrumentation. Budgets are keyed
+# by (method, URL name or route for unnamed API routes), set a little above
+# the counts measured by reports.tests.QueryBudgetTests, and enforced by
+# those tests and `manage.py check_query_budgets`.
+QUERY_INSTRUMENTATION_ENABLED = DEBUG
+QUERY_BUDGET_DEFAULT = 12
+QUERY_BUDGETS = {
+    ('GET', 'dashboard'): 7,
+    ('GET', 'login'): 4,
+    ('GET', 'my_documents'): 6,
+    ('GET', 'all_documents'): 7,
+    ('GET', 'upload_document'): 7,
+    ('GET', 'view_document'): 7,
+    ('GET', 'download_document'): 6,
+    ('GET', 'edit_document'): 8,
+    ('GET', 'document_versions'): 8,
+    ('GET', 'download_version'): 6,
+    ('GET', 'folders_list'): 9,
+    ('GET', 'create_folder'): 4,
+    ('GET', 'create_category'): 4,
+    ('GET', 'pending_reviews'): 7,
+    ('GET', 'assign_reviewer'): 9,
+    ('GET', 'my_tasks'): 6,
+    ('GET', 'review_task'): 8,
+    ('GET', 'export_audit'): 4,
+    ('GET', 'notifications_list'): 6,
+    ('GET', 'reports_dashboard'): 6,
+    ('GET', 'api/documents/'): 5,
+    ('GET', 'api/documents/search/'): 5,
+    ('GET', 'api/folders/<int:pk>/'): 7,
+    ('GET', 'api/folders/<int:pk>/documents/'): 6,
+    ('GET', 'api/notifications/unread-count/'): 5,
+    ('GET', 'api/uploads/<uuid:pk>/'): 5,
+    ('GET', 'api/tasks/'): 5,
+    ('POST', 'upload_document'): 30,
+    ('POST', 'edit_document'): 38,
+    ('POST', 'delete_document'): 13,
+    ('POST', 'submit_for_review'): 36,
+    ('POST', 'review_task'): 30,
+    ('POST', 'notifications_mark_all_read'): 8,
+    # Search indexing costs a few queries per file
+    ('POST', 'api/documents/bulk/'): 22,
+    ('POST', 'api/uploads/<uuid:pk>/complete/'): 30,
+    ('PATCH', 'api/tasks/<int:pk>/review/'): 29,
+    ('POST', 'api/tasks/review/'): 40,
+}
+
+# Dashboard cache, see dashboard.cache. Entries are fresh for
+# DASHBOARD_CACHE_TTL seconds, then served stale for up to
+# DASHBOARD_CACHE_STALE seconds while they are rebuilt in the background.
+DASHBOARD_CACHE_TTL = 5
+DASHBOARD_CACHE_STALE = 60
@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from documents.models import Document
+from .instrumentation import QueryCountMiddleware
+
+
+class MediaTestCase(TestCase):
+    """Stores files under a temporary MEDIA_ROOT and writes activity rows synchronously."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            ACTIVITY_BUFFER_ENABLED=False
+        )
+        cls.settings_override.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls.settings_override.disable()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user('owner', password='x', role='USER')
+        cls.document = Document.objects.create(
+            title='Report', file=ContentFile(b'report', name='report.txt'), uploaded_by=cls.owner
+        )
+
+
+@override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+class QueryCountMiddlewareTests(MediaTestCase):
+    def test_counts_a_request(self):
+        self.client.force_login(self.owner)
+        response = self.client.get('/documents/my/')
+        self.assertGreater(int(response['X-DB-Query-Count']), 0)
+
+    async def test_counts_an_async_request(self):
+        await self.async_client.aforce_login(self.owner)
+        response = await self.async_client.get('/documents/my/')
+        self.assertGreater(int(response['X-DB-Query-Count']), 0)
+
+    def test_streaming_responses_are_not_counted(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(f'/documents/download/{self.document.pk}/')
+        self.assertTrue(response.streaming)
+        self.assertNotIn('X-DB-Query-Count', response)
+        response.close()
+
+    def test_follows_the_mode_of_the_handler(self):
+        async def view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(QueryCountMiddleware(view)))
+        self.assertFalse(iscoroutinefunction(QueryCountMiddleware(lambda request: HttpResponse())))
+
+
+class SparseFieldsTests(MediaTestCase):
+    def setUp(self):
+        self.client.force_login(self.owner)
+
+    def test_only_the_requested_columns_are_selected(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/documents/', {'fields': 'id,title'})
+        self.assertEqual(response.json()['results'], [{'id': self.document.pk, 'title': 'Report'}])
+
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT "documents_document"')]
+        self.assertEqual(len(selects), 1)
+        columns = selects[0].split(' FROM ')[0]
+        # The title and the keyset ordering, nothing else.
+        for column in ('"id"', '"title"', '"created_at"'):
+            self.assertIn(column, columns)
+        for column in ('"file"', '"file_size"', '"review_comments"', '"status"'):
+            self.assertNotIn(column, columns)
+
+    def test_unknown_fields_are_refused(self):
+        response = self.client.get('/api/documents/', {'fields': 'id,owner'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('owner', response.json()['fields'])
+
+
+class ConditionalGetTests(MediaTestCase):
+    def test_matching_etag_is_not_modified(self):
+        self.client.force_login(self.owner)
+        response = self.client.get('/api/documents/')
+        etag = response['ETag']
+
+        response = self.client.get('/api/documents/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.document.title = 'Renamed'
+        self.document.save()
+        response = self.client.get('/api/documents/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,77 @@
+"""
+Change tracking for model instances.
+
+TrackedFieldsMixin keeps a snapshot of the field values an instance was
+loaded with, so save() and validation can tell what changed without
+reading the row again. An instance built by hand reads its row once, the
+first time the snapshot is needed. save() implementations call
+_store_loaded_values() once the row is written.
+"""
+from django.db import models
+
+
+class TrackedFieldsMixin:
+    # Fields never reported as changed, such as auto-updated timestamps
+    untracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the values as loaded, used by get_changed_fields()
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _current_value(self, field):
+        value = getattr(self, field.attname)
+        if isinstance(field, models.FileField):
+            return value.name or ''
+        return value
+
+    def _store_loaded_values(self, field_names=None):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            loaded = self._loaded_values = {}
+        deferred = self.get_deferred_fields()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            if field_names is None or field.name in field_names or field.attname in field_names:
+                loaded[field.attname] = self._current_value(field)
+
+    def _get_loaded_values(self):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            if self.pk is None:
+                return {}
+            # Instance was built by hand rather than loaded; read the row once.
+            attnames = [field.attname for field in self._meta.concrete_fields]
+            loaded = type(self)._default_manager.filter(pk=self.pk).values(*attnames).first() or {}
+            self._loaded_values = loaded
+        return loaded
+
+    def get_changed_fields(self):
+        """
+        Names of fields whose value differs from what was loaded from the database.
+        Deferred fields and untracked_fields are never reported.
+        """
+        loaded = self._get_loaded_values()
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.attname not in loaded or field.name in self.untracked_fields:
+                continue
+            old_value = loaded[field.attname]
+            if isinstance(field, models.FileField):
+                old_value = old_value or ''
+            if old_value != self._current_value(field):
+                changed.add(field.name)
+        return changed
+
+    def has_changed(self, name):
+        """Whether field `name` differs from its loaded value. Always true for unsaved instances."""
+        if self.pk is None:
+            return True
+        return name in self.get_changed_fields()
+
+    def get_old_value(self, name):
+        """The loaded value of field `name` (its id for a foreign key), or None if unknown."""
+        return self._get_loaded_values().get(self._meta.get_field(name).attname)
@@ -19,8 +19,11 @@ urlpatterns = [
     path('folders/', include('folders.urls')),
     path('versions/', include('versions.urls')),
     path('reports/', include('reports.urls')),
+    path('audit/', include('audit.urls')),
     path('api/', include('documents.api.urls')),
     path('api/', include('workflows.api.urls')),
+    path('api/', include('folders.api.urls')),
+    path('api/', include('notifications.api.urls')),
 ]
 
 if settings.DEBUG:
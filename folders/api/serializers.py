@@ -0,0 +1,20 @@
+from rest_framework import serializers
+from ecms.api import SparseFieldsSerializerMixin
+from folders.models import Folder
+
+
+class FolderSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    ancestors = serializers.SerializerMethodField()
+    stats = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Folder
+        fields = ['id', 'name', 'parent', 'depth', 'ancestors', 'stats', 'created_at']
+
+    def get_ancestors(self, folder):
+        return [{'id': a.id, 'name': a.name} for a in folder.get_ancestors().only('id', 'name', 'depth')]
+
+    def get_stats(self, folder):
+        """Document count, bytes and status breakdown including subfolders."""
+        from reports.counters import folder_stats
+        return folder_stats([folder.pk])[folder.pk]
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import FolderDetailAPI, FolderDocumentsAPI
+
+urlpatterns = [
+    path('folders/<int:pk>/', FolderDetailAPI.as_view()),
+    path('folders/<int:pk>/documents/', FolderDocumentsAPI.as_view()),
+]
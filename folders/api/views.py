@@ -0,0 +1,34 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+from documents.api.serializers import DocumentSerializer
+from documents.models import Document
+from ecms.api import ConditionalGetMixin, SparseFieldsMixin
+from ecms.pagination import KeysetPagination
+from folders.models import Folder
+from .serializers import FolderSerializer
+
+
+class FolderDetailAPI(ConditionalGetMixin, SparseFieldsMixin, generics.RetrieveAPIView):
+    """A folder with its depth and breadcrumb of ancestors."""
+    serializer_class = FolderSerializer
+    permission_classes = [IsAuthenticated]
+    queryset = Folder.objects.all()
+
+
+class FolderDocumentsAPI(ConditionalGetMixin, SparseFieldsMixin, generics.ListAPIView):
+    """
+    Documents in a folder and, unless ?recursive=0, in all of its subfolders.
+    """
+    serializer_class = DocumentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        folder = get_object_or_404(Folder, pk=self.kwargs['pk'])
+        documents = Document.objects.active().visible_to(self.request.user)
+        if self.request.query_params.get('recursive', '1') in ('0', 'false'):
+            documents = documents.filter(folder=folder)
+        else:
+            documents = documents.filter(**folder.subtree_lookup('folder__'))
+        return documents
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-17 13:04
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Folder = apps.get_model('folders', 'Folder')
+    parents = dict(Folder.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def path_of(folder_id):
+        if folder_id not in paths:
+            parent_id = parents[folder_id]
+            prefix = path_of(parent_id) if parent_id is not None else ''
+            paths[folder_id] = prefix + str(folder_id).zfill(10)
+        return paths[folder_id]
+
+    folders = []
+    for folder_id in parents:
+        path = path_of(folder_id)
+        folders.append(Folder(id=folder_id, path=path, depth=len(path) // 10 - 1))
+    Folder.objects.bulk_update(folders, ['path', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('folders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='folder',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='folder',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
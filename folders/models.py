@@ -1,8 +1,30 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from .signals import folder_moved
 
 User = settings.AUTH_USER_MODEL
 
+# Width of one materialized path segment: every folder id, zero padded.
+PATH_STEP = 10
+
+
+def path_segment(pk):
+    return str(pk).zfill(PATH_STEP)
+
+
+def path_ids(path):
+    """Folder ids along a path, root first, ending with the folder itself."""
+    return [int(path[i:i + PATH_STEP]) for i in range(0, len(path), PATH_STEP)]
+
+
+def path_upper_bound(path):
+    """Smallest path after every path that starts with `path` (the last segment plus one)."""
+    return path[:-PATH_STEP] + path_segment(int(path[-PATH_STEP:]) + 1)
+
+
 class Folder(models.Model):
     name = models.CharField(max_length=255)
     parent = models.ForeignKey(
@@ -14,10 +36,88 @@ class Folder(models.Model):
     )
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Materialized path: the ids of the ancestors and the folder itself,
+    # PATH_STEP digits each. A subtree is one index range scan, see subtree_lookup().
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
 
+    def subtree_lookup(self, prefix=''):
+        """Filter kwargs matching this folder and everything below it."""
+        return {
+            f'{prefix}path__gte': self.path,
+            f'{prefix}path__lt': path_upper_bound(self.path),
+        }
+
+    def get_descendants(self, include_self=False):
+        folders = Folder.objects.filter(**self.subtree_lookup())
+        if not include_self:
+            folders = folders.exclude(pk=self.pk)
+        return folders
+
+    def get_ancestor_ids(self):
+        return path_ids(self.path)[:-1]
+
+    def get_ancestors(self):
+        """Ancestors from the root down, excluding this folder."""
+        return Folder.objects.filter(pk__in=self.get_ancestor_ids()).order_by('depth')
+
+    def is_descendant_of(self, other):
+        return self.path.startswith(other.path) and self.pk != other.pk
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            stored = None
+            if self.pk is not None:
+                # Read the stored parent and path under a row lock: this
+                # instance may be stale, e.g. an ancestor moved since it was loaded.
+                stored = Folder.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'parent_id', 'path'
+                ).first()
+            is_new = stored is None
+            old_parent_id, old_path = stored or (None, '')
+            moved = is_new or not old_path or (
+                self.parent_id != old_parent_id
+                and (update_fields is None or {'parent', 'parent_id'} & set(update_fields))
+            )
+
+            parent_path = ''
+            if moved and self.parent_id is not None:
+                parent_path = Folder.objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+                if not is_new and old_path and parent_path.startswith(old_path):
+                    raise ValidationError("A folder cannot be moved into itself or its subfolders")
+
+            # path and depth are only ever written by the UPDATEs below.
+            if not is_new:
+                if update_fields is None:
+                    update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+                kwargs['update_fields'] = [name for name in update_fields if name not in ('path', 'depth')]
+            super().save(*args, **kwargs)
+
+            if not moved:
+                self.path = old_path
+                self.depth = len(old_path) // PATH_STEP - 1
+                return
+
+            self.path = parent_path + path_segment(self.pk)
+            self.depth = len(self.path) // PATH_STEP - 1
+            if is_new or not old_path:
+                Folder.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+                return
+
+            # Moved: rewrite the prefix of the whole subtree in one statement.
+            Folder.objects.filter(
+                path__gte=old_path,
+                path__lt=path_upper_bound(old_path)
+            ).update(
+                path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (len(self.path) - len(old_path)) // PATH_STEP
+            )
+            folder_moved.send(sender=Folder, folder=self, old_path=old_path, new_path=self.path)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
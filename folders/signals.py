@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent inside the saving transaction after a folder (and with it its whole
+# subtree) got a new parent. Paths are materialized paths, see Folder.path.
+folder_moved = Signal()
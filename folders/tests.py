@@ -1,3 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Folder, path_segment
+
+
+class FolderPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('admin', password='x', role='ADMIN')
+
+    def create(self, name, parent=None):
+        return Folder.objects.create(name=name, parent=parent, created_by=self.user)
+
+    def assertPath(self, folder, *ancestors):
+        folder.refresh_from_db()
+        expected = ''.join(path_segment(f.pk) for f in (*ancestors, folder))
+        self.assertEqual(folder.path, expected)
+        self.assertEqual(folder.depth, len(ancestors))
+
+    def test_new_folders_get_paths(self):
+        root = self.create('Root')
+        child = self.create('Child', root)
+        self.assertPath(root)
+        self.assertPath(child, root)
+        self.assertEqual(list(root.get_descendants()), [child])
+
+    def test_move_rewrites_the_subtree(self):
+        a = self.create('A')
+        b = self.create('B')
+        child = self.create('Child', a)
+        leaf = self.create('Leaf', child)
+
+        child.parent = b
+        child.save()
+
+        self.assertPath(child, b)
+        self.assertPath(leaf, b, child)
+        self.assertEqual(list(a.get_descendants()), [])
+        self.assertEqual(set(b.get_descendants()), {child, leaf})
+
+    def test_move_into_own_subtree_is_refused(self):
+        root = self.create('Root')
+        child = self.create('Child', root)
+        root.parent = child
+        with self.assertRaises(ValidationError):
+            root.save()
+
+    def test_saving_a_stale_instance_keeps_the_stored_path(self):
+        a = self.create('A')
+        b = self.create('B')
+        child = self.create('Child', a)
+        leaf = self.create('Leaf', child)
+        stale = Folder.objects.get(pk=leaf.pk)
+
+        child.parent = b
+        child.save()
+        # Renamed through an instance loaded before its parent moved.
+        stale.name = 'Renamed'
+        stale.save()
+
+        self.assertPath(leaf, b, child)
+        self.assertEqual(stale.path, leaf.path)
+        self.assertEqual(leaf.name, 'Renamed')
+
+    def test_moving_a_stale_instance_uses_the_stored_path(self):
+        a = self.create('A')
+        b = self.create('B')
+        c = self.create('C')
+        child = self.create('Child', a)
+        leaf = self.create('Leaf', child)
+        stale = Folder.objects.get(pk=child.pk)
+
+        a.parent = b
+        a.save()
+        stale.parent = c
+        stale.save()
+
+        self.assertPath(child, c)
+        self.assertPath(leaf, c, child)
+        self.assertEqual(list(a.get_descendants()), [])
+
+    def test_rename_with_update_fields_does_not_move(self):
+        a = self.create('A')
+        b = self.create('B')
+        child = self.create('Child', a)
+        child.parent = b
+        child.name = 'Renamed'
+        child.save(update_fields=['name'])
+
+        self.assertPath(child, a)
+        self.assertEqual(child.name, 'Renamed')
@@ -8,7 +8,15 @@ from accounts.decorators import role_required
 @login_required
 @role_required("ADMIN", "EDITOR")
 def folders_list(request):
-    folders = Folder.objects.filter(created_by=request.user, parent__isnull=True)
+    from reports.counters import folder_stats
+
+    folders = Folder.objects.filter(parent__isnull=True)
+    if not request.user.is_admin():
+        folders = folders.filter(created_by=request.user)
+    folders = list(folders)
+    stats = folder_stats([folder.pk for folder in folders])
+    for folder in folders:
+        folder.stats = stats[folder.pk]
     categories = Category.objects.all()
     return render(
         request,
@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, UnreadCounter
 
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+admin.site.register(UnreadCounter)
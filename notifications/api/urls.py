@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import UnreadCountAPI
+
+urlpatterns = [
+    path('notifications/unread-count/', UnreadCountAPI.as_view()),
+]
@@ -0,0 +1,13 @@
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ecms.api import ConditionalGetMixin
+from notifications.counters import unread_count
+
+
+class UnreadCountAPI(ConditionalGetMixin, APIView):
+    """GET returns {"unread": n} for the navbar badge."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({'unread': unread_count(request.user.pk)})
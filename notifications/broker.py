@@ -0,0 +1,97 @@
+"""
+Publish/subscribe for pushing new notifications to connected browsers.
+
+Notification rows are published after their transaction commits and
+delivered to the user's open event streams (see views.notifications_stream).
+The broker is chosen with the NOTIFICATION_BROKER setting. InMemoryBroker
+only reaches subscribers in the same process, so run a single ASGI worker
+with it or plug in a broker backed by a shared service.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.NOTIFICATION_BROKER)()
+    return _broker
+
+
+class BaseBroker:
+    def publish(self, user_id, event):
+        """Deliver `event` (a JSON-serializable dict) to `user_id`'s subscribers. May be called from any thread."""
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        """Return a Subscription receiving the events published to `user_id`."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class Subscription:
+    """
+    An asyncio queue of events bound to the event loop that created it.
+    When the consumer falls behind the queue is closed as overflowed and
+    the consumer is expected to reload from the database.
+    """
+
+    def __init__(self, user_id, max_size=None):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_size or settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Queue `event` from any thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """Next event, or None after `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryBroker(BaseBroker):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def publish(self, user_id, event):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The subscriber's event loop has been closed.
+                self.unsubscribe(subscription)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id)
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscribers[subscription.user_id]
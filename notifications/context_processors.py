@@ -0,0 +1,9 @@
+from .counters import unread_count
+
+
+def unread_notifications(request):
+    """The navbar's unread notification badge."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_notification_count': unread_count(user.pk)}
@@ -0,0 +1,51 @@
+"""
+Per-user unread notification counts.
+
+adjust() runs in the transaction that creates, reads or deletes
+notifications and moves the user's UnreadCounter with an F() update.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Notification, UnreadCounter
+
+
+def adjust(user_id, delta, create=True):
+    """
+    Move the user's counter by `delta`. A missing counter is only created
+    for a positive delta and `create`, never while the user is being deleted.
+    """
+    if not delta:
+        return
+    rows = UnreadCounter.objects.filter(user_id=user_id)
+    if rows.update(count=F('count') + delta) or not create or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            UnreadCounter.objects.create(user_id=user_id, count=delta)
+    except IntegrityError:
+        # Created concurrently by another transaction.
+        rows.update(count=F('count') + delta)
+
+
+def unread_count(user_id):
+    count = UnreadCounter.objects.filter(user_id=user_id).values_list('count', flat=True).first()
+    return max(count or 0, 0)
+
+
+def mark_all_read(user_id):
+    """Mark the user's notifications read. Returns how many were unread."""
+    with transaction.atomic():
+        marked = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+        adjust(user_id, -marked)
+    return marked
+
+
+def rebuild():
+    """Recompute every counter from the Notification table."""
+    with transaction.atomic():
+        UnreadCounter.objects.all().delete()
+        UnreadCounter.objects.bulk_create([
+            UnreadCounter(user_id=row['user_id'], count=row['count'])
+            for row in Notification.objects.filter(is_read=False).values('user_id').annotate(count=Count('id'))
+        ])
@@ -0,0 +1,133 @@
+"""
+Coalescing notification dispatcher.
+
+notify() queues a notification once the surrounding transaction commits,
+using the spooled background writer of activity.events. The queue is
+flushed every NOTIFICATION_DIGEST_WINDOW seconds (sooner when
+NOTIFICATION_DIGEST_MAX_BATCH are waiting). Queued notifications with the
+same recipient and digest key are collapsed into one digest row, e.g.
+"12 documents approved by alice". Rows are inserted with bulk_create(),
+then counted as unread and pushed to event streams like saved ones.
+
+Set NOTIFICATION_DIGEST_ENABLED = False to create rows synchronously.
+"""
+import os
+import threading
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from activity import events
+from documents.models import Document
+from . import counters
+from .models import Notification
+from .signals import publish
+
+SPOOL_NAME = 'notifications'
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def coalesce(queued):
+    """
+    Collapse queued notifications (dicts) into the field dicts of the rows
+    to insert, in the order their first notification was queued.
+    """
+    groups = {}
+    for index, item in enumerate(queued):
+        key = item.get('digest_key')
+        group_key = (item['user_id'], key) if key else (item['user_id'], None, index)
+        groups.setdefault(group_key, []).append(item)
+
+    rows = []
+    for items in groups.values():
+        first = items[0]
+        if len(items) == 1:
+            message = first['message']
+        else:
+            message = first['digest_message'].format(count=len(items))
+        documents = {item['document_id'] for item in items}
+        rows.append({
+            'user_id': first['user_id'],
+            'document_id': documents.pop() if len(documents) == 1 else None,
+            'message': message,
+            'notification_type': first['notification_type'],
+        })
+    return rows
+
+
+def write_notifications(queued):
+    """Insert the coalesced rows of `queued` in one transaction."""
+    rows = coalesce(queued)
+    user_ids = {row['user_id'] for row in rows}
+    document_ids = {row['document_id'] for row in rows if row['document_id'] is not None}
+    # Recipients or documents may have been deleted before the flush.
+    existing_users = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    existing_documents = set(Document.objects.filter(pk__in=document_ids).values_list('pk', flat=True))
+
+    notifications = []
+    for row in rows:
+        if row['user_id'] not in existing_users:
+            continue
+        if row['document_id'] not in existing_documents:
+            row['document_id'] = None
+        notifications.append(Notification(**row))
+
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create(notifications)
+        for user_id, count in Counter(n.user_id for n in notifications).items():
+            counters.adjust(user_id, count)
+        publish(notifications)
+    return notifications
+
+
+def get_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None or _dispatcher.pid != os.getpid():
+            _dispatcher = events.EventWriter(
+                settings.ACTIVITY_SPOOL_DIR,
+                settings.NOTIFICATION_DIGEST_MAX_BATCH,
+                settings.NOTIFICATION_DIGEST_WINDOW,
+                name=SPOOL_NAME,
+                write=write_notifications,
+                max_retries=settings.ACTIVITY_FLUSH_RETRIES
+            )
+            _dispatcher.start()
+        return _dispatcher
+
+
+def _enqueue(item):
+    get_dispatcher().put(item)
+
+
+def notify(user, message, notification_type, document=None, digest_key=None, digest_message=None):
+    """
+    Send `user` a notification. Notifications to the same user with the
+    same `digest_key` inside one window become a single row reading
+    `digest_message` with {count} filled in.
+    """
+    if not settings.NOTIFICATION_DIGEST_ENABLED:
+        Notification.objects.create(
+            user=user,
+            document=document,
+            message=message,
+            notification_type=notification_type
+        )
+        return
+    transaction.on_commit(partial(_enqueue, {
+        'user_id': user.pk,
+        'document_id': document.pk if document is not None else None,
+        'message': message,
+        'notification_type': notification_type,
+        'digest_key': digest_key,
+        'digest_message': digest_message,
+    }))
+
+
+def replay_orphans():
+    return events.replay_orphans(settings.ACTIVITY_SPOOL_DIR, SPOOL_NAME, write_notifications)
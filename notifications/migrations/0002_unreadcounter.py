@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-17 13:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    UnreadCounter.objects.bulk_create([
+        UnreadCounter(user_id=row['user_id'], count=row['n'])
+        for row in Notification.objects.filter(is_read=False).values('user_id').annotate(n=Count('id'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_role'),
+        ('documents', '0006_document_file_size'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_notifications', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notificatio_user_id_90f3d6_idx'),
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,12 @@
 from django.db import models
 from django.conf import settings
 from documents.models import Document
+from ecms.tracking import TrackedFieldsMixin
 
 User = settings.AUTH_USER_MODEL
 
 
-class Notification(models.Model):
+class Notification(TrackedFieldsMixin, models.Model):
     NOTIFICATION_TYPES = (
         ('TASK', 'Task'),
         ('DOCUMENT', 'Document'),
@@ -26,5 +27,39 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the inbox, see ecms.pagination
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user}"
+
+    def as_event(self):
+        """The payload pushed to the user's event stream."""
+        return {
+            'id': self.pk,
+            'message': self.message,
+            'notification_type': self.notification_type,
+            'document_id': self.document_id,
+            'created_at': self.created_at.isoformat(),
+        }
+
+
+class UnreadCounter(models.Model):
+    """
+    Number of unread notifications per user, kept in step with
+    Notification by notifications.counters so the navbar badge is a primary
+    key lookup instead of a COUNT.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_notifications'
+    )
+    count = models.IntegerField(default=0)
+
     def __str__(self):
-        return f"Notification for {self.user}"
\ No newline at end of file
+        return f"{self.user_id}: {self.count} unread"
@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters
+from .broker import get_broker
+from .models import Notification
+
+
+def publish(notifications):
+    """Push `notifications` to their users' event streams once the transaction commits."""
+    events = [(notification.user_id, notification.as_event()) for notification in notifications]
+
+    def send():
+        broker = get_broker()
+        for user_id, event in events:
+            broker.publish(user_id, event)
+
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    if created:
+        publish([instance])
+
+
+def saves_is_read(instance, update_fields):
+    return instance.pk is not None and (update_fields is None or 'is_read' in update_fields)
+
+
+@receiver(pre_save, sender=Notification)
+def load_read_state(sender, instance, update_fields, **kwargs):
+    # Loaded with is_read deferred: read the stored value before it is overwritten.
+    if saves_is_read(instance, update_fields) and instance.get_old_value('is_read') is None:
+        instance._loaded_values['is_read'] = Notification.objects.filter(
+            pk=instance.pk
+        ).values_list('is_read', flat=True).first()
+
+
+@receiver(post_save, sender=Notification)
+def count_unread(sender, instance, created, update_fields, **kwargs):
+    if not created and not saves_is_read(instance, update_fields):
+        return
+    was_unread = not created and instance.get_old_value('is_read') is False
+    counters.adjust(instance.user_id, int(not instance.is_read) - int(was_unread))
+    instance._store_loaded_values(['is_read'])
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_unread(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None)
+    if (loaded.get('is_read') if loaded is not None else instance.is_read) is False:
+        # The counter may already be gone when the user is being deleted.
+        counters.adjust(instance.user_id, -1, create=False)
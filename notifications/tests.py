@@ -1,3 +1,53 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from . import counters
+from .models import Notification, UnreadCounter
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('reader', password='x')
+
+    def test_counts_created_read_and_deleted_notifications(self):
+        first = Notification.objects.create(user=self.user, message='one', notification_type='TASK')
+        Notification.objects.create(user=self.user, message='two', notification_type='TASK')
+        self.assertEqual(counters.unread_count(self.user.pk), 2)
+
+        first.is_read = True
+        first.save()
+        self.assertEqual(counters.unread_count(self.user.pk), 1)
+
+        Notification.objects.filter(is_read=False).get().delete()
+        self.assertEqual(counters.unread_count(self.user.pk), 0)
+
+    def test_deleting_user_with_unread_notifications(self):
+        Notification.objects.create(user=self.user, message='unread', notification_type='TASK')
+
+        self.user.delete()
+
+        self.assertFalse(UnreadCounter.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_negative_adjust_never_creates_a_counter(self):
+        counters.adjust(self.user.pk, -1)
+        self.assertFalse(UnreadCounter.objects.filter(user=self.user).exists())
+
+    def test_loading_notifications_reads_no_deferred_fields(self):
+        for i in range(3):
+            Notification.objects.create(user=self.user, message=str(i), notification_type='TASK')
+        with self.assertNumQueries(1):
+            notifications = list(Notification.objects.only('id', 'message'))
+        self.assertEqual(len(notifications), 3)
+
+    def test_marking_a_deferred_notification_read(self):
+        Notification.objects.create(user=self.user, message='unread', notification_type='TASK')
+        notification = Notification.objects.defer('is_read').get()
+
+        notification.is_read = True
+        notification.save()
+        self.assertEqual(counters.unread_count(self.user.pk), 0)
+
+        notification.message = 'edited'
+        notification.save(update_fields=['message'])
+        self.assertEqual(counters.unread_count(self.user.pk), 0)
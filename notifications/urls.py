@@ -1,10 +1,8 @@
 from django.urls import path
-from .views import notifications_list, notifications_mark_all_read
+from .views import notifications_list, notifications_mark_all_read, notifications_stream
 
 urlpatterns = [
     path("", notifications_list, name="notifications_list"),
     path("mark-all-read/", notifications_mark_all_read, name="notifications_mark_all_read"),
+    path("stream/", notifications_stream, name="notifications_stream"),
 ]
-
-
-
@@ -1,23 +1,81 @@
+import json
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
+from ecms.pagination import KeysetPaginator
+from . import counters
+from .broker import get_broker
 from .models import Notification
 
 
 @login_required
 def notifications_list(request):
-    notifications = Notification.objects.filter(user=request.user).order_by(
-        "-created_at"
-    )
+    notifications = Notification.objects.filter(user=request.user).select_related("document")
+    paginator = KeysetPaginator(notifications, ("-created_at", "-id"), per_page=20)
+    notifications_page = paginator.get_page(request.GET.get("cursor"))
     return render(
         request,
         "notifications/notifications_list.html",
-        {"notifications": notifications},
+        {"notifications": notifications_page},
     )
 
 
 @login_required
 def notifications_mark_all_read(request):
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    counters.mark_all_read(request.user.pk)
     messages.success(request, "All notifications marked as read.")
     return redirect("notifications_list")
+
+
+def _sse(event):
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+
+async def _event_stream(user_id, last_id):
+    broker = get_broker()
+    # Subscribe before replaying so nothing created in between is missed.
+    subscription = broker.subscribe(user_id)
+    try:
+        yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n"
+        if last_id is not None:
+            missed = Notification.objects.filter(user_id=user_id, pk__gt=last_id).order_by('pk')
+            async for notification in missed[:settings.NOTIFICATION_STREAM_QUEUE_SIZE]:
+                yield _sse(notification.as_event())
+                last_id = notification.pk
+
+        deadline = subscription.loop.time() + settings.NOTIFICATION_STREAM_TIMEOUT
+        while subscription.loop.time() < deadline and not subscription.overflowed:
+            event = await subscription.get(timeout=settings.NOTIFICATION_STREAM_KEEPALIVE)
+            if event is None:
+                yield ": keepalive\n\n"
+            elif last_id is None or event['id'] > last_id:
+                yield _sse(event)
+                last_id = event['id']
+        # Closing makes the browser reconnect with Last-Event-ID and
+        # catch up from the database.
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def notifications_stream(request):
+    """
+    Server-Sent Events stream of the user's new notifications. Needs the
+    ASGI application (ecms.asgi); under WSGI it answers 204, which tells
+    EventSource not to reconnect.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if 'wsgi.version' in request.META:
+        return HttpResponse(status=204)
+
+    last_id = request.headers.get('Last-Event-ID', '')
+    last_id = int(last_id) if last_id.isdigit() else None
+    return StreamingHttpResponse(
+        _event_stream(user.pk, last_id),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import DocumentCounter
 
-# Register your models here.
+
+@admin.register(DocumentCounter)
+class DocumentCounterAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'scope_id', 'status', 'count', 'bytes')
+    list_filter = ('scope', 'status')
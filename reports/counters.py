@@ -0,0 +1,202 @@
+"""
+Incrementally maintained document status counters.
+
+apply_change() is called inside the transaction that changes a document
+(see documents.signals.document_state_changed) and adjusts the affected
+DocumentCounter rows with F() updates, so reading the dashboard numbers
+is a single indexed lookup instead of a COUNT over Document.
+
+A document in a folder is also counted in the FOLDER_TREE rows of that
+folder and all of its ancestors, found through the folder's materialized
+path. Moving or deleting a folder adjusts the ancestors' rows for the
+whole subtree at once.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from folders.models import Folder, path_ids
+from .models import DocumentCounter
+
+SCOPE_FIELDS = (
+    ('USER', 'uploaded_by_id'),
+    ('FOLDER', 'folder_id'),
+    ('CATEGORY', 'category_id'),
+)
+
+
+def folder_paths(folder_ids):
+    folder_ids = {pk for pk in folder_ids if pk is not None}
+    if not folder_ids:
+        return {}
+    return dict(Folder.objects.filter(pk__in=folder_ids).values_list('pk', 'path'))
+
+
+def counter_keys(state, paths=None):
+    """(scope, scope_id, status) rows a document in `state` is counted in."""
+    if state is None or state['is_deleted']:
+        return []
+    keys = [('GLOBAL', 0, state['status'])]
+    for scope, field in SCOPE_FIELDS:
+        if state[field] is not None:
+            keys.append((scope, state[field], state['status']))
+    if state['folder_id'] is not None:
+        if paths is None:
+            paths = folder_paths([state['folder_id']])
+        path = paths.get(state['folder_id'])
+        for folder_id in path_ids(path) if path else [state['folder_id']]:
+            keys.append(('FOLDER_TREE', folder_id, state['status']))
+    return keys
+
+
+def _bump(scope, scope_id, status, delta, size_delta=0):
+    rows = DocumentCounter.objects.filter(scope=scope, scope_id=scope_id, status=status)
+    if rows.update(count=F('count') + delta, bytes=F('bytes') + size_delta):
+        return
+    try:
+        with transaction.atomic():
+            DocumentCounter.objects.create(
+                scope=scope, scope_id=scope_id, status=status, count=delta, bytes=size_delta
+            )
+    except IntegrityError:
+        # Created concurrently by another transaction.
+        rows.update(count=F('count') + delta, bytes=F('bytes') + size_delta)
+
+
+def apply_changes(changes):
+    """Apply many (old_state, new_state) pairs with one update per affected counter."""
+    changes = list(changes)
+    paths = folder_paths(
+        state['folder_id'] for pair in changes for state in pair if state is not None
+    )
+    counts = Counter()
+    sizes = Counter()
+    for old_state, new_state in changes:
+        for key in counter_keys(old_state, paths):
+            counts[key] -= 1
+            sizes[key] -= old_state['file_size']
+        for key in counter_keys(new_state, paths):
+            counts[key] += 1
+            sizes[key] += new_state['file_size']
+    changed = [key for key in counts.keys() | sizes.keys() if counts[key] or sizes[key]]
+    if not changed:
+        return
+
+    # Create the missing rows first, so the counters are then moved with one
+    # F() update per distinct delta rather than one per row.
+    DocumentCounter.objects.bulk_create(
+        [DocumentCounter(scope=scope, scope_id=scope_id, status=status) for scope, scope_id, status in changed],
+        ignore_conflicts=True
+    )
+    by_delta = {}
+    for key in changed:
+        by_delta.setdefault((counts[key], sizes[key]), []).append(key)
+    for (delta, size_delta), keys in by_delta.items():
+        condition = Q()
+        for scope, scope_id, status in keys:
+            condition |= Q(scope=scope, scope_id=scope_id, status=status)
+        DocumentCounter.objects.filter(condition).update(
+            count=F('count') + delta, bytes=F('bytes') + size_delta
+        )
+
+
+def apply_change(old_state, new_state):
+    apply_changes([(old_state, new_state)])
+
+
+def move_folder(folder_id, old_path, new_path):
+    """A subtree moved: shift its FOLDER_TREE totals from the old ancestors to the new ones."""
+    old_ancestors = set(path_ids(old_path)[:-1])
+    new_ancestors = set(path_ids(new_path)[:-1])
+    totals = DocumentCounter.objects.filter(scope='FOLDER_TREE', scope_id=folder_id)
+    for status, count, size in totals.values_list('status', 'count', 'bytes'):
+        for ancestor_id in old_ancestors - new_ancestors:
+            _bump('FOLDER_TREE', ancestor_id, status, -count, -size)
+        for ancestor_id in new_ancestors - old_ancestors:
+            _bump('FOLDER_TREE', ancestor_id, status, count, size)
+
+
+def remove_folder(folder):
+    """
+    Called for every folder a delete removes. Its own documents leave the
+    ancestors' totals and its rows go. Rows of ancestors deleted in the
+    same cascade may already be gone, so only existing rows are updated.
+    """
+    ancestors = folder.get_ancestor_ids()
+    direct = DocumentCounter.objects.filter(scope='FOLDER', scope_id=folder.pk)
+    for status, count, size in direct.values_list('status', 'count', 'bytes'):
+        DocumentCounter.objects.filter(
+            scope='FOLDER_TREE', scope_id__in=ancestors, status=status
+        ).update(count=F('count') - count, bytes=F('bytes') - size)
+    DocumentCounter.objects.filter(scope__in=['FOLDER', 'FOLDER_TREE'], scope_id=folder.pk).delete()
+
+
+def status_counts(scope='GLOBAL', scope_id=0):
+    """{'total': n, 'DRAFT': n, 'REVIEW': n, ...} for one scope."""
+    counts = dict(
+        DocumentCounter.objects.filter(scope=scope, scope_id=scope_id)
+        .values_list('status', 'count')
+    )
+    counts['total'] = sum(counts.values())
+    return counts
+
+
+def folder_stats(folder_ids):
+    """
+    Totals including subfolders, for many folders in one query:
+    {folder_id: {'total': n, 'bytes': n, 'statuses': {'DRAFT': n, ...}}}
+    """
+    stats = {pk: {'total': 0, 'bytes': 0, 'statuses': {}} for pk in folder_ids}
+    rows = DocumentCounter.objects.filter(scope='FOLDER_TREE', scope_id__in=stats)
+    for folder_id, status, count, size in rows.values_list('scope_id', 'status', 'count', 'bytes'):
+        if count:
+            stats[folder_id]['statuses'][status] = count
+        stats[folder_id]['total'] += count
+        stats[folder_id]['bytes'] += size
+    return stats
+
+
+def rebuild(document_model=None, folder_model=None):
+    """Recompute every counter from Document. Returns the number of rows written."""
+    if document_model is None:
+        from documents.models import Document as document_model
+    if folder_model is None:
+        folder_model = Folder
+
+    documents = document_model.objects.filter(is_deleted=False)
+    rows = [
+        DocumentCounter(scope='GLOBAL', scope_id=0, status=row['status'], count=row['n'], bytes=row['size'] or 0)
+        for row in documents.values('status').annotate(n=Count('id'), size=Sum('file_size'))
+    ]
+    tree = {}
+    for scope, field in SCOPE_FIELDS:
+        grouped = (
+            documents.exclude(**{field: None})
+            .values(field, 'status')
+            .annotate(n=Count('id'), size=Sum('file_size'))
+        )
+        for row in grouped:
+            rows.append(DocumentCounter(
+                scope=scope, scope_id=row[field], status=row['status'], count=row['n'], bytes=row['size'] or 0
+            ))
+            if scope == 'FOLDER':
+                tree.setdefault(row[field], []).append((row['status'], row['n'], row['size'] or 0))
+
+    paths = dict(folder_model.objects.filter(pk__in=tree).values_list('pk', 'path'))
+    totals = Counter()
+    sizes = Counter()
+    for folder_id, statuses in tree.items():
+        for ancestor_id in path_ids(paths[folder_id]):
+            for status, count, size in statuses:
+                totals[ancestor_id, status] += count
+                sizes[ancestor_id, status] += size
+    rows.extend(
+        DocumentCounter(scope='FOLDER_TREE', scope_id=folder_id, status=status, count=count, bytes=sizes[folder_id, status])
+        for (folder_id, status), count in totals.items()
+    )
+
+    with transaction.atomic():
+        DocumentCounter.objects.all().delete()
+        DocumentCounter.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
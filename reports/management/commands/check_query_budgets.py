@@ -0,0 +1,107 @@
+import logging
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from ecms.instrumentation import QueryRecorder, query_budget
+
+SKIPPED_PREFIXES = ('admin/', '^media/')
+PARAMETER = re.compile(r'<(?:\w+:)?(\w+)>')
+
+
+def iter_patterns(patterns, prefix=''):
+    """(route, name) of every URL pattern below `patterns`."""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern.name
+
+
+class Command(BaseCommand):
+    help = (
+        "GET every URL pattern as the given user and fail when one runs more "
+        "SQL queries than its QUERY_BUDGETS entry. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username to request the pages as")
+        parser.add_argument(
+            '--kwarg',
+            action='append',
+            default=[],
+            metavar='NAME=VALUE',
+            help="Value for a URL parameter, e.g. document_id=3. Patterns with a missing parameter are skipped."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        kwargs = {}
+        for item in options['kwarg']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f"Expected NAME=VALUE, got '{item}'")
+            kwargs[name] = value
+
+        # Refused requests are reported in the table, not as logged errors.
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        setup_test_environment()
+        try:
+            over_budget, skipped = self.check_pages(user, kwargs)
+        finally:
+            teardown_test_environment()
+            request_logger.setLevel(level)
+
+        for route, missing in skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped {route}: no value for {', '.join(missing)}"))
+        if over_budget:
+            raise CommandError(f"{len(over_budget)} page(s) over their query budget: {', '.join(over_budget)}")
+        self.stdout.write(self.style.SUCCESS("All pages are within their query budgets."))
+
+    def check_pages(self, user, kwargs):
+        """Request every page and return the over-budget keys and the skipped routes."""
+        over_budget = []
+        skipped = []
+        with transaction.atomic():
+            for route, name in iter_patterns(get_resolver().url_patterns):
+                if route.startswith(SKIPPED_PREFIXES):
+                    continue
+                missing = [param for param in PARAMETER.findall(route) if param not in kwargs]
+                if missing:
+                    skipped.append((route, missing))
+                    continue
+                path = '/' + PARAMETER.sub(lambda match: kwargs[match.group(1)], route)
+
+                # A fresh session per page, since some pages (logout) end it.
+                client = Client()
+                client.force_login(user)
+                with QueryRecorder() as recorder:
+                    response = client.get(path)
+
+                key = name or route
+                budget = query_budget('GET', key)
+                line = (
+                    f"{path} [{key}] {response.status_code}: {recorder.count} queries "
+                    f"(budget {budget}), {recorder.duplicates} duplicates"
+                )
+                if recorder.count > budget:
+                    sql, times = recorder.most_repeated()
+                    over_budget.append(key)
+                    self.stdout.write(self.style.ERROR(line))
+                    self.stdout.write(f"    most repeated ({times}x): {sql[:200]}")
+                else:
+                    self.stdout.write(line)
+            transaction.set_rollback(True)
+        return over_budget, skipped
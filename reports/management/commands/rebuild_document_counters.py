@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reports import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the document status counters from the documents table."
+
+    def handle(self, *args, **options):
+        rows = counters.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} counter row(s)."))
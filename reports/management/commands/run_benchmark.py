@@ -0,0 +1,216 @@
+import json
+import math
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from documents.models import Document
+from ecms.instrumentation import QueryRecorder
+from folders.models import Folder
+from notifications.models import Notification
+from versions.models import DocumentVersion
+from workflows.models import Task
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted, non-empty list."""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scenarios(user):
+    """(name, path) of the pages and APIs to drive as `user`, using ids from the corpus."""
+    pages = [
+        ('dashboard', '/'),
+        ('my_documents', '/documents/my/'),
+        ('notifications_list', '/notifications/'),
+        ('reports_dashboard', '/reports/'),
+        ('api_documents', '/api/documents/'),
+        ('api_search', '/api/documents/search/?q=report'),
+        ('api_unread_count', '/api/notifications/unread-count/'),
+    ]
+    document = Document.objects.active().visible_to(user).order_by('-pk').first()
+    if document is not None:
+        pages.append(('view_document', f'/documents/view/{document.pk}/'))
+    if user.is_admin():
+        pages.append(('all_documents', '/documents/all/'))
+        pages.append(('folders_list', '/folders/'))
+    if user.is_reviewer() or user.is_admin():
+        pages.append(('my_tasks', '/workflows/tasks/'))
+        pages.append(('pending_reviews', '/workflows/pending-reviews/'))
+        pages.append(('api_tasks', '/api/tasks/'))
+        task = Task.objects.filter(assigned_to=user, status='PENDING').order_by('-pk').first()
+        if task is not None:
+            pages.append(('review_task', f'/workflows/tasks/{task.pk}/'))
+    folder = Folder.objects.filter(depth__gt=0).order_by('-depth', 'pk').first()
+    if folder is not None:
+        pages.append(('api_folder', f'/api/folders/{folder.pk}/'))
+        pages.append(('api_folder_documents', f'/api/folders/{folder.pk}/documents/'))
+    return pages
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main pages and APIs and report latency percentiles, queries "
+        "per request and throughput, as a table and as a JSON file that can be "
+        "compared across commits. Seed data with `manage.py seed_corpus` first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            required=True,
+            help="Username to benchmark as; repeat to cover several roles"
+        )
+        parser.add_argument('--requests', type=int, default=50, help="Measured requests per page")
+        parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per page")
+        parser.add_argument(
+            '--base-url',
+            help="Benchmark a running server (e.g. http://localhost:8000) instead of the test client. "
+                 "Query counts are then read from the X-DB-Query-Count header."
+        )
+        parser.add_argument('--concurrency', type=int, default=1, help="Parallel requests against --base-url")
+        parser.add_argument('--only', action='append', default=[], help="Only run the named page; repeatable")
+        parser.add_argument('--output', help="JSON results file (default benchmark-<timestamp>.json)")
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError("--requests must be at least 1")
+        if options['concurrency'] > 1 and not options['base_url']:
+            raise CommandError("--concurrency needs --base-url; the test client runs one request at a time")
+
+        User = get_user_model()
+        users = []
+        for username in options['user']:
+            try:
+                users.append(User.objects.get(username=username))
+            except User.DoesNotExist:
+                raise CommandError(f"User '{username}' does not exist")
+
+        started = timezone.now()
+        results = {
+            'revision': git_revision(),
+            'started_at': started.isoformat(),
+            'database': connection.vendor,
+            'mode': options['base_url'] or 'test-client',
+            'concurrency': options['concurrency'],
+            'requests_per_page': options['requests'],
+            'corpus': {
+                'documents': Document.objects.count(),
+                'versions': DocumentVersion.objects.count(),
+                'folders': Folder.objects.count(),
+                'tasks': Task.objects.count(),
+                'notifications': Notification.objects.count(),
+            },
+            'pages': [],
+        }
+
+        if not options['base_url']:
+            setup_test_environment()
+        try:
+            for user in users:
+                session = self.login(user)
+                for name, path in scenarios(user):
+                    if options['only'] and name not in options['only']:
+                        continue
+                    result = self.run_page(session, path, options)
+                    result.update(user=user.username, role=user.role, page=name, path=path)
+                    results['pages'].append(result)
+                    self.report(result)
+        finally:
+            if not options['base_url']:
+                teardown_test_environment()
+
+        output = options['output'] or f"benchmark-{started:%Y%m%d-%H%M%S}.json"
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results['pages'])} result(s) to {output}."))
+
+    def login(self, user):
+        """A logged in test client; --base-url requests reuse its session cookie."""
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def request(self, session, path, options):
+        """Return (status, seconds, queries) for one GET of `path`."""
+        if options['base_url']:
+            request = urllib.request.Request(
+                options['base_url'].rstrip('/') + path,
+                headers={'Cookie': f"{settings.SESSION_COOKIE_NAME}={session.cookies[settings.SESSION_COOKIE_NAME].value}"}
+            )
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    status, headers = response.status, response.headers
+            except urllib.error.HTTPError as error:
+                status, headers = error.code, error.headers
+            elapsed = time.perf_counter() - start
+            queries = headers.get('X-DB-Query-Count')
+            return status, elapsed, int(queries) if queries is not None else None
+
+        with QueryRecorder() as recorder:
+            start = time.perf_counter()
+            response = session.get(path)
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, recorder.count
+
+    def run_page(self, session, path, options):
+        for _ in range(options['warmup']):
+            self.request(session, path, options)
+
+        start = time.perf_counter()
+        if options['concurrency'] > 1:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                samples = list(executor.map(
+                    lambda _: self.request(session, path, options), range(options['requests'])
+                ))
+        else:
+            samples = [self.request(session, path, options) for _ in range(options['requests'])]
+        wall = time.perf_counter() - start
+
+        latencies = sorted(elapsed * 1000 for _, elapsed, _ in samples)
+        queries = [count for _, _, count in samples if count is not None]
+        return {
+            'statuses': dict(Counter(str(status) for status, _, _ in samples)),
+            'errors': sum(1 for status, _, _ in samples if status >= 400),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'queries': round(sum(queries) / len(queries), 1) if queries else None,
+            'throughput_rps': round(len(samples) / wall, 1),
+        }
+
+    def report(self, result):
+        self.stdout.write(
+            f"{result['user']:<20} {result['page']:<22} {result['errors']:>3} errors  "
+            f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+            f"{result['queries'] if result['queries'] is not None else '-':>6} queries  "
+            f"{result['throughput_rps']:>7.1f} req/s"
+        )
@@ -0,0 +1,272 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from audit.models import AuditTrail
+from documents.models import Blob, Document
+from documents.signals import documents_bulk_created
+from documents.storage import blob_storage
+from folders.models import PATH_STEP, Category, Folder, path_segment
+from notifications import counters as notification_counters
+from notifications.models import Notification
+from versions.models import DocumentVersion
+from workflows import approval, scheduler
+from workflows.models import Task, Workflow
+
+# Share of seeded documents per status
+STATUS_WEIGHTS = {'DRAFT': 40, 'REVIEW': 20, 'APPROVED': 30, 'REJECTED': 10}
+AUDIT_ACTIONS = ('VIEW', 'DOWNLOAD', 'UPDATE', 'VIEW', 'VIEW', 'DOWNLOAD')
+WORDS = (
+    'invoice contract policy report budget audit review quarterly annual '
+    'compliance procedure manual draft final summary minutes agenda memo '
+    'proposal specification release schedule risk vendor customer payroll'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic corpus for load testing: users by role, folder trees, "
+        "categories, documents with versions, review tasks, notifications and "
+        "audit rows. Rows are bulk inserted in chunks, then the counters, "
+        "tallies and reviewer loads are brought up to date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='seed', help="Prefix of the seeded usernames and names")
+        parser.add_argument('--password', default='seed', help="Password of every seeded user")
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--reviewers', type=int, default=20)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--folders', type=int, default=500)
+        parser.add_argument('--folder-depth', type=int, default=8, help="Levels of the folder trees")
+        parser.add_argument('--documents', type=int, default=10000)
+        parser.add_argument('--max-versions', type=int, default=3, help="Each document gets 1 to this many versions")
+        parser.add_argument('--audit-per-document', type=int, default=5, help="Extra VIEW/DOWNLOAD/UPDATE audit rows")
+        parser.add_argument('--audit-months', type=int, default=12, help="Audit rows are spread over this many months")
+        parser.add_argument('--unread-ratio', type=float, default=0.3, help="Share of notifications left unread")
+        parser.add_argument('--files', type=int, default=50, help="Distinct file contents shared by the documents")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Documents per transaction")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for reproducible corpora")
+
+    def handle(self, *args, **options):
+        if options['admins'] < 1 or options['reviewers'] < 1 or options['users'] < 1:
+            raise CommandError("At least one admin, reviewer and user is needed")
+        if options['folder_depth'] < 1:
+            raise CommandError("--folder-depth must be at least 1")
+
+        prefix = options['prefix']
+        User = get_user_model()
+        if User.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users named {prefix}-* already exist; choose another --prefix")
+
+        self.rng = random.Random(options['seed'])
+        self.prefix = prefix
+        self.chunk_size = options['chunk_size']
+
+        admins, reviewers, users = self.seed_users(options)
+        categories = self.seed_categories(options['categories'])
+        self.assign_review_categories(reviewers, categories)
+        folders = self.seed_folders(options['folders'], options['folder_depth'], admins)
+        files = self.seed_files(options['files'])
+        workflow = Workflow.get_default(admins[0])
+
+        seeded = 0
+        while seeded < options['documents']:
+            count = min(self.chunk_size, options['documents'] - seeded)
+            self.seed_documents(count, options, users, reviewers, categories, folders, files, workflow)
+            seeded += count
+            self.stdout.write(f"Seeded {seeded}/{options['documents']} document(s)...")
+
+        # Tasks and notifications were bulk inserted, so their derived rows are rebuilt.
+        approval.rebuild()
+        scheduler.rebuild()
+        notification_counters.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(admins)} admin(s), {len(reviewers)} reviewer(s), {len(users)} user(s), "
+            f"{len(categories)} categories, {len(folders)} folders and {seeded} document(s). "
+            f"Every user's password is '{options['password']}'."
+        ))
+
+    def seed_users(self, options):
+        User = get_user_model()
+        password = make_password(options['password'])
+        created = {}
+        for role, option in (('ADMIN', 'admins'), ('REVIEWER', 'reviewers'), ('USER', 'users')):
+            created[role] = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{self.prefix}-{role.lower()}-{i}",
+                        email=f"{self.prefix}-{role.lower()}-{i}@example.com",
+                        password=password,
+                        role=role,
+                        is_staff=role == 'ADMIN'
+                    )
+                    for i in range(1, options[option] + 1)
+                ],
+                batch_size=self.chunk_size
+            )
+        return created['ADMIN'], created['REVIEWER'], created['USER']
+
+    def seed_categories(self, count):
+        names = [f"{self.prefix} category {i}" for i in range(1, count + 1)]
+        Category.objects.bulk_create([Category(name=name) for name in names], ignore_conflicts=True)
+        return list(Category.objects.filter(name__in=names).values_list('pk', flat=True))
+
+    def assign_review_categories(self, reviewers, categories):
+        if not categories:
+            return
+        Through = get_user_model().review_categories.through
+        Through.objects.bulk_create([
+            Through(user_id=reviewer.pk, category_id=category_id)
+            for reviewer in reviewers
+            for category_id in self.rng.sample(categories, min(2, len(categories)))
+        ])
+
+    def seed_folders(self, count, depth, admins):
+        """Create `count` folders spread over `depth` levels, level by level."""
+        folder_ids = []
+        parents = [None]
+        per_level = max(1, count // depth)
+        remaining = count
+        level = 0
+        while remaining > 0:
+            size = remaining if level == depth - 1 else min(per_level, remaining)
+            folders = Folder.objects.bulk_create(
+                [
+                    Folder(
+                        name=f"{self.prefix} folder {level}-{i}",
+                        parent_id=parent.pk if parent else None,
+                        created_by=self.rng.choice(admins)
+                    )
+                    for i, parent in enumerate(self.rng.choice(parents) for _ in range(size))
+                ],
+                batch_size=self.chunk_size
+            )
+            # Folder.save() is bypassed, so the materialized paths are set here.
+            paths = {parent.pk: parent.path for parent in parents if parent is not None}
+            for folder in folders:
+                folder.path = paths.get(folder.parent_id, '') + path_segment(folder.pk)
+                folder.depth = len(folder.path) // PATH_STEP - 1
+            Folder.objects.bulk_update(folders, ['path', 'depth'], batch_size=self.chunk_size)
+            folder_ids.extend(folder.pk for folder in folders)
+            parents = folders
+            remaining -= size
+            level += 1
+        return folder_ids
+
+    def seed_files(self, count):
+        """Store `count` distinct small text files and return their (blob name, size)."""
+        files = []
+        for i in range(max(1, count)):
+            content = ' '.join(self.rng.choices(WORDS, k=200)).encode()
+            files.append((blob_storage.save(f"{self.prefix}-{i}.txt", ContentFile(content)), len(content)))
+        return files
+
+    def seed_documents(self, count, options, users, reviewers, categories, folders, files, workflow):
+        rng = self.rng
+        now = timezone.now()
+        statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=count)
+
+        with transaction.atomic():
+            documents = []
+            for status in statuses:
+                name, size = rng.choice(files)
+                reviewed = status in ('APPROVED', 'REJECTED')
+                documents.append(Document(
+                    title=' '.join(rng.choices(WORDS, k=3)).capitalize(),
+                    file=name,
+                    file_size=size,
+                    folder_id=rng.choice(folders) if folders and rng.random() < 0.9 else None,
+                    category_id=rng.choice(categories) if categories and rng.random() < 0.8 else None,
+                    uploaded_by=rng.choice(users),
+                    status=status,
+                    submitted_for_review_at=now if status != 'DRAFT' else None,
+                    reviewed_by=rng.choice(reviewers) if reviewed else None,
+                    reviewed_at=now if reviewed else None,
+                    review_comments='Seeded review' if reviewed else ''
+                ))
+            documents = Document.objects.bulk_create(documents)
+
+            versions = []
+            for document in documents:
+                total = rng.randint(1, max(1, options['max_versions']))
+                for number in range(1, total + 1):
+                    name = document.file.name if number == total else rng.choice(files)[0]
+                    versions.append(DocumentVersion(
+                        document=document,
+                        file=name,
+                        version_number=number,
+                        created_by_id=document.uploaded_by_id
+                    ))
+            DocumentVersion.objects.bulk_create(versions)
+
+            tasks = []
+            notifications = []
+            for document in documents:
+                if document.status == 'DRAFT':
+                    continue
+                reviewer = document.reviewed_by or rng.choice(reviewers)
+                task_status = 'PENDING' if document.status == 'REVIEW' else document.status
+                tasks.append(Task(
+                    workflow=workflow,
+                    document=document,
+                    assigned_to=reviewer,
+                    status=task_status,
+                    comments=document.review_comments,
+                    completed_at=document.reviewed_at
+                ))
+                notifications.append((reviewer, document, f"You have been assigned to review document '{document.title}'"))
+                if task_status != 'PENDING':
+                    notifications.append((
+                        document.uploaded_by,
+                        document,
+                        f"Your document '{document.title}' has been {task_status.lower()} by {reviewer.username}"
+                    ))
+            Task.objects.bulk_create(tasks)
+            Notification.objects.bulk_create([
+                Notification(
+                    user=user,
+                    document=document,
+                    message=message,
+                    notification_type='TASK',
+                    is_read=rng.random() >= options['unread_ratio']
+                )
+                for user, document, message in notifications
+            ])
+
+            span = timedelta(days=30 * max(1, options['audit_months'])).total_seconds()
+            audit = []
+            for document in documents:
+                audit.append(AuditTrail(
+                    user=document.uploaded_by,
+                    document=document,
+                    action='UPLOAD',
+                    timestamp=now - timedelta(seconds=rng.uniform(0, span)),
+                    description="Document uploaded (seeded)"
+                ))
+                for _ in range(options['audit_per_document']):
+                    audit.append(AuditTrail(
+                        user=rng.choice(users),
+                        document=document,
+                        action=rng.choice(AUDIT_ACTIONS),
+                        ip_address=f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                        timestamp=now - timedelta(seconds=rng.uniform(0, span)),
+                        description="Seeded activity"
+                    ))
+            AuditTrail.objects.bulk_create(audit, batch_size=self.chunk_size)
+
+            # Every document and version row holds one blob reference.
+            references = Counter(document.file.name for document in documents)
+            references.update(version.file.name for version in versions)
+            Blob.acquire_many(references)
+
+            documents_bulk_created.send(sender=Document, documents=documents)
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('GLOBAL', 'Global'), ('USER', 'User'), ('FOLDER', 'Folder'), ('CATEGORY', 'Category')], max_length=20)),
+                ('scope_id', models.BigIntegerField(default=0)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'scope_id', 'status'), name='unique_document_counter')],
+            },
+        ),
+    ]
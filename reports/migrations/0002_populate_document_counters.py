@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count
+
+SCOPE_FIELDS = (
+    ('USER', 'uploaded_by_id'),
+    ('FOLDER', 'folder_id'),
+    ('CATEGORY', 'category_id'),
+)
+
+
+def populate(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    DocumentCounter = apps.get_model('reports', 'DocumentCounter')
+
+    documents = Document.objects.filter(is_deleted=False)
+    rows = [
+        DocumentCounter(scope='GLOBAL', scope_id=0, status=row['status'], count=row['n'])
+        for row in documents.values('status').annotate(n=Count('id'))
+    ]
+    for scope, field in SCOPE_FIELDS:
+        grouped = documents.exclude(**{field: None}).values(field, 'status').annotate(n=Count('id'))
+        rows.extend(
+            DocumentCounter(scope=scope, scope_id=row[field], status=row['status'], count=row['n'])
+            for row in grouped
+        )
+    DocumentCounter.objects.bulk_create(rows, batch_size=1000)
+
+
+def clear(apps, schema_editor):
+    apps.get_model('reports', 'DocumentCounter').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('documents', '0005_document_documents_d_uploade_67b794_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, clear),
+    ]
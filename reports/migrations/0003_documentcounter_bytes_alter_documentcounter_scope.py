@@ -0,0 +1,69 @@
+# Generated by Django 6.0 on 2026-10-17 13:06
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+SCOPE_FIELDS = (
+    ('USER', 'uploaded_by_id'),
+    ('FOLDER', 'folder_id'),
+    ('CATEGORY', 'category_id'),
+)
+
+
+def repopulate(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    Folder = apps.get_model('folders', 'Folder')
+    DocumentCounter = apps.get_model('reports', 'DocumentCounter')
+
+    documents = Document.objects.filter(is_deleted=False)
+    rows = [
+        DocumentCounter(scope='GLOBAL', scope_id=0, status=row['status'], count=row['n'], bytes=row['size'] or 0)
+        for row in documents.values('status').annotate(n=Count('id'), size=Sum('file_size'))
+    ]
+    counts = Counter()
+    sizes = Counter()
+    paths = dict(Folder.objects.values_list('id', 'path'))
+    for scope, field in SCOPE_FIELDS:
+        grouped = documents.exclude(**{field: None}).values(field, 'status').annotate(n=Count('id'), size=Sum('file_size'))
+        for row in grouped:
+            rows.append(DocumentCounter(
+                scope=scope, scope_id=row[field], status=row['status'], count=row['n'], bytes=row['size'] or 0
+            ))
+            if scope == 'FOLDER':
+                path = paths[row[field]]
+                for i in range(0, len(path), 10):
+                    key = (int(path[i:i + 10]), row['status'])
+                    counts[key] += row['n']
+                    sizes[key] += row['size'] or 0
+    rows.extend(
+        DocumentCounter(scope='FOLDER_TREE', scope_id=folder_id, status=status, count=count, bytes=sizes[folder_id, status])
+        for (folder_id, status), count in counts.items()
+    )
+
+    DocumentCounter.objects.all().delete()
+    DocumentCounter.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_populate_document_counters'),
+        ('documents', '0006_document_file_size'),
+        ('folders', '0002_folder_depth_folder_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentcounter',
+            name='bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='documentcounter',
+            name='scope',
+            field=models.CharField(choices=[('GLOBAL', 'Global'), ('USER', 'User'), ('FOLDER', 'Folder'), ('FOLDER_TREE', 'Folder and subfolders'), ('CATEGORY', 'Category')], max_length=20),
+        ),
+        migrations.RunPython(repopulate, migrations.RunPython.noop),
+    ]
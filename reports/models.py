@@ -1,3 +1,35 @@
 from django.db import models
 
-# Create your models here.
+
+class DocumentCounter(models.Model):
+    """
+    Number and total file size of non-deleted documents per status, for the
+    whole system, per uploader, folder and category, and per folder
+    including all of its subfolders (FOLDER_TREE). Kept in step with
+    Document by reports.counters; `manage.py rebuild_document_counters`
+    recomputes it.
+    """
+    SCOPE_CHOICES = (
+        ('GLOBAL', 'Global'),
+        ('USER', 'User'),
+        ('FOLDER', 'Folder'),
+        ('FOLDER_TREE', 'Folder and subfolders'),
+        ('CATEGORY', 'Category'),
+    )
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    scope_id = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20)
+    count = models.BigIntegerField(default=0)
+    bytes = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'scope_id', 'status'],
+                name='unique_document_counter'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.scope_id} {self.status} = {self.count}"
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from documents.models import Document
+from documents.signals import document_state_changed, documents_bulk_created, documents_bulk_state_changed
+from folders.models import Folder
+from folders.signals import folder_moved
+from . import counters
+
+
+@receiver(document_state_changed, sender=Document)
+def update_counters(sender, old_state, new_state, **kwargs):
+    counters.apply_change(old_state, new_state)
+
+
+@receiver(documents_bulk_created, sender=Document)
+def add_bulk_to_counters(sender, documents, **kwargs):
+    counters.apply_changes((None, document.counted_state()) for document in documents)
+
+
+@receiver(documents_bulk_state_changed, sender=Document)
+def update_bulk_counters(sender, changes, **kwargs):
+    counters.apply_changes((old_state, new_state) for _, old_state, new_state in changes)
+
+
+@receiver(post_delete, sender=Document)
+def remove_from_counters(sender, instance, **kwargs):
+    counters.apply_change(instance.counted_state(), None)
+
+
+@receiver(folder_moved, sender=Folder)
+def move_folder_counters(sender, folder, old_path, new_path, **kwargs):
+    counters.move_folder(folder.pk, old_path, new_path)
+
+
+@receiver(pre_delete, sender=Folder)
+def remove_folder_counters(sender, instance, **kwargs):
+    counters.remove_folder(instance)
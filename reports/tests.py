@@ -1,3 +1,268 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import get_resolver
+
+from documents import uploads
+from documents.models import Document, Metadata
+from ecms.instrumentation import assert_max_queries, query_budget
+from folders.models import Category, Folder
+from reports.management.commands.check_query_budgets import SKIPPED_PREFIXES, iter_patterns
+from workflows.models import Task
+from . import counters
+from .models import DocumentCounter
+
+# Enough rows that a query per row shows up against the budgets.
+DOCUMENTS_PER_USER = 6
+
+# URL patterns that test_get_routes does not GET, and why.
+GET_SKIPPED = {
+    'logout': "ends the session",
+    'delete_document': "changes state, see test_delete_document",
+    'submit_for_review': "changes state, see test_submit_for_review",
+    'notifications_mark_all_read': "changes state, see test_mark_all_read",
+    'notifications_stream': "streaming response, its queries run after the view returns",
+    'api/documents/bulk/': "POST only, see test_bulk_ingest",
+    'api/uploads/': "POST only",
+    'api/uploads/<uuid:pk>/complete/': "POST only, see test_upload_session_complete",
+    'api/tasks/<int:pk>/review/': "PATCH only, see test_review_task_api",
+    'api/tasks/review/': "POST only, see test_bulk_review",
+}
+
+
+class QueryBudgetTests(TestCase):
+    """Every page and API stays within its QUERY_BUDGETS entry on a small corpus."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            CHUNKED_UPLOAD_DIR=f'{cls.media_root}/.uploads',
+            ACTIVITY_BUFFER_ENABLED=False,
+            NOTIFICATION_DIGEST_ENABLED=False
+        )
+        cls.settings_override.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls.settings_override.disable()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.admin = User.objects.create_user('admin', password='x', role='ADMIN')
+        cls.reviewers = [
+            User.objects.create_user(f'reviewer{i}', password='x', role='REVIEWER') for i in range(2)
+        ]
+        cls.owners = [User.objects.create_user(f'owner{i}', password='x', role='USER') for i in range(2)]
+        cls.owner = cls.owners[0]
+
+        cls.categories = categories = [Category.objects.create(name=f'Category {i}') for i in range(2)]
+        for reviewer in cls.reviewers:
+            reviewer.review_categories.set(categories)
+        parent = Folder.objects.create(name='Parent', created_by=cls.admin)
+        cls.folder = Folder.objects.create(name='Child', parent=parent, created_by=cls.admin)
+
+        for owner in cls.owners:
+            for i in range(DOCUMENTS_PER_USER):
+                document = Document.objects.create(
+                    title=f'Report {owner.username} {i}',
+                    file=ContentFile(f'report {owner.username} {i}'.encode(), name='report.txt'),
+                    folder=cls.folder,
+                    category=categories[i % 2],
+                    uploaded_by=owner
+                )
+                Metadata.objects.create(document=document, attribute_name='year', attribute_value='2024')
+                # A second version
+                document.file = ContentFile(f'report {owner.username} {i} v2'.encode(), name='report.txt')
+                document.save()
+                if i % 2:
+                    document.submit_for_review(owner)
+
+        cls.document = Document.objects.filter(uploaded_by=cls.owner, status='DRAFT').first()
+        cls.version = cls.document.versions.first()
+
+    def setUp(self):
+        # The dashboard is built, not served from a previous test's cache.
+        cache.clear()
+
+    def client_for(self, user):
+        self.client.force_login(user)
+        return self.client
+
+    def assert_within_budget(self, name, request, *args, **kwargs):
+        method = request.__name__.upper()
+        with assert_max_queries(query_budget(method, name), f'{method} {name}'):
+            response = request(*args, **kwargs)
+        self.assertLess(response.status_code, 400, f"{name} returned {response.status_code}")
+        return response
+
+    def assert_counters_rebuilt(self):
+        """The incrementally kept counters equal a rebuild from Document."""
+        def snapshot():
+            return {
+                (scope, scope_id, status): (count, size)
+                for scope, scope_id, status, count, size in DocumentCounter.objects.filter(count__gt=0)
+                .values_list('scope', 'scope_id', 'status', 'count', 'bytes')
+            }
+        kept = snapshot()
+        counters.rebuild()
+        self.assertEqual(kept, snapshot())
+
+    def pending_task(self):
+        return Task.objects.filter(status='PENDING').select_related('assigned_to').first()
+
+    def get_fixtures(self):
+        """(user, path) to GET for each URL pattern, by URL name or route."""
+        task = self.pending_task()
+        session = uploads.create_session(self.owner, 'chunked.txt', 16, 'Chunked')
+        return {
+            'dashboard': (self.owner, '/'),
+            'login': (self.owner, '/login/'),
+            'my_documents': (self.owner, '/documents/my/'),
+            'all_documents': (self.admin, '/documents/all/'),
+            'upload_document': (self.owner, '/documents/upload/'),
+            'view_document': (self.owner, f'/documents/view/{self.document.pk}/'),
+            'download_document': (self.owner, f'/documents/download/{self.document.pk}/'),
+            'edit_document': (self.owner, f'/documents/edit/{self.document.pk}/'),
+            'document_versions': (self.owner, f'/versions/{self.document.pk}/'),
+            'download_version': (self.owner, f'/versions/download/{self.version.pk}/'),
+            'my_tasks': (task.assigned_to, '/workflows/tasks/'),
+            'review_task': (task.assigned_to, f'/workflows/tasks/{task.pk}/'),
+            'pending_reviews': (self.admin, '/workflows/pending-reviews/'),
+            'assign_reviewer': (self.admin, f'/workflows/assign-reviewer/{task.document_id}/'),
+            'notifications_list': (self.owner, '/notifications/'),
+            'folders_list': (self.admin, '/folders/'),
+            'create_folder': (self.admin, '/folders/create-folder/'),
+            'create_category': (self.admin, '/folders/create-category/'),
+            'reports_dashboard': (self.owner, '/reports/'),
+            'export_audit': (self.admin, '/audit/export/'),
+            'api/documents/': (self.owner, '/api/documents/'),
+            'api/documents/search/': (self.owner, '/api/documents/search/?q=report'),
+            'api/uploads/<uuid:pk>/': (self.owner, f'/api/uploads/{session.pk}/'),
+            'api/tasks/': (task.assigned_to, '/api/tasks/'),
+            'api/folders/<int:pk>/': (self.owner, f'/api/folders/{self.folder.pk}/'),
+            'api/folders/<int:pk>/documents/': (self.owner, f'/api/folders/{self.folder.pk}/documents/'),
+            'api/notifications/unread-count/': (self.owner, '/api/notifications/unread-count/'),
+        }
+
+    def test_get_routes(self):
+        """GET every URL pattern check_query_budgets walks; each needs a fixture or a reason to skip."""
+        fixtures = self.get_fixtures()
+        for route, name in iter_patterns(get_resolver().url_patterns):
+            key = name or route
+            if route.startswith(SKIPPED_PREFIXES) or key in GET_SKIPPED:
+                continue
+            with self.subTest(key):
+                self.assertIn(key, fixtures, f"{route} has no GET fixture; add one or list it in GET_SKIPPED")
+                user, path = fixtures[key]
+                self.assert_within_budget(key, self.client_for(user).get, path)
+
+    def test_upload_document(self):
+        client = self.client_for(self.owner)
+        self.assert_within_budget('upload_document', client.post, '/documents/upload/', {
+            'title': 'Uploaded',
+            'file': SimpleUploadedFile('uploaded.txt', b'uploaded contents'),
+            'folder': self.folder.pk,
+            'category': self.categories[0].pk,
+        })
+        self.assertTrue(Document.objects.filter(title='Uploaded').exists())
+
+    def test_edit_document(self):
+        client = self.client_for(self.owner)
+        self.assert_within_budget('edit_document', client.post, f'/documents/edit/{self.document.pk}/', {
+            'title': 'Edited',
+            'file': SimpleUploadedFile('edited.txt', b'edited contents'),
+            'folder': self.folder.pk,
+            'category': self.categories[0].pk,
+        })
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.title, 'Edited')
+
+    def test_submit_for_review(self):
+        client = self.client_for(self.owner)
+        self.assert_within_budget('submit_for_review', client.post, f'/documents/submit/{self.document.pk}/')
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, 'REVIEW')
+
+    def test_review_task(self):
+        task = self.pending_task()
+        client = self.client_for(task.assigned_to)
+        self.assert_within_budget('review_task', client.post, f'/workflows/tasks/{task.pk}/', {
+            'action': 'APPROVED',
+            'comments': 'Fine',
+        })
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'APPROVED')
+        self.assert_counters_rebuilt()
+
+    def test_review_task_api(self):
+        task = self.pending_task()
+        client = self.client_for(task.assigned_to)
+        self.assert_within_budget(
+            'api/tasks/<int:pk>/review/',
+            client.patch,
+            f'/api/tasks/{task.pk}/review/',
+            {'action': 'REJECTED', 'comments': 'Needs work'},
+            content_type='application/json'
+        )
+
+    def test_bulk_review(self):
+        reviewer = self.pending_task().assigned_to
+        tasks = Task.objects.filter(assigned_to=reviewer, status='PENDING')
+        self.assertGreater(len(tasks), 1)
+        client = self.client_for(reviewer)
+        response = self.assert_within_budget(
+            'api/tasks/review/',
+            client.post,
+            '/api/tasks/review/',
+            {'tasks': [{'id': task.pk, 'action': 'APPROVED'} for task in tasks], 'comments': 'Fine'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.json()['reviewed'], len(tasks))
+        self.assert_counters_rebuilt()
+
+    def test_mark_all_read(self):
+        reviewer = self.pending_task().assigned_to
+        self.assert_within_budget(
+            'notifications_mark_all_read', self.client_for(reviewer).post, '/notifications/mark-all-read/'
+        )
+
+    def test_delete_document(self):
+        client = self.client_for(self.owner)
+        self.assert_within_budget('delete_document', client.post, f'/documents/delete/{self.document.pk}/')
+        self.assert_counters_rebuilt()
+
+    def test_bulk_ingest(self):
+        client = self.client_for(self.owner)
+        files = [SimpleUploadedFile(f'bulk{i}.txt', f'bulk contents {i}'.encode()) for i in range(5)]
+        response = self.assert_within_budget('api/documents/bulk/', client.post, '/api/documents/bulk/', {
+            'files': files,
+            'manifest': json.dumps([{'file': 'bulk0.txt', 'title': 'Bulk', 'folder': self.folder.pk}]),
+        })
+        self.assertEqual(response.json()['created'], 5)
+        self.assert_counters_rebuilt()
+
+    def test_upload_session_complete(self):
+        data = b'chunked contents'
+        session = uploads.create_session(self.owner, 'chunked.txt', len(data), 'Chunked')
+        uploads.write_chunk(session, 0, io.BytesIO(data), len(data))
+        client = self.client_for(self.owner)
+        self.assert_within_budget(
+            'api/uploads/<uuid:pk>/complete/', client.post, f'/api/uploads/{session.pk}/complete/'
+        )
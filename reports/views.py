@@ -1,14 +1,15 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
-from documents.models import Document
+from .counters import status_counts
 
 
 @login_required
 def reports_dashboard(request):
-    total_documents = Document.objects.count()
-    approved_documents = Document.objects.filter(status="APPROVED").count()
-    rejected_documents = Document.objects.filter(status="REJECTED").count()
-    pending_documents = Document.objects.filter(status="REVIEW").count()
+    counts = status_counts()
+    total_documents = counts["total"]
+    approved_documents = counts.get("APPROVED", 0)
+    rejected_documents = counts.get("REJECTED", 0)
+    pending_documents = counts.get("REVIEW", 0)
 
     return render(
         request,
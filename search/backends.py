@@ -0,0 +1,180 @@
+"""
+Document search backends.
+
+The backend is chosen with the SEARCH_BACKEND setting. SQLiteFTSBackend
+keeps an FTS5 table with one row per document (rowid = document id) over
+the title, category and folder names, metadata values and extracted file
+text. DatabaseBackend is a fallback for databases without FTS5 that
+searches titles and metadata with LIKE.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .extract import extract_text
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.SEARCH_BACKEND)()
+    return _backend
+
+
+class BaseSearchBackend:
+    def filter(self, queryset, query, field='id'):
+        """Restrict `queryset` to rows whose `field` is a matching document id."""
+        raise NotImplementedError
+
+    def search(self, queryset, query, limit=50):
+        """Return up to `limit` documents from `queryset`, best match first."""
+        raise NotImplementedError
+
+    def index_document(self, document):
+        pass
+
+    def remove_document(self, document_id):
+        pass
+
+    def rename_folder(self, folder):
+        pass
+
+    def rename_category(self, category):
+        pass
+
+    def rebuild(self, documents):
+        pass
+
+
+class DatabaseBackend(BaseSearchBackend):
+    def _condition(self, query, prefix):
+        condition = Q()
+        for term in TOKEN_RE.findall(query):
+            condition &= (
+                Q(**{f'{prefix}title__icontains': term})
+                | Q(**{f'{prefix}metadata__attribute_value__icontains': term})
+            )
+        return condition
+
+    def filter(self, queryset, query, field='id'):
+        from documents.models import Document
+        ids = Document.objects.filter(self._condition(query, '')).values('id')
+        return queryset.filter(**{f'{field}__in': ids})
+
+    def search(self, queryset, query, limit=50):
+        return list(self.filter(queryset, query)[:limit])
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    table = 'search_document_index'
+
+    def match_expression(self, query):
+        """Quote every term so user input can never be parsed as FTS syntax."""
+        terms = TOKEN_RE.findall(query)
+        return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+    def filter(self, queryset, query, field='id'):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(**{
+            f'{field}__in': RawSQL(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+                [match]
+            )
+        })
+
+    def search(self, queryset, query, limit=50):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        # Rank only the rows of `queryset` (permissions, soft deletes), so
+        # documents that are not visible never push visible ones off the page.
+        # The unary + keeps SQLite from turning the IN into one MATCH per
+        # visible rowid: MATCH runs once and the rowids are checked after.
+        visible_sql, visible_params = queryset.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'AND +rowid IN ({visible_sql}) ORDER BY rank LIMIT %s',
+                [match, *visible_params, limit]
+            )
+            ranked_ids = [row[0] for row in cursor.fetchall()]
+        documents = queryset.in_bulk(ranked_ids)
+        return [documents[pk] for pk in ranked_ids if pk in documents]
+
+    def _row(self, document, content):
+        metadata = ' '.join(
+            f'{item.attribute_name} {item.attribute_value}' for item in document.metadata.all()
+        )
+        return [
+            document.pk,
+            document.title,
+            document.category.name if document.category_id else '',
+            document.folder.name if document.folder_id else '',
+            metadata,
+            content,
+            document.file.name,
+        ]
+
+    def index_document(self, document):
+        if document.is_deleted:
+            self.remove_document(document.pk)
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT file_name, content FROM {self.table} WHERE rowid = %s',
+                [document.pk]
+            )
+            row = cursor.fetchone()
+            # Only re-extract text when the file itself changed.
+            if row and row[0] == document.file.name:
+                content = row[1]
+            else:
+                content = extract_text(document.file)
+
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [document.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} '
+                f'(rowid, title, category, folder, metadata, content, file_name) '
+                f'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                self._row(document, content)
+            )
+
+    def remove_document(self, document_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [document_id])
+
+    def rename_folder(self, folder):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {self.table} SET folder = %s WHERE rowid IN '
+                f'(SELECT id FROM documents_document WHERE folder_id = %s)',
+                [folder.name, folder.pk]
+            )
+
+    def rename_category(self, category):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {self.table} SET category = %s WHERE rowid IN '
+                f'(SELECT id FROM documents_document WHERE category_id = %s)',
+                [category.name, category.pk]
+            )
+
+    def rebuild(self, documents):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        count = 0
+        for document in documents:
+            self.index_document(document)
+            count += 1
+        return count
@@ -0,0 +1,70 @@
+"""
+Plain-text extraction for the search index.
+
+Only formats that can be read with the standard library are handled, plus
+PDF when the optional `pypdf` package is installed. Anything else is
+indexed by title and metadata only.
+"""
+import posixpath
+import re
+import zipfile
+
+from django.conf import settings
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional dependency
+    PdfReader = None
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.csv', '.tsv', '.json', '.xml', '.log', '.rst'}
+MARKUP_EXTENSIONS = {'.html', '.htm'}
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _max_chars():
+    return getattr(settings, 'SEARCH_MAX_CONTENT_CHARS', 1000000)
+
+
+def _read_text(f, limit):
+    return f.read(limit).decode('utf-8', errors='ignore')
+
+
+def _read_pdf(f, limit):
+    if PdfReader is None:
+        return ''
+    parts = []
+    length = 0
+    for page in PdfReader(f).pages:
+        text = page.extract_text() or ''
+        parts.append(text)
+        length += len(text)
+        if length >= limit:
+            break
+    return '\n'.join(parts)[:limit]
+
+
+def _read_docx(f, limit):
+    with zipfile.ZipFile(f) as archive:
+        xml = archive.read('word/document.xml').decode('utf-8', errors='ignore')
+    return TAG_RE.sub(' ', xml)[:limit]
+
+
+def extract_text(fieldfile):
+    if not fieldfile:
+        return ''
+    extension = posixpath.splitext(fieldfile.name)[1].lower()
+    limit = _max_chars()
+    try:
+        with fieldfile.storage.open(fieldfile.name, 'rb') as f:
+            if extension in TEXT_EXTENSIONS:
+                return _read_text(f, limit)
+            if extension in MARKUP_EXTENSIONS:
+                return TAG_RE.sub(' ', _read_text(f, limit))
+            if extension == '.pdf':
+                return _read_pdf(f, limit)
+            if extension == '.docx':
+                return _read_docx(f, limit)
+    except Exception:
+        # Missing or malformed files are indexed without content.
+        return ''
+    return ''
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from documents.models import Document
+from search.backends import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the document search index, re-extracting text from every file."
+
+    def handle(self, *args, **options):
+        documents = Document.objects.filter(is_deleted=False).select_related(
+            'folder', 'category'
+        ).prefetch_related('metadata')
+        count = get_search_backend().rebuild(documents.iterator(chunk_size=500))
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} document(s)."))
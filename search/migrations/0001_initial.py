@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_document_index USING fts5("
+        "title, category, folder, metadata, content, file_name UNINDEXED, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')"
+    )
+    # Index existing documents without file content; run
+    # `manage.py rebuild_search_index` to extract text as well.
+    schema_editor.execute(
+        "INSERT INTO search_document_index "
+        "(rowid, title, category, folder, metadata, content, file_name) "
+        "SELECT d.id, d.title, COALESCE(c.name, ''), COALESCE(f.name, ''), "
+        "COALESCE((SELECT group_concat(m.attribute_name || ' ' || m.attribute_value, ' ') "
+        "FROM documents_metadata m WHERE m.document_id = d.id), ''), '', '' "
+        "FROM documents_document d "
+        "LEFT JOIN folders_category c ON c.id = d.category_id "
+        "LEFT JOIN folders_folder f ON f.id = d.folder_id "
+        "WHERE d.is_deleted = 0"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS search_document_index")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('documents', '0004_uploadsession'),
+        ('folders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
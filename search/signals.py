@@ -0,0 +1,68 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from documents.models import Document, Metadata
+from documents.signals import documents_bulk_created
+from folders.models import Category, Folder
+from .backends import get_search_backend
+
+INDEXED_FIELDS = {'title', 'file', 'folder', 'category', 'is_deleted'}
+
+
+def _reindex(document_id):
+    document = Document.objects.select_related('folder', 'category').filter(pk=document_id).first()
+    if document is not None:
+        get_search_backend().index_document(document)
+
+
+def _reindex_many(document_ids):
+    backend = get_search_backend()
+    documents = (
+        Document.objects.select_related('folder', 'category')
+        .prefetch_related('metadata')
+        .filter(pk__in=document_ids)
+    )
+    for document in documents:
+        backend.index_document(document)
+
+
+@receiver(post_save, sender=Document)
+def index_document(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not INDEXED_FIELDS & set(update_fields):
+        return
+    # Document.save() refreshes its loaded values only after post_save, so
+    # this still reports what the current save changed.
+    if not created and not INDEXED_FIELDS & instance.get_changed_fields():
+        return
+    transaction.on_commit(partial(_reindex, instance.pk))
+
+
+@receiver(documents_bulk_created, sender=Document)
+def index_bulk_documents(sender, documents, **kwargs):
+    transaction.on_commit(partial(_reindex_many, [document.pk for document in documents]))
+
+
+@receiver(post_delete, sender=Document)
+def unindex_document(sender, instance, **kwargs):
+    get_search_backend().remove_document(instance.pk)
+
+
+@receiver(post_save, sender=Metadata)
+@receiver(post_delete, sender=Metadata)
+def index_metadata(sender, instance, **kwargs):
+    transaction.on_commit(partial(_reindex, instance.document_id))
+
+
+@receiver(post_save, sender=Folder)
+def index_folder_name(sender, instance, created, **kwargs):
+    if not created:
+        get_search_backend().rename_folder(instance)
+
+
+@receiver(post_save, sender=Category)
+def index_category_name(sender, instance, created, **kwargs):
+    if not created:
+        get_search_backend().rename_category(instance)
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 12:48
+
+import documents.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('versions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentversion',
+            name='file',
+            field=models.FileField(storage=documents.storage.ContentAddressedStorage(), upload_to='document_versions/'),
+        ),
+    ]
@@ -1,15 +1,22 @@
 from django.db import models
 from django.conf import settings
-from documents.models import Document
+from documents.models import Document, Blob
+from documents.storage import blob_storage
 
 User = settings.AUTH_USER_MODEL
 
 class DocumentVersion(models.Model):
     document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='versions')
-    file = models.FileField(upload_to='document_versions/')
+    file = models.FileField(upload_to='document_versions/', storage=blob_storage)
     version_number = models.IntegerField()
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.document.title} - v{self.version_number}"
+
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        super().save(*args, **kwargs)
+        if is_new:
+            Blob.acquire(self.file.name)
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import document_versions
+from .views import document_versions, download_version
 
 urlpatterns = [
     path("<int:document_id>/", document_versions, name="document_versions"),
+    path("download/<int:version_id>/", download_version, name="download_version"),
 ]
 
 
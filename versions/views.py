@@ -1,6 +1,8 @@
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
 from django.shortcuts import render, get_object_or_404
 from .models import DocumentVersion
+from documents.downloads import download_filename, is_initial_request, serve_file
 from documents.models import Document
 
 
@@ -9,11 +11,41 @@ def document_versions(request, document_id):
     document = get_object_or_404(
         Document, id=document_id, uploaded_by=request.user, is_deleted=False
     )
-    versions = DocumentVersion.objects.filter(document=document).order_by(
-        "-version_number"
-    )
+    versions = DocumentVersion.objects.filter(document=document).select_related(
+        "created_by"
+    ).order_by("-version_number")
     return render(
         request,
         "versions/document_versions.html",
         {"document": document, "versions": versions},
     )
+
+
+@login_required
+def download_version(request, version_id):
+    version = get_object_or_404(
+        DocumentVersion.objects.select_related("document"),
+        id=version_id,
+        document__is_deleted=False,
+    )
+    document = version.document
+
+    if not request.user.can_view_document(document):
+        raise PermissionDenied("You do not have permission to view this document")
+
+    response = serve_file(
+        request,
+        version.file,
+        download_filename(f"{document.title} v{version.version_number}", version.file.name),
+        as_attachment="download" in request.GET,
+    )
+
+    if response.status_code in (200, 206) and is_initial_request(request):
+        from activity.events import log_audit
+        log_audit(
+            user=request.user,
+            document=document,
+            action="DOWNLOAD",
+            description=f"Downloaded version {version.version_number}",
+        )
+    return response
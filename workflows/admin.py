@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Workflow, Task
+from .models import Workflow, Task, TaskTally
 
 admin.site.register(Workflow)
-admin.site.register(Task)
\ No newline at end of file
+admin.site.register(Task)
+admin.site.register(TaskTally)
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from ecms.api import SparseFieldsSerializerMixin
 from workflows.models import Task
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     document_title = serializers.CharField(
         source='document.title',
         read_only=True
@@ -17,4 +18,10 @@ class TaskSerializer(serializers.ModelSerializer):
             'comments',
             'created_at'
         ]
-        read_only_fields = ['document', 'created_at']
\ No newline at end of file
+        read_only_fields = ['document', 'created_at']
+
+
+class BulkReviewEntrySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=['APPROVED', 'REJECTED'])
+    comments = serializers.CharField(required=False, allow_blank=True, default='')
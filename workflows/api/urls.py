@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import MyTasksAPI, ReviewTaskAPI
+from .views import BulkReviewAPI, MyTasksAPI, ReviewTaskAPI
 
 urlpatterns = [
     path('tasks/', MyTasksAPI.as_view()),
     path('tasks/<int:pk>/review/', ReviewTaskAPI.as_view()),
+    path('tasks/review/', BulkReviewAPI.as_view()),
 ]
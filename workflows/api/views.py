@@ -1,19 +1,25 @@
+from django.conf import settings
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from ecms.api import ConditionalGetMixin, SparseFieldsMixin
+from ecms.pagination import KeysetPagination
 from workflows.models import Task
-from .serializers import TaskSerializer
+from workflows.review import review_tasks
+from .serializers import BulkReviewEntrySerializer, TaskSerializer
 
 
-class MyTasksAPI(generics.ListAPIView):
+class MyTasksAPI(ConditionalGetMixin, SparseFieldsMixin, generics.ListAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Task.objects.filter(
             assigned_to=self.request.user,
             status='PENDING'
-        )
+        ).select_related('document')
 
 
 class ReviewTaskAPI(generics.UpdateAPIView):
@@ -24,7 +30,7 @@ class ReviewTaskAPI(generics.UpdateAPIView):
     def update(self, request, *args, **kwargs):
         task = self.get_object()
 
-        if task.assigned_to != request.user:
+        if task.assigned_to_id != request.user.pk:
             return Response(
                 {'error': 'Not authorized'},
                 status=status.HTTP_403_FORBIDDEN
@@ -46,3 +52,36 @@ class ReviewTaskAPI(generics.UpdateAPIView):
         return Response(
             {'message': f'Task {action.lower()} successfully'}
         )
+
+
+class BulkReviewAPI(APIView):
+    """
+    POST {"tasks": [{"id", "action", "comments"}, ...]} with action APPROVED
+    or REJECTED. A top-level "comments" applies to entries without their
+    own. Returns a result per task; refused tasks do not stop the others.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        entries = request.data.get('tasks')
+        if not isinstance(entries, list) or not entries:
+            return Response({'error': 'tasks must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(entries) > settings.BULK_REVIEW_MAX_TASKS:
+            return Response(
+                {'error': f'At most {settings.BULK_REVIEW_MAX_TASKS} tasks per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = BulkReviewEntrySerializer(data=entries, many=True)
+        serializer.is_valid(raise_exception=True)
+        default_comments = request.data.get('comments', '')
+        decisions = [
+            {**entry, 'comments': entry['comments'] or default_comments}
+            for entry in serializer.validated_data
+        ]
+
+        results = review_tasks(request.user, decisions)
+        return Response({
+            'reviewed': sum('status' in result for result in results),
+            'results': results,
+        })
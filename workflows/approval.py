@@ -0,0 +1,121 @@
+"""
+Document approval from per-document task tallies.
+
+Every Task status change moves one count in the document's TaskTally with
+an F() update inside the task's transaction, so deciding the document's
+status reads one row instead of all of its tasks. APPROVAL_RULE decides
+how the tally maps to a status:
+
+    'ANY_REJECT'   one rejection rejects the document at once; it is
+                   approved when every task is approved.
+    'ALL_APPROVE'  the document stays in review until every task is
+                   done, then is approved only if all of them approved.
+    'QUORUM'       approved once APPROVAL_QUORUM tasks (or all of them,
+                   if fewer are assigned) approve; rejected once the
+                   pending tasks can no longer reach that number.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Task, TaskTally
+
+FIELDS = {
+    'PENDING': 'pending',
+    'APPROVED': 'approved',
+    'REJECTED': 'rejected',
+}
+RULES = ('ANY_REJECT', 'ALL_APPROVE', 'QUORUM')
+
+
+def get_tally(document_id):
+    return TaskTally.objects.filter(document_id=document_id).first() or TaskTally(document_id=document_id)
+
+
+def record_transition(document_id, old_status, new_status, create=True):
+    """
+    Move one task of the document from `old_status` to `new_status` (None
+    when the task is created or deleted) and return the updated tally.
+    """
+    deltas = {}
+    if old_status is not None:
+        deltas[FIELDS[old_status]] = -1
+    if new_status is not None:
+        deltas[FIELDS[new_status]] = deltas.get(FIELDS[new_status], 0) + 1
+
+    rows = TaskTally.objects.filter(document_id=document_id)
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes and not rows.update(**changes) and create:
+        try:
+            with transaction.atomic():
+                TaskTally.objects.create(
+                    document_id=document_id,
+                    **{field: max(delta, 0) for field, delta in deltas.items()}
+                )
+        except IntegrityError:
+            # Created concurrently by another transaction.
+            rows.update(**changes)
+    return get_tally(document_id)
+
+
+def record_transitions(transitions):
+    """
+    Apply many (document_id, old_status, new_status) task transitions with
+    one F() update per distinct change and return {document_id: tally}.
+    """
+    deltas = {}
+    for document_id, old_status, new_status in transitions:
+        delta = deltas.setdefault(document_id, Counter())
+        delta[FIELDS[old_status]] -= 1
+        delta[FIELDS[new_status]] += 1
+
+    groups = {}
+    for document_id, delta in deltas.items():
+        key = tuple(sorted((field, value) for field, value in delta.items() if value))
+        groups.setdefault(key, []).append(document_id)
+    for key, document_ids in groups.items():
+        if key:
+            TaskTally.objects.filter(document_id__in=document_ids).update(
+                **{field: F(field) + value for field, value in key}
+            )
+    tallies = {tally.document_id: tally for tally in TaskTally.objects.filter(document_id__in=deltas)}
+    return {document_id: tallies.get(document_id) or get_tally(document_id) for document_id in deltas}
+
+
+def derive_status(tally, rule=None, quorum=None):
+    rule = rule or settings.APPROVAL_RULE
+    pending, approved, rejected = tally.pending, tally.approved, tally.rejected
+    total = pending + approved + rejected
+    if total == 0:
+        return 'DRAFT'
+
+    if rule == 'ANY_REJECT':
+        if rejected:
+            return 'REJECTED'
+        return 'REVIEW' if pending else 'APPROVED'
+    if rule == 'ALL_APPROVE':
+        if pending:
+            return 'REVIEW'
+        return 'REJECTED' if rejected else 'APPROVED'
+    if rule == 'QUORUM':
+        needed = min(quorum or settings.APPROVAL_QUORUM, total)
+        if approved >= needed:
+            return 'APPROVED'
+        if approved + pending < needed:
+            return 'REJECTED'
+        return 'REVIEW'
+    raise ImproperlyConfigured(f"APPROVAL_RULE must be one of {', '.join(RULES)}, not {rule!r}")
+
+
+def rebuild():
+    """Recompute every tally from the Task table."""
+    tallies = {}
+    for row in Task.objects.values('document_id', 'status').annotate(n=Count('id')):
+        tally = tallies.setdefault(row['document_id'], TaskTally(document_id=row['document_id']))
+        setattr(tally, FIELDS[row['status']], row['n'])
+    with transaction.atomic():
+        TaskTally.objects.all().delete()
+        TaskTally.objects.bulk_create(tallies.values())
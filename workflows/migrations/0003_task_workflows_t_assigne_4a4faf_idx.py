@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 12:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_document_documents_d_uploade_67b794_idx_and_more'),
+        ('workflows', '0002_task_completed_at_task_prevent_self_review'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', '-created_at', '-id'], name='workflows_t_assigne_4a4faf_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-17 13:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+FIELDS = {
+    'PENDING': 'pending',
+    'APPROVED': 'approved',
+    'REJECTED': 'rejected',
+}
+
+
+def populate(apps, schema_editor):
+    Task = apps.get_model('workflows', 'Task')
+    TaskTally = apps.get_model('workflows', 'TaskTally')
+    tallies = {}
+    for row in Task.objects.values('document_id', 'status').annotate(n=Count('id')):
+        tally = tallies.setdefault(row['document_id'], TaskTally(document_id=row['document_id']))
+        setattr(tally, FIELDS[row['status']], row['n'])
+    TaskTally.objects.bulk_create(tallies.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_document_file_size'),
+        ('workflows', '0003_task_workflows_t_assigne_4a4faf_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTally',
+            fields=[
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_tally', serialize=False, to='documents.document')),
+                ('pending', models.IntegerField(default=0)),
+                ('approved', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-17 13:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate(apps, schema_editor):
+    Task = apps.get_model('workflows', 'Task')
+    ReviewerLoad = apps.get_model('workflows', 'ReviewerLoad')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    pending = dict(
+        Task.objects.filter(status='PENDING').values('assigned_to_id')
+        .annotate(n=Count('id')).values_list('assigned_to_id', 'n')
+    )
+    user_ids = set(pending) | set(User.objects.filter(role__in=('REVIEWER', 'ADMIN')).values_list('pk', flat=True))
+    ReviewerLoad.objects.bulk_create([
+        ReviewerLoad(user_id=user_id, pending=pending.get(user_id, 0)) for user_id in user_ids
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_review_categories'),
+        ('workflows', '0004_tasktally'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewerLoad',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_load', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('pending', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pending', 'user'], name='workflows_r_pending_a0ab2d_idx')],
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ValidationError, PermissionDenied
 from documents.models import Document
+from ecms.tracking import TrackedFieldsMixin
 
 User = settings.AUTH_USER_MODEL
 
@@ -20,8 +21,16 @@ class Workflow(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def get_default(cls, user):
+        """The shared workflow review tasks are filed under unless one is chosen."""
+        workflow = cls.objects.filter(name=settings.DEFAULT_REVIEW_WORKFLOW).order_by('pk').first()
+        if workflow is None:
+            workflow = cls.objects.create(name=settings.DEFAULT_REVIEW_WORKFLOW, created_by=user)
+        return workflow
 
-class Task(models.Model):
+
+class Task(TrackedFieldsMixin, models.Model):
     STATUS_CHOICES = (
         ('PENDING', 'Pending'),
         ('APPROVED', 'Approved'),
@@ -52,12 +61,20 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['assigned_to', 'status', '-created_at', '-id']),
+        ]
+
     def __str__(self):
         return f"{self.document.title} - {self.status}"
 
     def clean(self):
         super().clean()
-        if self.assigned_to == self.document.uploaded_by:
+        # The assignment rules only need checking when the assignment changes.
+        if not self.has_changed('assigned_to') and not self.has_changed('document'):
+            return
+        if self.assigned_to_id == self.document.uploaded_by_id:
             raise ValidationError({
                 'assigned_to': 'A reviewer cannot be assigned to review their own document (separation of duties)'
             })
@@ -68,10 +85,10 @@ class Task(models.Model):
             })
 
     def approve(self, reviewer, comments=''):
-        if reviewer != self.assigned_to and not reviewer.is_admin():
+        if reviewer.pk != self.assigned_to_id and not reviewer.is_admin():
             raise PermissionDenied("You are not assigned to this task")
         
-        if reviewer == self.document.uploaded_by:
+        if reviewer.pk == self.document.uploaded_by_id:
             raise PermissionDenied("You cannot approve your own document (separation of duties)")
         
         if not reviewer.can_review_document(self.document):
@@ -84,10 +101,10 @@ class Task(models.Model):
         self.save()
 
     def reject(self, reviewer, comments=''):
-        if reviewer != self.assigned_to and not reviewer.is_admin():
+        if reviewer.pk != self.assigned_to_id and not reviewer.is_admin():
             raise PermissionDenied("You are not assigned to this task")
         
-        if reviewer == self.document.uploaded_by:
+        if reviewer.pk == self.document.uploaded_by_id:
             raise PermissionDenied("You cannot reject your own document (separation of duties)")
         
         if not reviewer.can_review_document(self.document):
@@ -104,64 +121,144 @@ class Task(models.Model):
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
-        old_status = None
+        old_status = self.get_old_value('status')
+        old_assigned_to_id = self.get_old_value('assigned_to')
         
-        if not is_new:
-            try:
-                old_instance = Task.objects.get(pk=self.pk)
-                old_status = old_instance.status
-            except Task.DoesNotExist:
-                pass
-        
-        self.full_clean()
+        # Only changed fields are validated; the loaded values were valid.
+        if is_new:
+            self.full_clean()
+        else:
+            changed = self.get_changed_fields()
+            self.full_clean(exclude=[
+                field.name for field in self._meta.concrete_fields if field.name not in changed
+            ])
         
-        super().save(*args, **kwargs)
+        from .approval import record_transition
+        from .scheduler import adjust_load
+
+        with transaction.atomic():
+            if not is_new:
+                # The loaded status may be stale: re-read it under a row lock so
+                # concurrent saves record a transition only once.
+                locked = Task.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'status', 'assigned_to_id'
+                ).first()
+                if locked is not None:
+                    old_status, old_assigned_to_id = locked
+
+            super().save(*args, **kwargs)
+            self._store_loaded_values(kwargs.get('update_fields'))
+
+            if old_status != self.status:
+                tally = record_transition(self.document_id, old_status, self.status)
+
+            if (old_status, old_assigned_to_id) != (self.status, self.assigned_to_id):
+                if old_status == 'PENDING':
+                    adjust_load(old_assigned_to_id, -1)
+                if self.status == 'PENDING':
+                    adjust_load(self.assigned_to_id, 1)
 
-        if old_status != self.status and self.status in ['APPROVED', 'REJECTED']:
-            from django.utils import timezone
-            self.document.reviewed_by = self.assigned_to
-            self.document.reviewed_at = timezone.now()
-            self.document.review_comments = self.comments
-            self.document.update_status()
+            if old_status != self.status and self.status in ['APPROVED', 'REJECTED']:
+                from django.utils import timezone
+                self.document.reviewed_by_id = self.assigned_to_id
+                self.document.reviewed_at = timezone.now()
+                self.document.review_comments = self.comments
+                self.document.update_status(tally)
 
-        from notifications.models import Notification
-        from audit.models import AuditTrail
+        from notifications.dispatch import notify
+        from activity.events import log_audit
 
         if is_new:
             message = f"You have been assigned to review document '{self.document.title}'"
-            Notification.objects.create(
-                user=self.assigned_to,
+            notify(
+                self.assigned_to,
+                message,
+                'TASK',
                 document=self.document,
-                message=message,
-                notification_type='TASK'
+                digest_key='ASSIGNED',
+                digest_message="You have been assigned to review {count} documents"
             )
-            AuditTrail.objects.create(
+            log_audit(
                 user=self.assigned_to,
                 document=self.document,
                 action='UPDATE',
                 description=f"Review task assigned to {self.assigned_to.username}"
             )
         elif old_status != self.status:
-            if self.status == 'APPROVED':
-                message = f"Your document '{self.document.title}' has been approved by {self.assigned_to.username}"
-                action = 'APPROVED'
-            elif self.status == 'REJECTED':
-                message = f"Your document '{self.document.title}' has been rejected by {self.assigned_to.username}"
-                action = 'REJECTED'
-            else:
-                message = f"Review status updated for document '{self.document.title}'"
-                action = 'UPDATE'
-
-            Notification.objects.create(
-                user=self.document.uploaded_by,
-                document=self.document,
-                message=message,
-                notification_type='TASK'
-            )
+            self.announce_review()
 
-            AuditTrail.objects.create(
-                user=self.assigned_to,
-                document=self.document,
-                action=action,
-                description=f"Document {self.status.lower()} by {self.assigned_to.username}. Comments: {self.comments[:100]}"
-            )
+    def announce_review(self):
+        """Notify the document owner of this task's new status and audit it."""
+        from notifications.dispatch import notify
+        from activity.events import log_audit
+
+        if self.status == 'APPROVED':
+            message = f"Your document '{self.document.title}' has been approved by {self.assigned_to.username}"
+            digest_message = f"{{count}} documents approved by {self.assigned_to.username}"
+            action = 'APPROVED'
+        elif self.status == 'REJECTED':
+            message = f"Your document '{self.document.title}' has been rejected by {self.assigned_to.username}"
+            digest_message = f"{{count}} documents rejected by {self.assigned_to.username}"
+            action = 'REJECTED'
+        else:
+            message = f"Review status updated for document '{self.document.title}'"
+            digest_message = "Review status updated for {count} documents"
+            action = 'UPDATE'
+
+        notify(
+            self.document.uploaded_by,
+            message,
+            'TASK',
+            document=self.document,
+            digest_key=f"{action}:{self.assigned_to_id}",
+            digest_message=digest_message
+        )
+
+        log_audit(
+            user=self.assigned_to,
+            document=self.document,
+            action=action,
+            description=f"Document {self.status.lower()} by {self.assigned_to.username}. Comments: {self.comments[:100]}"
+        )
+
+class TaskTally(models.Model):
+    """
+    Number of review tasks per status for a document, kept in step with
+    Task by workflows.approval so the document's status is derived without
+    reading its tasks.
+    """
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_tally'
+    )
+    pending = models.IntegerField(default=0)
+    approved = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.document_id}: {self.pending} pending, {self.approved} approved, {self.rejected} rejected"
+
+
+class ReviewerLoad(models.Model):
+    """
+    Number of pending review tasks per reviewer, kept in step with Task by
+    workflows.scheduler, which assigns new reviews to the least loaded
+    reviewer through the (pending, user) index.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='review_load'
+    )
+    pending = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['pending', 'user']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.pending} pending"
@@ -0,0 +1,112 @@
+"""
+Bulk review of tasks.
+
+review_tasks() checks every requested task against one locking query, then
+applies all permitted transitions in one transaction: one bulk_update of
+the tasks, one F() update per distinct tally change (see
+workflows.approval) and reviewer load change (see workflows.scheduler),
+one bulk_update of the documents whose status changes, and buffered
+notifications, audit and activity rows.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from activity.events import log_activity
+from documents.models import Document
+from documents.signals import documents_bulk_state_changed
+from .approval import derive_status, record_transitions
+from .models import Task
+from .scheduler import adjust_loads
+
+ACTIONS = ('APPROVED', 'REJECTED')
+
+
+def _check(reviewer, task, decision):
+    """Why `reviewer` may not apply `decision` to `task`, or None."""
+    if task is None or task.document.is_deleted:
+        return "Task not found"
+    if task.assigned_to_id != reviewer.pk and not reviewer.is_admin():
+        return "You are not assigned to this task"
+    if task.document.uploaded_by_id == reviewer.pk:
+        return "You cannot review your own document (separation of duties)"
+    if task.status != 'PENDING':
+        return f"This task has already been {task.status.lower()}"
+    if decision['action'] not in ACTIONS:
+        return "Invalid action"
+    if decision['action'] == 'REJECTED' and not decision.get('comments'):
+        return "Comments are required when rejecting a document"
+    return None
+
+
+def review_tasks(reviewer, decisions):
+    """
+    Apply `decisions`, a list of {'id', 'action', 'comments'} dicts, as
+    `reviewer`. Returns one {'id', 'status'} or {'id', 'error'} per
+    decision, in the order given. Refused decisions do not stop the others.
+    """
+    if not reviewer.is_reviewer() and not reviewer.is_admin():
+        return [
+            {'id': decision['id'], 'error': "You do not have permission to review documents"}
+            for decision in decisions
+        ]
+
+    with transaction.atomic():
+        tasks = {
+            task.pk: task
+            for task in Task.objects.select_for_update(of=('self',)).select_related(
+                'document', 'document__uploaded_by', 'assigned_to'
+            ).filter(pk__in=[decision['id'] for decision in decisions])
+        }
+
+        now = timezone.now()
+        results = []
+        reviewed = []
+        seen = set()
+        for decision in decisions:
+            task = tasks.get(decision['id'])
+            if decision['id'] in seen:
+                error = "Task is listed more than once"
+            else:
+                error = _check(reviewer, task, decision)
+            seen.add(decision['id'])
+            if error is not None:
+                results.append({'id': decision['id'], 'error': error})
+                continue
+            task.status = decision['action']
+            task.comments = decision.get('comments', '')
+            task.completed_at = now
+            reviewed.append(task)
+            results.append({'id': task.pk, 'status': task.status})
+
+        if not reviewed:
+            return results
+
+        Task.objects.bulk_update(reviewed, ['status', 'comments', 'completed_at'])
+        for task in reviewed:
+            task._store_loaded_values(['status', 'comments', 'completed_at'])
+        tallies = record_transitions((task.document_id, 'PENDING', task.status) for task in reviewed)
+        loads = Counter()
+        for task in reviewed:
+            loads[task.assigned_to_id] -= 1
+        adjust_loads(loads)
+
+        changes = []
+        for document in {task.document_id: task.document for task in reviewed}.values():
+            status = derive_status(tallies[document.pk])
+            if status != document.status:
+                old_state = document.counted_state()
+                document.status = status
+                changes.append((document, old_state, document.counted_state()))
+        if changes:
+            documents = [document for document, _, _ in changes]
+            Document.objects.bulk_update(documents, ['status'])
+            for document in documents:
+                document._store_loaded_values(['status'])
+            documents_bulk_state_changed.send(sender=Document, changes=changes)
+
+        for task in reviewed:
+            task.announce_review()
+            log_activity(user=reviewer, document=task.document, action=task.status)
+    return results
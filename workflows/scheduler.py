@@ -0,0 +1,108 @@
+"""
+Automatic reviewer assignment.
+
+ReviewerLoad holds each reviewer's number of pending tasks, moved with F()
+updates whenever a task is created, completed, reassigned or deleted.
+When a document is submitted for review, assign_reviewer() files a task
+for the eligible reviewer with the fewest pending tasks, read from the
+(pending, user) index. The document owner is never eligible (separation
+of duties). With REVIEW_CATEGORY_AFFINITY, reviewers who list the
+document's category in User.review_categories are preferred.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import ReviewerLoad, Task, Workflow
+
+logger = logging.getLogger(__name__)
+
+
+def adjust_load(user_id, delta, create=True):
+    if user_id is None or not delta:
+        return
+    rows = ReviewerLoad.objects.filter(user_id=user_id)
+    if rows.update(pending=F('pending') + delta) or not create:
+        return
+    try:
+        with transaction.atomic():
+            ReviewerLoad.objects.create(user_id=user_id, pending=delta)
+    except IntegrityError:
+        # Created concurrently by another transaction.
+        rows.update(pending=F('pending') + delta)
+
+
+def adjust_loads(deltas):
+    """Apply {user_id: delta} with one update per distinct delta."""
+    groups = {}
+    for user_id, delta in deltas.items():
+        if delta:
+            groups.setdefault(delta, []).append(user_id)
+    for delta, user_ids in groups.items():
+        ReviewerLoad.objects.filter(user_id__in=user_ids).update(pending=F('pending') + delta)
+
+
+def eligible_loads(document):
+    """ReviewerLoad rows of the users who may review `document`, least loaded first."""
+    return ReviewerLoad.objects.filter(
+        user__role__in=settings.REVIEW_AUTO_ASSIGN_ROLES,
+        user__is_active=True,
+        user__status=True
+    ).exclude(
+        user_id=document.uploaded_by_id
+    ).order_by('pending', 'user_id')
+
+
+def pick_reviewer(document):
+    """The id of the least loaded eligible reviewer for `document`, or None."""
+    loads = eligible_loads(document)
+    if settings.REVIEW_CATEGORY_AFFINITY and document.category_id is not None:
+        user_id = loads.filter(user__review_categories=document.category_id).values_list(
+            'user_id', flat=True
+        ).first()
+        if user_id is not None:
+            return user_id
+    return loads.values_list('user_id', flat=True).first()
+
+
+def assign_reviewer(document, user):
+    """
+    File a review task for `document` with the least loaded eligible
+    reviewer, on behalf of `user`. Returns the task, or None when nobody is
+    eligible and an admin has to assign one by hand.
+    """
+    reviewer_id = pick_reviewer(document)
+    if reviewer_id is None:
+        logger.warning("No eligible reviewer for document %s", document.pk)
+        return None
+    return Task.objects.create(
+        workflow=Workflow.get_default(user),
+        document=document,
+        assigned_to=get_user_model().objects.get(pk=reviewer_id),
+        status='PENDING'
+    )
+
+
+def ensure_load(user):
+    """Give reviewers and admins a ReviewerLoad row so they can be picked."""
+    if user.role in ('REVIEWER', 'ADMIN'):
+        ReviewerLoad.objects.get_or_create(user=user)
+
+
+def rebuild():
+    """Recompute every reviewer's load from the Task table."""
+    pending = dict(
+        Task.objects.filter(status='PENDING').values('assigned_to_id')
+        .annotate(n=Count('id')).values_list('assigned_to_id', 'n')
+    )
+    user_ids = set(pending) | set(
+        get_user_model().objects.filter(role__in=('REVIEWER', 'ADMIN')).values_list('pk', flat=True)
+    )
+    with transaction.atomic():
+        ReviewerLoad.objects.all().delete()
+        ReviewerLoad.objects.bulk_create([
+            ReviewerLoad(user_id=user_id, pending=pending.get(user_id, 0)) for user_id in user_ids
+        ])
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .approval import record_transition
+from .models import Task
+from .scheduler import adjust_load, ensure_load
+
+
+@receiver(post_delete, sender=Task)
+def remove_from_tally(sender, instance, **kwargs):
+    # The tally is already gone when the document itself is being deleted.
+    record_transition(instance.document_id, instance.status, None, create=False)
+
+
+@receiver(post_delete, sender=Task)
+def remove_from_load(sender, instance, **kwargs):
+    if instance.status == 'PENDING':
+        adjust_load(instance.assigned_to_id, -1, create=False)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_reviewer_load(sender, instance, created, update_fields, **kwargs):
+    # Most saves (logins update last_login) cannot make a user a reviewer.
+    if update_fields is not None and 'role' not in update_fields:
+        return
+    if created or getattr(instance, '_loaded_values', None) is None or instance.has_changed('role'):
+        ensure_load(instance)
+    instance._store_loaded_values(['role'])
@@ -1,3 +1,126 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from documents.models import Document
+from ecms.pagination import encode_cursor
+from .models import ReviewerLoad, Task, TaskTally
+
+
+class WorkflowTestCase(TestCase):
+    """Stores files under a temporary MEDIA_ROOT and writes side effects synchronously."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            ACTIVITY_BUFFER_ENABLED=False,
+            NOTIFICATION_DIGEST_ENABLED=False
+        )
+        cls.settings_override.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls.settings_override.disable()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.reviewer = User.objects.create_user('reviewer', password='x', role='REVIEWER')
+        cls.owner = User.objects.create_user('owner', password='x', role='USER')
+
+    @classmethod
+    def submit(cls, title):
+        document = Document.objects.create(
+            title=title, file=ContentFile(title.encode(), name='doc.txt'), uploaded_by=cls.owner
+        )
+        document.submit_for_review(cls.owner)
+        return document
+
+
+class TaskTransitionTests(WorkflowTestCase):
+    def test_stale_instances_record_a_transition_once(self):
+        document = self.submit('Contract')
+        task = Task.objects.get(document=document)
+        stale = Task.objects.get(pk=task.pk)
+        self.assertEqual(ReviewerLoad.objects.get(user=self.reviewer).pending, 1)
+
+        task.approve(self.reviewer)
+        # A second request that loaded the task while it was still pending.
+        stale.status = 'APPROVED'
+        stale.save()
+
+        tally = TaskTally.objects.get(document=document)
+        self.assertEqual((tally.pending, tally.approved), (0, 1))
+        self.assertEqual(ReviewerLoad.objects.get(user=self.reviewer).pending, 0)
+        document.refresh_from_db()
+        self.assertEqual(document.status, 'APPROVED')
+
+
+class PendingReviewTests(WorkflowTestCase):
+    def test_documents_put_into_review_get_a_submission_time(self):
+        document = Document.objects.create(
+            title='Edited by an admin', file=ContentFile(b'admin', name='doc.txt'), uploaded_by=self.owner
+        )
+        document.status = 'REVIEW'
+        document.save(update_fields=['status'])
+        document.refresh_from_db()
+        self.assertIsNotNone(document.submitted_for_review_at)
+
+    def test_pending_reviews_newest_submission_first(self):
+        documents = [self.submit(f'Report {i}') for i in range(12)]
+        self.client.force_login(self.reviewer)
+
+        response = self.client.get('/workflows/pending-reviews/')
+        page = response.context['documents']
+        self.assertEqual([d.pk for d in page], [d.pk for d in reversed(documents)][:10])
+
+        response = self.client.get('/workflows/pending-reviews/', {'cursor': page.next_cursor})
+        self.assertEqual([d.pk for d in response.context['documents']], [documents[1].pk, documents[0].pk])
+
+    def test_cursors_with_values_of_the_wrong_type_serve_the_first_page(self):
+        document = self.submit('Report')
+        cursors = [encode_cursor(['x', 'x'], 'n'), encode_cursor([None, 1], 'p'), encode_cursor([1], 'n'), 'junk']
+        for user, path in (
+            (self.reviewer, '/workflows/pending-reviews/'),
+            (self.owner, '/documents/my/'),
+            (self.owner, '/api/documents/'),
+        ):
+            self.client.force_login(user)
+            for cursor in cursors:
+                with self.subTest(path=path, cursor=cursor):
+                    response = self.client.get(path, {'cursor': cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertContains(response, document.title)
+
+
+class ReviewerLoadTests(TestCase):
+    def test_only_new_users_and_role_changes_touch_the_load(self):
+        User = get_user_model()
+        reviewer = User.objects.create_user('reviewer', password='x', role='REVIEWER')
+        user = User.objects.create_user('user', password='x', role='USER')
+        self.assertTrue(ReviewerLoad.objects.filter(user=reviewer).exists())
+        self.assertFalse(ReviewerLoad.objects.filter(user=user).exists())
+
+        reviewer = User.objects.get(pk=reviewer.pk)
+        with self.assertNumQueries(1):
+            reviewer.save(update_fields=['last_login'])
+        with self.assertNumQueries(1):
+            reviewer.first_name = 'Rita'
+            reviewer.save()
+
+        user = User.objects.get(pk=user.pk)
+        user.role = 'REVIEWER'
+        user.save()
+        self.assertTrue(ReviewerLoad.objects.filter(user=user).exists())
@@ -1,11 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db.models.functions import Coalesce
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied, ValidationError
 from .models import Task, Workflow
 from documents.models import Document
-from activity.models import ActivityLog
+from activity.events import log_activity
+from ecms.pagination import KeysetPaginator
+from search.backends import get_search_backend
 
 @login_required
 def my_tasks(request):
@@ -17,7 +19,7 @@ def my_tasks(request):
 
     tasks_qs = Task.objects.filter(
         assigned_to=request.user
-    ).select_related('document', 'document__uploaded_by')
+    ).select_related('document', 'document__uploaded_by', 'document__category')
 
     if status_filter:
         tasks_qs = tasks_qs.filter(status=status_filter)
@@ -25,13 +27,10 @@ def my_tasks(request):
         tasks_qs = tasks_qs.filter(status='PENDING')
 
     if search_query:
-        tasks_qs = tasks_qs.filter(document__title__icontains=search_query)
+        tasks_qs = get_search_backend().filter(tasks_qs, search_query, field='document_id')
 
-    tasks_qs = tasks_qs.order_by('-created_at')
-
-    paginator = Paginator(tasks_qs, 10)
-    page_number = request.GET.get("page")
-    tasks_page = paginator.get_page(page_number)
+    paginator = KeysetPaginator(tasks_qs, ('-created_at', '-id'), per_page=10)
+    tasks_page = paginator.get_page(request.GET.get("cursor"))
 
     return render(
         request,
@@ -48,10 +47,10 @@ def my_tasks(request):
 def review_task(request, task_id):
     task = get_object_or_404(Task, id=task_id)
     
-    if task.assigned_to != request.user and not request.user.is_admin():
+    if task.assigned_to_id != request.user.pk and not request.user.is_admin():
         raise PermissionDenied("You are not assigned to this task")
     
-    if task.document.uploaded_by == request.user:
+    if task.document.uploaded_by_id == request.user.pk:
         raise PermissionDenied(
             "You cannot review your own document (separation of duties)"
         )
@@ -72,7 +71,7 @@ def review_task(request, task_id):
                 task.approve(request.user, comments)
                 messages.success(request, "Document approved successfully.")
                 
-                ActivityLog.objects.create(
+                log_activity(
                     user=request.user,
                     document=task.document,
                     action='APPROVED'
@@ -85,7 +84,7 @@ def review_task(request, task_id):
                 task.reject(request.user, comments)
                 messages.success(request, "Document rejected successfully.")
                 
-                ActivityLog.objects.create(
+                log_activity(
                     user=request.user,
                     document=task.document,
                     action='REJECTED'
@@ -124,7 +123,7 @@ def assign_reviewer(request, document_id):
             from accounts.models import User
             reviewer = User.objects.get(id=reviewer_id)
             
-            if reviewer == document.uploaded_by:
+            if reviewer.pk == document.uploaded_by_id:
                 raise ValidationError(
                     "Cannot assign document owner as reviewer (separation of duties)"
                 )
@@ -132,13 +131,10 @@ def assign_reviewer(request, document_id):
             if not reviewer.is_reviewer() and not reviewer.is_admin():
                 raise ValidationError("Selected user is not a reviewer")
             
-            workflow = Workflow.objects.get(id=workflow_id) if workflow_id else None
-            if not workflow:
-                workflow = Workflow.objects.create(
-                    name=f"Review for {document.title}",
-                    created_by=request.user,
-                    is_active=True
-                )
+            if workflow_id:
+                workflow = Workflow.objects.get(id=workflow_id)
+            else:
+                workflow = Workflow.get_default(request.user)
             
             Task.objects.create(
                 workflow=workflow,
@@ -147,7 +143,7 @@ def assign_reviewer(request, document_id):
                 status='PENDING'
             )
             
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user,
                 document=document,
                 action='UPDATE'
@@ -160,9 +156,11 @@ def assign_reviewer(request, document_id):
             messages.error(request, str(e))
     
     from accounts.models import User
-    reviewers = User.objects.filter(role__in=['REVIEWER', 'ADMIN']).exclude(
-        id=document.uploaded_by.id
-    )
+    reviewers = User.objects.filter(role__in=['REVIEWER', 'ADMIN'], is_active=True).exclude(
+        id=document.uploaded_by_id
+    ).annotate(
+        pending_reviews=Coalesce('review_load__pending', 0)
+    ).order_by('pending_reviews', 'username')
     workflows = Workflow.objects.filter(is_active=True)
     
     return render(request, 'workflows/assign_reviewer.html', {
@@ -179,21 +177,19 @@ def pending_reviews(request):
     
     search_query = request.GET.get("q", "").strip()
     
-    documents_qs = Document.objects.filter(
-        status='REVIEW',
-        is_deleted=False
-    ).exclude(
-        uploaded_by=request.user
-    ).select_related('uploaded_by')
+    documents_qs = Document.objects.active().reviewable_by(
+        request.user
+    ).filter(
+        status='REVIEW'
+    ).select_related('uploaded_by', 'category')
     
     if search_query:
-        documents_qs = documents_qs.filter(title__icontains=search_query)
-    
-    documents_qs = documents_qs.order_by('-submitted_for_review_at')
+        documents_qs = get_search_backend().filter(documents_qs, search_query)
     
-    paginator = Paginator(documents_qs, 10)
-    page_number = request.GET.get("page")
-    documents_page = paginator.get_page(page_number)
+    # Every document in REVIEW has submitted_for_review_at (see
+    # Document._mark_submitted), so the status index serves this ordering.
+    paginator = KeysetPaginator(documents_qs, ('-submitted_for_review_at', '-id'), per_page=10)
+    documents_page = paginator.get_page(request.GET.get("cursor"))
     
     # Get assigned tasks for documents in the page
     review_doc_ids = [doc.id for doc in documents_page]